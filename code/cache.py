@@ -0,0 +1,116 @@
+"""
+In-memory LRU cache with TTL, memory bound and hit/miss counters
+"""
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+def estimate_size(obj: Any) -> int:
+    """
+    Cheap recursive size estimate (bytes) for JSON-like values
+
+    Not exact - good enough to bound cache memory.
+    """
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(estimate_size(k) + estimate_size(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_size(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache
+
+    Entries expire after ttl_seconds (None = never). The cache evicts the
+    least recently used entries when it holds more than max_entries items
+    or more than max_bytes (as measured by size_of).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        size_of: Callable[[Any], int] = estimate_size
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.size_of = size_of
+
+        self._data = OrderedDict()   # key -> (value, size, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, size, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any):
+        size = self.size_of(value) if self.max_bytes else 0
+
+        # Never cache a single value bigger than the whole budget
+        if self.max_bytes and size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+
+            self._data[key] = (value, size, expires_at)
+            self._bytes += size
+
+            while len(self._data) > self.max_entries or (self.max_bytes and self._bytes > self.max_bytes):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: Hashable):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
@@ -90,6 +90,95 @@ PROJECT_ROOT = CURRENT_FILE.parent.parent
 DB_FOLDER_PATH = str(PROJECT_ROOT / "data" / "databases")
 CHROMA_PATH    = str(PROJECT_ROOT / "data" / "vector_database")
 
+NUMPY_INDEX_PATH = str(PROJECT_ROOT / "data" / "vector_index")
+
+CHROMA_COLLECTION_NAME = "movie_descriptions"
+# OpenAI embedding model, or "hashing-<dim>" for the local deterministic
+# embedder (no API calls - offline builds/benchmarks). The index must be
+# built with the same model (scripts/create_vector_db.py --embedding-model)
+EMBEDDING_MODEL        = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+
+# Vector index behind semantic search: "chroma" (default), "numpy"
+# (memory-mapped matrix built by scripts/create_vector_db.py --backend numpy)
+# or "ivf" (same matrix + k-means inverted lists, --backend ivf)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+
+# IVF: inverted lists scanned per query (higher = better recall, slower).
+# Tune with scripts/test_semantic_search.py --benchmark
+IVF_NPROBE = int(os.getenv("IVF_NPROBE", "8"))
+
+# FTS5 (BM25) index over titles/descriptions, fused with vector hits.
+# Kept in its own file so the SQL catalog of data/databases/ is unchanged
+LEXICAL_INDEX_PATH = str(PROJECT_ROOT / "data" / "lexical_index" / "movies_fts.db")
+HYBRID_SEARCH = os.getenv("HYBRID_SEARCH", "true").lower() != "false"
+
+QUERY_EMBEDDING_CACHE_PATH = str(PROJECT_ROOT / "data" / "cache" / "query_embeddings.db")
+
+# OMDb response cache (SQLite, shared by all processes). Metadata of a
+# title almost never changes; "not found" answers expire sooner
+OMDB_CACHE_PATH             = str(PROJECT_ROOT / "data" / "cache" / "omdb_responses.db")
+OMDB_CACHE_HIT_TTL_SECONDS  = 30 * 24 * 3600
+OMDB_CACHE_MISS_TTL_SECONDS = 24 * 3600
+OMDB_CACHE_MAX_ENTRIES      = 50_000
+
+# Local OMDb metadata mirror (omdb_metadata table, filled by
+# scripts/prefetch_omdb.py) - read before the response cache and the API.
+# Its own file outside DB_FOLDER_PATH: the SQL catalog and the index builds
+# never see it, and prefetch writes leave movie.db (SQL cache, pooled
+# connections) untouched
+OMDB_MIRROR_DB_PATH = str(PROJECT_ROOT / "data" / "omdb" / "omdb_metadata.db")
+
+# Extra database files ATTACHed (read-only) to every catalog database for the
+# SQL tool: schema name -> path. The mirror's ratings/votes/runtime can then
+# be JOINed in SQL as omdb.omdb_metadata (skipped while the file is missing)
+SQL_ATTACHED_DATABASES = {"omdb": OMDB_MIRROR_DB_PATH}
+
+# Planner titles are resolved against the catalog titles before OMDb calls
+# (exact normalized matches only); after "not found", fuzzy matches below
+# this edit similarity (difflib ratio) are left untouched
+TITLE_RESOLUTION_MIN_SCORE = 0.85
+
+# Multi-title OMDb lookups: requests in flight per plan, and titles taken
+# from SQL/semantic results when a plan enriches them (omdb_from_results)
+OMDB_CONCURRENCY = 5
+OMDB_MAX_TITLES  = 10
+
+# SQLite connection pool (SQL tool)
+SQLITE_CACHE_SIZE_KB   = 64 * 1024           # page cache per connection (64 MB)
+SQLITE_MMAP_SIZE       = 256 * 1024 * 1024   # memory-mapped I/O window (256 MB)
+SQLITE_STATEMENT_CACHE = 256                 # prepared statements kept per connection
+
+# Outbound HTTP (OMDb, future HTTP tools): one pooled async client,
+# keep-alive connections, HTTP/2 when the "h2" package is installed
+HTTP_MAX_CONNECTIONS           = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY_SECONDS  = 30.0
+HTTP_TIMEOUT_SECONDS           = 10.0
+HTTP_CONNECT_TIMEOUT_SECONDS   = 3.0
+
+# SQL result materialization
+SQL_MAX_ROWS    = 200   # rows returned per query (prompts only show ~2-3k chars)
+SQL_FETCH_BATCH = 50    # rows per fetchmany() call
+SQL_COUNT_CAP   = 10    # rows past the cap are counted up to SQL_COUNT_CAP * max_rows
+
+# SQL result cache (invalidated automatically when a database file changes)
+SQL_CACHE_MAX_ENTRIES = 512
+SQL_CACHE_MAX_BYTES   = 32 * 1024 * 1024   # ~32 MB of cached rows
+SQL_CACHE_TTL_SECONDS = 3600
+
+# SQL cost guard for planner-generated queries
+SQL_TIME_BUDGET_SECONDS = 5.0          # wall-clock budget per query
+SQL_MAX_SCAN_ROWS       = 10_000_000   # reject plans estimated to visit more rows
+SQL_PROGRESS_INTERVAL   = 10_000       # VM instructions between deadline checks
+
+# Executor deadlines (seconds) - tools still running are reported as timed out
+TOOL_DEADLINES = {"sql": 8.0, "semantic": 8.0, "omdb": 6.0, "web": 6.0}
+EXECUTOR_DEADLINE_SECONDS = 10.0
+
+# Hedged requests: if a tool is still running after this delay, a duplicate
+# call is raced against it (None = no hedging, e.g. to spare the OMDb quota)
+TOOL_HEDGE_AFTER = {"sql": None, "semantic": None, "omdb": None, "web": 3.0}
+
 # ==================================
 # ========= LLM INSTANCE ===========
 # ==================================
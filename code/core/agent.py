@@ -1,14 +1,16 @@
 """
 LangGraph workflow construction for agentic system
 """
+import threading
 import streamlit as st
 from langgraph.graph import StateGraph, START, END
 from langgraph.checkpoint.memory import MemorySaver
 from core.state import AgentState
-from nodes.planner import planner_node
-from nodes.executor import executor_node_sync
-from nodes.evaluator import evaluator_node
-from nodes.synthesizer import synthesizer_node
+from nodes.planner import planner_node, planner_node_async
+from nodes.executor import executor_node, executor_node_sync
+from nodes.evaluator import evaluator_node, evaluator_node_async
+from nodes.synthesizer import synthesizer_node, synthesizer_node_async
+from tools import omdb_tool, semantic_tool
 
 
 def route_after_evaluator(state: AgentState) -> str:
@@ -21,17 +23,16 @@ def route_after_evaluator(state: AgentState) -> str:
         return "synthesizer"
 
 
-@st.cache_resource
-def build_agent():
-    """Build the agentic workflow with loop logic"""
+def _build_workflow(planner, executor, evaluator, synthesizer):
+    """Build the agentic workflow with loop logic from the given node functions"""
 
     workflow = StateGraph(AgentState)
 
     # Add nodes
-    workflow.add_node("planner", planner_node)
-    workflow.add_node("executor", executor_node_sync)
-    workflow.add_node("evaluator", evaluator_node)
-    workflow.add_node("synthesizer", synthesizer_node)
+    workflow.add_node("planner", planner)
+    workflow.add_node("executor", executor)
+    workflow.add_node("evaluator", evaluator)
+    workflow.add_node("synthesizer", synthesizer)
 
     # Define edges
     workflow.add_edge(START, "planner")
@@ -55,5 +56,56 @@ def build_agent():
     return workflow.compile(checkpointer=checkpointer)
 
 
-# Build agent instance
+@st.cache_resource
+def build_agent():
+    """Build the synchronous workflow (invoke / stream)"""
+    return _build_workflow(planner_node, executor_node_sync, evaluator_node, synthesizer_node)
+
+
+@st.cache_resource
+def build_async_agent():
+    """
+    Build the async workflow (ainvoke / astream)
+
+    All nodes are coroutines, so a whole request runs on one event loop.
+    Drive it from sync code with core.runtime.iterate_sync / run_sync so
+    concurrent sessions share the same loop and tool connection pools.
+    """
+    return _build_workflow(planner_node_async, executor_node, evaluator_node_async, synthesizer_node_async)
+
+
+def _warmup_tools():
+    """Open the vector index and build the OMDb title index (best effort)"""
+    try:
+        semantic_tool.warmup()
+    except Exception:
+        pass  # semantic search reports the error itself when used
+    try:
+        omdb_tool.warmup()
+    except Exception:
+        pass  # lookups fall back to the planner's titles
+
+
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+
+def start_warmup() -> threading.Thread:
+    """
+    Warm the tool indexes in a background thread, once per process
+
+    Started with the agents, so every caller (UI, scripts, tests of the
+    graph) gets them warm without blocking startup on them.
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_warmup_tools, name="tool-warmup", daemon=True)
+            _warmup_thread.start()
+    return _warmup_thread
+
+
+# Build agent instances
 app = build_agent()
+async_app = build_async_agent()
+start_warmup()
@@ -1,8 +1,96 @@
 """
-Pydantic models for structured LLM outputs
+Pydantic models for structured LLM outputs and tool results
 """
-from typing import Optional, Literal
-from pydantic import BaseModel, Field
+from typing import Any, List, Optional, Literal
+from pydantic import BaseModel, Field, model_validator
+
+
+class SQLTask(BaseModel):
+    """One SQL query against one database"""
+
+    database: str = Field(..., description="Database name from the catalog")
+    query: str = Field(..., description="SQL query to run on that database")
+
+
+class OMDBTask(BaseModel):
+    """One OMDb lookup: a title (optionally with its year) or an IMDb ID"""
+
+    title: Optional[str] = Field(None, description="Exact movie/series title")
+    year: Optional[int] = Field(None, description="Release year, to pick the right remake")
+    imdb_id: Optional[str] = Field(None, description="IMDb ID (e.g. 'tt1375666'), exact match")
+
+    @model_validator(mode="after")
+    def _title_or_id(self):
+        if not self.title and not self.imdb_id:
+            raise ValueError("OMDBTask needs a title or an imdb_id")
+        return self
+
+
+class SemanticFilters(BaseModel):
+    """
+    Structured filters applied inside the semantic index before ranking
+
+    Set fields match any of the given values (case-insensitive); ranges
+    are inclusive. Titles missing a field never match a filter on it.
+    """
+
+    year_min: Optional[int] = Field(None, description="Earliest release_year")
+    year_max: Optional[int] = Field(None, description="Latest release_year")
+    types: List[str] = Field(default_factory=list, description="e.g. ['Movie'] or ['TV Show']")
+    ratings: List[str] = Field(default_factory=list, description="e.g. ['PG-13', 'TV-MA']")
+    genres: List[str] = Field(default_factory=list, description="listed_in values, any of, e.g. ['Dramas']")
+    countries: List[str] = Field(default_factory=list, description="Countries, any of")
+    duration_min: Optional[int] = Field(None, description="Minimum movie duration in minutes")
+    duration_max: Optional[int] = Field(None, description="Maximum movie duration in minutes")
+    seasons_min: Optional[int] = Field(None, description="Minimum number of TV seasons")
+    seasons_max: Optional[int] = Field(None, description="Maximum number of TV seasons")
+
+    def conditions(self) -> List[dict]:
+        """Chroma-style where clauses (one per active filter), over the index metadata fields"""
+        clauses = []
+
+        for field, low, high in (
+            ("release_year", self.year_min, self.year_max),
+            ("duration_minutes", self.duration_min, self.duration_max),
+            ("seasons", self.seasons_min, self.seasons_max),
+        ):
+            if low is not None:
+                clauses.append({field: {"$gte": low}})
+            if high is not None:
+                clauses.append({field: {"$lte": high}})
+
+        for field, values in (("type", self.types), ("rating", self.ratings)):
+            if values:
+                clauses.append({field: {"$in": [v.strip().lower() for v in values]}})
+
+        # List fields: any of the values
+        for field, values in (("genres", self.genres), ("countries", self.countries)):
+            contains = [{field: {"$contains": v.strip().lower()}} for v in values]
+            if len(contains) == 1:
+                clauses.append(contains[0])
+            elif contains:
+                clauses.append({"$or": contains})
+
+        return clauses
+
+
+class SemanticTask(BaseModel):
+    """One semantic search phrasing, optionally limited to one table and filtered"""
+
+    query: str = Field(..., description="English descriptive phrase to search for")
+    table_filter: Optional[str] = Field(None, description="Optional table name, e.g. one query per platform")
+    filters: Optional[SemanticFilters] = Field(None, description="Year/type/rating/genre/country/duration filters")
+
+    def where(self) -> Optional[dict]:
+        """Combined where clause for the vector/lexical index, or None"""
+        # "tables" lists every platform of a deduplicated description
+        # (indexes built without it fall back to "table", see vector_store.legacy_table_filter)
+        clauses = [{"tables": {"$contains": self.table_filter}}] if self.table_filter else []
+        if self.filters:
+            clauses.extend(self.filters.conditions())
+        if not clauses:
+            return None
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
 
 
 class ExecutionPlan(BaseModel):
@@ -15,13 +103,25 @@ class ExecutionPlan(BaseModel):
     use_web: bool = False
 
     # Prepared queries for each tool
-    sql_query: Optional[str] = None
-    sql_database: Optional[str] = None
+    sql_queries: List[SQLTask] = Field(
+        default_factory=list,
+        description="SQL queries to run in parallel, one per database/table when aggregating"
+    )
 
-    semantic_query: Optional[str] = None
+    semantic_queries: List[SemanticTask] = Field(
+        default_factory=list,
+        description="Semantic phrasings embedded in one call and searched together, results merged"
+    )
     semantic_n_results: int = 5
 
-    omdb_title: Optional[str] = None
+    omdb_queries: List[OMDBTask] = Field(
+        default_factory=list,
+        description="Titles (or IMDb IDs) looked up concurrently, one result per title"
+    )
+    omdb_from_results: bool = Field(
+        False,
+        description="Also look up the titles returned by SQL/semantic in this same pass"
+    )
 
     web_query: Optional[str] = None
     web_n_results: int = 5
@@ -30,6 +130,49 @@ class ExecutionPlan(BaseModel):
     reasoning: str = Field(..., description="Why these tools were selected")
     resolved_query: str = Field(..., description="Clarified query with context from history")
 
+    @model_validator(mode="before")
+    @classmethod
+    def _fold_legacy_sql_fields(cls, data):
+        """Accept plans using the old single sql_query/sql_database pair"""
+        if isinstance(data, dict) and data.get("sql_query") and not data.get("sql_queries"):
+            data = dict(data)
+            data["sql_queries"] = [{
+                "database": data.get("sql_database") or "",
+                "query": data["sql_query"]
+            }]
+        return data
+
+    @model_validator(mode="before")
+    @classmethod
+    def _fold_legacy_omdb_fields(cls, data):
+        """Accept the old single omdb_title and plain strings in omdb_queries"""
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        queries = data.get("omdb_queries") or []
+        title = data.get("omdb_title")
+        if title and not queries:
+            # "<result>" placeholder: the title comes from this pass's SQL/semantic results
+            if title.strip().startswith("<"):
+                data["omdb_from_results"] = True
+            else:
+                queries = [title]
+        data["omdb_queries"] = [{"title": q} if isinstance(q, str) else q for q in queries]
+        return data
+
+    @model_validator(mode="before")
+    @classmethod
+    def _fold_legacy_semantic_fields(cls, data):
+        """Accept the old single semantic_query and plain strings in semantic_queries"""
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        queries = data.get("semantic_queries") or []
+        if data.get("semantic_query") and not queries:
+            queries = [data["semantic_query"]]
+        data["semantic_queries"] = [{"query": q} if isinstance(q, str) else q for q in queries]
+        return data
+
 
 class EvaluatorDecision(BaseModel):
     """Evaluator's assessment of tool results"""
@@ -55,3 +198,26 @@ class EvaluatorDecision(BaseModel):
         le=1.0,
         description="Confidence in the available data (0-1)"
     )
+
+
+class ToolResult(BaseModel):
+    """Uniform result returned by every tool to the executor"""
+
+    tool: str
+    error: Optional[str] = None
+    error_type: Optional[str] = None   # e.g. "too_expensive" so the evaluator can adapt
+    elapsed_ms: float = 0.0
+    cached: bool = False
+
+    # Truncation: data may hold fewer items than row_count, which is the true
+    # total (or a lower bound for very large SQL results - see the note)
+    truncated: bool = False
+    row_count: Optional[int] = None
+    note: Optional[str] = None
+
+    # Kept last so counts/errors survive the prompt builders' character cut
+    data: Any = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -0,0 +1,96 @@
+"""
+Long-lived asyncio event loop shared by the whole process
+
+The agent graph, the executor and the tool connection pools all run on one
+background loop instead of building a new loop with asyncio.run() per call.
+Synchronous callers (Streamlit script runs, the sync graph) submit work to it
+with run_sync() / iterate_sync().
+"""
+import asyncio
+import queue
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator
+
+_loop = None
+_thread = None
+_lock = threading.Lock()
+
+_DONE = object()
+
+
+class _Raised:
+    """Exception raised inside the loop, forwarded to the sync consumer"""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared loop, starting its background thread on first use"""
+    global _loop, _thread
+
+    if _loop is not None and _thread is not None and _thread.is_alive():
+        return _loop
+
+    with _lock:
+        if _loop is None or _thread is None or not _thread.is_alive():
+            _loop = asyncio.new_event_loop()
+            _thread = threading.Thread(
+                target=_loop.run_forever,
+                name="agent-event-loop",
+                daemon=True
+            )
+            _thread.start()
+
+    return _loop
+
+
+def run_sync(coro: Coroutine) -> Any:
+    """
+    Run a coroutine on the shared loop and block until it finishes
+
+    Works whether or not the caller already has its own running loop,
+    as long as it is not the shared loop's own thread.
+    """
+    loop = get_event_loop()
+    if threading.current_thread() is _thread:
+        coro.close()
+        raise RuntimeError("run_sync() called from the shared event loop; await the coroutine instead")
+
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def iterate_sync(agen: AsyncIterator) -> Iterator:
+    """
+    Consume an async iterator (e.g. graph.astream) from synchronous code
+
+    The iterator is drained by a single task on the shared loop, so context
+    variables set by the producer stay valid for its whole lifetime.
+    """
+    loop = get_event_loop()
+    items = queue.Queue()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put(item)
+        except BaseException as e:
+            items.put(_Raised(e))
+            raise
+        finally:
+            items.put(_DONE)
+
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+
+    try:
+        while True:
+            item = items.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Raised):
+                raise item.error
+            yield item
+    finally:
+        # Consumer stopped early: stop the producer too
+        if not future.done():
+            future.cancel()
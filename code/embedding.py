@@ -1,45 +1,296 @@
 """
 Embedding Manager for Movie Database
-Creates and queries ChromaDB embeddings with OpenAI
+Creates and queries ChromaDB embeddings with OpenAI (or a local embedder, see embedding_providers)
 """
+import hashlib
+import json
 import os
+import re
 import sqlite3
+import time
+import unicodedata
 import chromadb
-import chromadb.utils.embedding_functions as embedding_functions
+from chromadb.errors import NotFoundError
 from pathlib import Path
 from typing import List, Dict, Optional
 from dotenv import load_dotenv
+from embedding_cache import get_query_embedding_cache
+from embedding_providers import DEFAULT_EMBEDDING_MODEL, collection_name_for, get_embedding_function
+from vector_store import VectorStore, ChromaVectorStore, NumpyVectorStore, IVFVectorStore
+from lexical_index import build_lexical_index
+from omdb_schema import MIRROR_TABLE
+from embedding_pipeline import (
+    BuildCheckpoint, EmbeddingPipeline, DEFAULT_CONCURRENCY, DEFAULT_MAX_BATCH_SIZE,
+    DEFAULT_MAX_BATCH_TOKENS, DEFAULT_RPM, DEFAULT_TPM
+)
 
 load_dotenv()
 
-# Configuration
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY not found in environment")
+# Embedding model (OpenAI model name, or "hashing-512" for the local embedder).
+# OPENAI_API_KEY is only needed when an OpenAI model is actually used
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
+
+# Ingestion: concurrent requests and the provider's limits (requests/tokens per minute)
+EMBEDDING_CONCURRENCY  = int(os.getenv("EMBEDDING_CONCURRENCY", DEFAULT_CONCURRENCY))
+EMBEDDING_RPM          = int(os.getenv("EMBEDDING_RPM", DEFAULT_RPM))
+EMBEDDING_TPM          = int(os.getenv("EMBEDDING_TPM", DEFAULT_TPM))
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", DEFAULT_MAX_BATCH_TOKENS))
+
+# Query embeddings are cached in memory and on disk (data/cache/)
+query_embedding_cache = get_query_embedding_cache()
 
 # === HELPER FUNCTIONS ===
 
-def generate_unique_id(table_name: str, index: int) -> str:
+def content_hash(movie: Dict) -> str:
+    """Hash of the embedded text (title + description): changes exactly when a re-embed is needed"""
+    text = f"{movie['title']}\x1f{movie['description']}"
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def generate_unique_id(movie: Dict) -> str:
     """
-    Generate unique ID from table name and index
+    Generate a stable ID from the table name and the source row
+
+    Uses the row's show_id when the table has one, otherwise a hash of its
+    content, so IDs do not move when rows are inserted or reordered.
 
     Examples:
-        amazon_prime_titles, 0 -> ama0000
-        netflix_titles, 42 -> net0042
-        disney_plus_titles, 1234 -> dis1234
+        netflix_titles, show_id "s42" -> net_s42
+        table without show_id -> myt_3f2a9c0d1e4b5a6f
     """
     # Extract first 3 characters of table name
-    prefix = table_name[:3].lower()
-    # Format index with leading zeros (4 digits)
-    id_str = f"{prefix}{index:04d}"
-    return id_str
+    prefix = movie['table'][:3].lower()
+    if movie.get('source_id'):
+        return f"{prefix}_{movie['source_id']}"
+    return f"{prefix}_{content_hash(movie)}"
+
+def assign_movie_ids(movies: List[Dict]) -> List[str]:
+    """
+    Stable IDs of extracted movies (a repeated source id falls back to the content hash)
+
+    IDs already set by dedupe_movies ("id") are kept.
+    """
+    ids = []
+    seen = set()
+    for movie in movies:
+        unique_id = movie.get('id') or generate_unique_id(movie)
+        if unique_id in seen:
+            unique_id = f"{movie['table'][:3].lower()}_{content_hash(movie)}"
+        seen.add(unique_id)
+        ids.append(unique_id)
+    return ids
+
+# === BUILD MANIFEST ===
+
+BUILD_MANIFEST_FILE = "build_manifest.json"
+
+def load_build_manifest(path: str) -> Dict:
+    """Manifest of the previous build ({} if there is none)"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_build_manifest(path: str, embedding_model: str, entries: Dict[str, str]) -> Dict:
+    """
+    Record what an index contains: model + {id: content hash}
+
+    The next build compares against it to embed only new or changed
+    descriptions and delete stale ones.
+    """
+    manifest = {
+        "model": embedding_model,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "count": len(entries),
+        "entries": entries
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path)
+    return manifest
+
+def entry_signature(movie: Dict) -> str:
+    """
+    Manifest value of an index entry: "<content hash>:<hash of its source ids>"
+
+    A different content hash means the text must be re-embedded; a
+    different source part only means its metadata must be rewritten.
+    """
+    sources = ",".join(sorted(s['id'] for s in movie.get('sources', [])))
+    return f"{content_hash(movie)}:{hashlib.sha256(sources.encode('utf-8')).hexdigest()[:8]}"
+
+def plan_delta(ids: List[str], signatures: List[str], previous: Dict[str, str]) -> tuple:
+    """
+    Compare the current entries with the previous build
+
+    Previous values may be bare content hashes (older manifests, collection
+    metadata): those entries are kept and only get their metadata rewritten.
+
+    Returns:
+        (positions to embed - new or changed text,
+         positions whose metadata changed - same text, other source rows,
+         ids to delete - no longer present)
+    """
+    current = set(ids)
+    to_embed, to_update = [], []
+    for i, (unique_id, signature) in enumerate(zip(ids, signatures)):
+        before = previous.get(unique_id)
+        if before is None or before.split(":")[0] != signature.split(":")[0]:
+            to_embed.append(i)
+        elif before != signature:
+            to_update.append(i)
+    stale = [unique_id for unique_id in previous if unique_id not in current]
+    return to_embed, to_update, stale
+
+# === DEDUPLICATION ===
+
+_NON_WORD_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+
+def description_key(description: str) -> str:
+    """Hash of a normalized description (case, accents form, punctuation and spacing ignored)"""
+    text = unicodedata.normalize("NFKC", description).lower()
+    text = " ".join(_NON_WORD_RE.sub(" ", text).split())
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:16]
+
+def dedupe_movies(movies: List[Dict]) -> tuple:
+    """
+    One index entry per normalized description, pointing to all its source rows
+
+    The same title is often on several platforms with the same description;
+    it is embedded and stored once. The first row (extraction order) is the
+    canonical entry and keeps its id, title and scalar metadata; every row
+    is listed in "sources" and the genres/countries of all rows are merged,
+    so table and list filters still match each platform carrying it.
+
+    Returns:
+        (entries with "id" and "sources", stats: rows, unique, duplicates, dedup_ratio)
+    """
+    entries = {}
+    for unique_id, movie in zip(assign_movie_ids(movies), movies):
+        source = {"id": unique_id, "title": movie['title'], "table": movie['table'], "database": movie['database']}
+        key = description_key(movie['description'])
+        entry = entries.get(key)
+        if entry is None:
+            entries[key] = {**movie, "id": unique_id, "sources": [source]}
+            continue
+
+        entry['sources'].append(source)
+        filters = entry['filters'] = dict(entry.get('filters', {}))
+        for field in ("genres", "countries"):
+            merged = list(dict.fromkeys(filters.get(field, []) + movie.get('filters', {}).get(field, [])))
+            if merged:
+                filters[field] = merged
+
+    deduped = list(entries.values())
+    stats = {
+        "rows": len(movies),
+        "unique": len(deduped),
+        "duplicates": len(movies) - len(deduped),
+        # Share of rows that did not need their own embedding
+        "dedup_ratio": round(1 - len(deduped) / len(movies), 4) if movies else 0.0
+    }
+    return deduped, stats
+
+# Source column of the stable row id (first match wins)
+ID_COLUMNS = ["show_id"]
+
+# Source columns of the filterable metadata (first match wins)
+FILTER_COLUMNS = {
+    "release_year": ["release_year", "year"],
+    "type": ["type"],
+    "rating": ["rating"],
+    "duration": ["duration"],
+    "country": ["country"],
+    "listed_in": ["listed_in", "genre", "genres"],
+}
+
+def split_values(value) -> List[str]:
+    """Comma-separated cell -> normalized (lowercase, trimmed) values"""
+    if value is None:
+        return []
+    return [v.strip().lower() for v in str(value).split(",") if v.strip()]
+
+def parse_duration(value) -> Dict:
+    """
+    Parse a duration cell
+
+    Examples:
+        "90 min" -> {"duration_minutes": 90}
+        "2 Seasons" -> {"seasons": 2}
+    """
+    if value is None:
+        return {}
+    parts = str(value).split()
+    if len(parts) < 2 or not parts[0].isdigit():
+        return {}
+    unit = parts[1].lower()
+    if unit.startswith("min"):
+        return {"duration_minutes": int(parts[0])}
+    if unit.startswith("season"):
+        return {"seasons": int(parts[0])}
+    return {}
+
+def parse_filter_metadata(row: Dict) -> Dict:
+    """
+    Filterable metadata of one row (keys with no value are left out)
+
+    release_year, duration_minutes, seasons: int
+    type, rating: lowercase string
+    countries, genres: lists of lowercase values (split on commas)
+    """
+    metadata = {}
+
+    year = row.get("release_year")
+    if year is not None and str(year).strip().isdigit():
+        metadata["release_year"] = int(str(year).strip())
+
+    for key in ("type", "rating"):
+        if row.get(key) not in (None, ""):
+            metadata[key] = str(row[key]).strip().lower()
+
+    metadata.update(parse_duration(row.get("duration")))
+
+    countries = split_values(row.get("country"))
+    if countries:
+        metadata["countries"] = countries
+    genres = split_values(row.get("listed_in"))
+    if genres:
+        metadata["genres"] = genres
+
+    return metadata
+
+def movie_metadata(movie: Dict) -> Dict:
+    """
+    Index metadata of a movie: title/database/table/content_hash + filter fields
+
+    "tables" lists every platform of the entry (table filters use it).
+    Deduplicated entries with several source rows also get aligned
+    source_ids / source_titles / source_tables lists.
+    """
+    sources = movie.get('sources') or [{"id": movie.get('id'), "title": movie['title'], "table": movie['table']}]
+    metadata = {
+        "title": movie['title'],
+        "database": movie['database'],
+        "table": movie['table'],
+        "tables": list(dict.fromkeys(s['table'] for s in sources)),
+        "content_hash": content_hash(movie),
+        **movie.get('filters', {})
+    }
+    if len(sources) > 1:
+        metadata["source_ids"] = [s['id'] for s in sources]
+        metadata["source_titles"] = [s['title'] for s in sources]
+        metadata["source_tables"] = [s['table'] for s in sources]
+    return metadata
 
 def extract_movies_from_databases(db_folder: str) -> List[Dict]:
     """
     Extract all movies/shows from all SQLite databases
 
     Returns:
-        List of dicts with: database, table, title, description
+        List of dicts with: database, table, source_id (show_id or None),
+        title, description, filters (see parse_filter_metadata)
     """
     all_data = []
     db_folder = Path(db_folder)
@@ -66,6 +317,10 @@ def extract_movies_from_databases(db_folder: str) -> List[Dict]:
             print(f"\n📁 Database: {db_path.name}")
 
             for (table_name,) in tables:
+                if table_name == MIRROR_TABLE:
+                    # OMDb mirror left in an older movie.db: its plots are not catalog descriptions
+                    continue
+
                 # Get column names
                 cursor.execute(f"PRAGMA table_info({table_name});")
                 columns = [col[1] for col in cursor.fetchall()]
@@ -84,19 +339,43 @@ def extract_movies_from_databases(db_folder: str) -> List[Dict]:
                         desc_col = col
                         break
 
+                # Optional columns for filterable metadata
+                lower_columns = {col.lower(): col for col in columns}
+                filter_cols = {}
+                for key, candidates in FILTER_COLUMNS.items():
+                    for candidate in candidates:
+                        if candidate in lower_columns:
+                            filter_cols[key] = lower_columns[candidate]
+                            break
+
+                id_col = next((lower_columns[c] for c in ID_COLUMNS if c in lower_columns), None)
+
                 if title_col and desc_col:
-                    # Get distinct title + description
-                    cursor.execute(f"SELECT DISTINCT {title_col}, {desc_col} FROM {table_name} WHERE {title_col} IS NOT NULL AND {desc_col} IS NOT NULL;")
+                    # Distinct title + description (first occurrence, in table order)
+                    # with the source id and metadata of that first row
+                    extra = f', "{id_col}"' if id_col else ", NULL"
+                    extra += "".join(f', "{col}"' for col in filter_cols.values())
+                    cursor.execute(f"""
+                        SELECT {title_col}, {desc_col}{extra} FROM {table_name}
+                        WHERE rowid IN (
+                            SELECT MIN(rowid) FROM {table_name}
+                            WHERE {title_col} IS NOT NULL AND {desc_col} IS NOT NULL
+                            GROUP BY {title_col}, {desc_col}
+                        )
+                        ORDER BY rowid;
+                    """)
                     results = cursor.fetchall()
 
                     print(f"  📋 Table: {table_name} - {len(results)} entries")
 
-                    for title, description in results:
+                    for title, description, source_id, *values in results:
                         all_data.append({
                             "database": db_path.name,
                             "table": table_name,
+                            "source_id": str(source_id) if source_id is not None else None,
                             "title": str(title),
-                            "description": str(description)
+                            "description": str(description),
+                            "filters": parse_filter_metadata(dict(zip(filter_cols, values)))
                         })
                 else:
                     if not title_col:
@@ -117,15 +396,19 @@ def extract_movies_from_databases(db_folder: str) -> List[Dict]:
 def get_or_create_collection(
     chroma_path: str,
     collection_name: str = "movie_descriptions",
-    embedding_model: str = "text-embedding-3-small"
+    embedding_model: str = EMBEDDING_MODEL,
+    recreate: bool = False
 ) -> chromadb.Collection:
     """
-    Get or create ChromaDB collection with OpenAI embeddings
+    Get or create ChromaDB collection with the model's embedding function
 
     Args:
         chroma_path: Path to ChromaDB persistent storage
-        collection_name: Name of the collection
-        embedding_model: OpenAI embedding model name
+        collection_name: Base name of the collection (suffixed for
+            non-default models, see collection_name_for)
+        embedding_model: OpenAI model name or "hashing-<dim>"
+        recreate: Drop the collection first (force rebuild - one call
+            instead of reading and deleting every id)
 
     Returns:
         ChromaDB collection
@@ -135,164 +418,460 @@ def get_or_create_collection(
     # Create ChromaDB client
     client = chromadb.PersistentClient(path=chroma_path)
 
-    # Create OpenAI embedding function
-    openai_ef = embedding_functions.OpenAIEmbeddingFunction(
-        api_key=OPENAI_API_KEY,
-        model_name=embedding_model
-    )
+    # Embedding function of the model (OpenAI or local)
+    ef = get_embedding_function(embedding_model)
+
+    name = collection_name_for(collection_name, embedding_model)
+    if recreate:
+        try:
+            client.delete_collection(name)
+            print(f"🗑️ Dropped collection {name}")
+        except NotFoundError:
+            pass
 
     # Get or create collection
     collection = client.get_or_create_collection(
-        name=collection_name,
-        embedding_function=openai_ef
+        name=name,
+        embedding_function=ef
     )
 
     return collection
 
+def make_embedding_pipeline(
+    embedding_model: str = EMBEDDING_MODEL,
+    batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    concurrency: int = EMBEDDING_CONCURRENCY
+) -> EmbeddingPipeline:
+    """Ingestion pipeline of a model (local embedders are not rate limited)"""
+    embed = get_embedding_function(embedding_model)
+    limited = getattr(embed, "rate_limited", True)
+    return EmbeddingPipeline(
+        embed,
+        concurrency=concurrency,
+        rpm=EMBEDDING_RPM if limited else None,
+        tpm=EMBEDDING_TPM if limited else None,
+        max_batch_tokens=EMBEDDING_BATCH_TOKENS,
+        max_batch_size=batch_size
+    )
+
+def record_batch(stats: Dict, result: Dict, total: int):
+    """Update build stats with one pipeline result and print it"""
+    stats['requests'] += 1
+    if result['error']:
+        stats['errors'] += len(result['keys'])
+        print(f"  ❌ Batch {stats['requests']}: {len(result['keys'])} movies - Error - {result['error']}")
+        return
+    stats['added'] += len(result['keys'])
+    stats['tokens'] += result['tokens']
+    stats['retries'] += result['retries']
+    print(f"  ✅ Batch {stats['requests']}: Embedded {len(result['keys'])} movies, "
+          f"{result['tokens']} tokens (total: {stats['added']}/{total})")
+
+def chroma_manifest_path(chroma_path: str, collection: chromadb.Collection) -> str:
+    """Build manifest of a Chroma collection (one per collection, next to the database)"""
+    return os.path.join(chroma_path, f"build_manifest_{collection.name}.json")
+
+# Rows read per collection.get() call: memory stays flat as the corpus grows
+SCAN_PAGE_SIZE = 1000
+
+def clear_collection(collection: chromadb.Collection, page_size: int = SCAN_PAGE_SIZE) -> int:
+    """
+    Delete every embedding, one page of ids at a time (ids only, no documents/metadata)
+
+    Returns:
+        Number of deleted embeddings
+    """
+    deleted = 0
+    while True:
+        ids = collection.get(include=[], limit=page_size)['ids']
+        if not ids:
+            return deleted
+        collection.delete(ids=ids)
+        deleted += len(ids)
+
+def collection_content_hashes(collection: chromadb.Collection, page_size: int = SCAN_PAGE_SIZE) -> Dict[str, Optional[str]]:
+    """{id: content_hash} stored in the collection, paged - previous state when there is no manifest"""
+    hashes = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        if not page['ids']:
+            break
+        for unique_id, metadata in zip(page['ids'], page['metadatas']):
+            hashes[unique_id] = (metadata or {}).get("content_hash")
+        offset += len(page['ids'])
+    return hashes
+
 def embed_movies_if_not_exists(
     collection: chromadb.Collection,
     movies: List[Dict],
-    batch_size: int = 100,
-    force_rebuild: bool = False
+    batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    force_rebuild: bool = False,
+    manifest_path: Optional[str] = None,
+    embedding_model: str = EMBEDDING_MODEL,
+    concurrency: int = EMBEDDING_CONCURRENCY
 ) -> Dict:
     """
-    Embed movies in ChromaDB - ONLY if they don't exist yet
+    Embed movies in ChromaDB - ONLY new or changed descriptions
+
+    The previous build is read from the manifest (or, without one, from the
+    content_hash metadata of the collection). Movies whose id and content
+    hash are unchanged are skipped, changed ones are re-embedded (upsert)
+    and ids no longer in the databases are deleted.
+
+    Embeddings go through the ingestion pipeline (token-sized batches,
+    concurrent requests, rate limits, retries). Each upserted batch is
+    checkpointed, so an interrupted build resumes where it stopped.
 
     Args:
         collection: ChromaDB collection
-        movies: List of movie dicts (database, table, title, description)
-        batch_size: Number of movies to embed per batch
+        movies: List of movie dicts (database, table, source_id, title, description, filters)
+        batch_size: Maximum number of movies per embedding request
         force_rebuild: If True, delete existing collection and rebuild
+        manifest_path: Build manifest to read and update (None = collection metadata only)
+        embedding_model: Model of the collection (embeds the batches, recorded in the manifest)
+        concurrency: Embedding requests in flight
 
     Returns:
-        Dict with stats: total, added, skipped, errors
+        Dict with stats: total, added, skipped, updated, deleted, errors,
+        requests, tokens, retries, seconds, docs_per_second
     """
     stats = {
         "total": len(movies),
         "added": 0,
         "skipped": 0,
-        "errors": 0
+        "updated": 0,
+        "deleted": 0,
+        "errors": 0,
+        "requests": 0,
+        "tokens": 0,
+        "retries": 0
     }
+    checkpoint = BuildCheckpoint(os.path.splitext(manifest_path)[0] + "_checkpoint") if manifest_path else None
 
-    # If force rebuild, delete all existing
+    # If force rebuild, delete all existing (build_movie_embeddings drops the
+    # collection instead; this covers a non-empty collection passed in directly)
     if force_rebuild:
         try:
             existing_count = collection.count()
             if existing_count > 0:
                 print(f"🗑️ Force rebuild: deleting {existing_count} existing embeddings...")
-                # Get all IDs and delete
-                all_ids = collection.get()['ids']
-                if all_ids:
-                    collection.delete(ids=all_ids)
-                print(f"✅ Deleted {len(all_ids)} embeddings")
+                print(f"✅ Deleted {clear_collection(collection)} embeddings")
         except Exception as e:
             print(f"⚠️ Error during force rebuild: {str(e)}")
 
-    # Get existing IDs
-    try:
-        existing_ids = set(collection.get()['ids'])
-        print(f"📊 Found {len(existing_ids)} existing embeddings")
-    except:
-        existing_ids = set()
-        print(f"📊 Collection is empty")
-
-    # Group movies by table for ID generation
-    table_counters = {}
-    movies_to_add = []
-
-    for idx, movie in enumerate(movies):
-        table_name = movie['table']
-
-        # Initialize counter for this table
-        if table_name not in table_counters:
-            table_counters[table_name] = 0
-
-        # Generate unique ID
-        unique_id = generate_unique_id(table_name, table_counters[table_name])
-        table_counters[table_name] += 1
-
-        # Check if already exists
-        if unique_id in existing_ids:
-            stats['skipped'] += 1
-            continue
-
-        # Add to batch
-        movies_to_add.append({
-            "id": unique_id,
-            "document": movie['description'],
-            "metadata": {
-                "title": movie['title'],
-                "database": movie['database'],
-                "table": movie['table']
-            }
-        })
-
-    print(f"\n🔄 Processing {len(movies_to_add)} new movies in batches of {batch_size}...")
-
-    # Process in batches
-    for i in range(0, len(movies_to_add), batch_size):
-        batch = movies_to_add[i:i + batch_size]
-
+    # Previous build: manifest, or the hashes stored in the collection
+    manifest = {} if force_rebuild or not manifest_path else load_build_manifest(manifest_path)
+    if manifest.get("model") == embedding_model:
+        previous = manifest.get("entries", {})
+        print(f"📊 Build manifest: {len(previous)} embeddings ({manifest.get('built_at')})")
+    else:
         try:
-            collection.add(
-                documents=[m['document'] for m in batch],
-                metadatas=[m['metadata'] for m in batch],
-                ids=[m['id'] for m in batch]
-            )
-            stats['added'] += len(batch)
-            print(f"  ✅ Batch {i // batch_size + 1}: Added {len(batch)} movies (total: {stats['added']}/{len(movies_to_add)})")
-
+            previous = collection_content_hashes(collection)
+            print(f"📊 Found {len(previous)} existing embeddings")
+        except Exception:
+            previous = {}
+            print(f"📊 Collection is empty")
+
+    # Batches already upserted by an interrupted build
+    if checkpoint and force_rebuild:
+        checkpoint.clear()
+    elif checkpoint:
+        resumed, _ = checkpoint.load()
+        if resumed:
+            previous.update(resumed)
+            print(f"⏯️ Resuming: {len(resumed)} movies embedded by the interrupted build")
+
+    movie_ids = assign_movie_ids(movies)
+    hashes = [entry_signature(m) for m in movies]
+    to_embed, to_update, stale = plan_delta(movie_ids, hashes, previous)
+    stats['skipped'] = len(movies) - len(to_embed)
+
+    # Entries of the new manifest: unchanged movies + successfully embedded ones
+    failed = set()
+
+    # Same text, other source rows (dedup): rewrite the metadata only
+    for i in range(0, len(to_update), batch_size):
+        batch = to_update[i:i + batch_size]
+        try:
+            collection.update(ids=[movie_ids[j] for j in batch], metadatas=[movie_metadata(movies[j]) for j in batch])
+            stats['updated'] += len(batch)
         except Exception as e:
             stats['errors'] += len(batch)
-            print(f"  ❌ Batch {i // batch_size + 1}: Error - {str(e)}")
+            failed.update(batch)
+            print(f"  ⚠️ Could not update metadata of {len(batch)} embeddings: {str(e)}")
+    if to_update:
+        print(f"🏷️ Updated metadata of {stats['updated']} embeddings")
+
+    # Delete movies that are no longer in the databases
+    for i in range(0, len(stale), batch_size):
+        batch = stale[i:i + batch_size]
+        try:
+            collection.delete(ids=batch)
+            stats['deleted'] += len(batch)
+        except Exception as e:
+            print(f"  ⚠️ Could not delete {len(batch)} stale embeddings: {str(e)}")
+    if stale:
+        print(f"🗑️ Deleted {stats['deleted']} stale embeddings")
+
+    print(f"\n🔄 Processing {len(to_embed)} new/changed movies ({concurrency} concurrent requests)...")
+    started = time.perf_counter()
+
+    pipeline = make_embedding_pipeline(embedding_model, batch_size, concurrency)
+
+    for result in pipeline.run((j, movies[j]['description']) for j in to_embed):
+        batch = result['keys']
+        if not result['error']:
+            try:
+                collection.upsert(
+                    embeddings=result['vectors'],
+                    documents=[movies[j]['description'] for j in batch],
+                    metadatas=[movie_metadata(movies[j]) for j in batch],
+                    ids=[movie_ids[j] for j in batch]
+                )
+                if checkpoint:
+                    checkpoint.record([movie_ids[j] for j in batch], [hashes[j] for j in batch])
+            except Exception as e:
+                result = {**result, "error": str(e)}
+        if result['error']:
+            failed.update(batch)
+        record_batch(stats, result, len(to_embed))
+
+    stats['seconds'] = round(time.perf_counter() - started, 2)
+    stats['docs_per_second'] = round(stats['added'] / max(stats['seconds'], 1e-9), 1)
+
+    # Failed movies stay out of the manifest, so the next run retries them
+    if manifest_path:
+        entries = {movie_ids[j]: hashes[j] for j in range(len(movies)) if j not in failed}
+        write_build_manifest(manifest_path, embedding_model, entries)
+        checkpoint.clear()
 
     print(f"\n📊 Embedding completed:")
     print(f"  - Total movies: {stats['total']}")
-    print(f"  - Added: {stats['added']}")
-    print(f"  - Skipped (already exists): {stats['skipped']}")
+    print(f"  - Embedded (new/changed): {stats['added']}")
+    print(f"  - Skipped (unchanged): {stats['skipped']}")
+    print(f"  - Metadata updated: {stats['updated']}")
+    print(f"  - Deleted (stale): {stats['deleted']}")
     print(f"  - Errors: {stats['errors']}")
+    print(f"  - Requests: {stats['requests']} ({stats['tokens']} tokens, {stats['retries']} retries)")
+    print(f"  - Throughput: {stats['docs_per_second']} docs/s ({stats['seconds']}s)")
 
     return stats
 
+def build_numpy_index(
+    movies: List[Dict],
+    index_path: str,
+    embedding_model: str = EMBEDDING_MODEL,
+    batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    force_rebuild: bool = False,
+    concurrency: int = EMBEDDING_CONCURRENCY
+) -> Dict:
+    """
+    Embed movies and write a NumPy memory-mapped index (see vector_store.NumpyVectorStore)
+
+    Vectors of unchanged movies (same id and content hash in the build
+    manifest of the existing index) are reused; only new or changed
+    descriptions are embedded, and removed movies are dropped. Embedded
+    batches are checkpointed (vectors included) until the index is written,
+    so an interrupted build resumes where it stopped.
+
+    Args:
+        movies: List of movie dicts (database, table, source_id, title, description)
+        index_path: NumPy index folder (manifest.json + builds/, see NumpyVectorStore)
+        embedding_model: OpenAI model name or "hashing-<dim>"
+        batch_size: Maximum number of descriptions per embedding request
+        force_rebuild: If True, re-embed everything
+        concurrency: Embedding requests in flight
+
+    Returns:
+        Dict with stats: total, added, skipped, updated, deleted, errors,
+        requests, tokens, retries, seconds, docs_per_second
+    """
+    stats = {
+        "total": len(movies), "added": 0, "skipped": 0, "updated": 0, "deleted": 0, "errors": 0,
+        "requests": 0, "tokens": 0, "retries": 0
+    }
+    started = time.perf_counter()
+
+    movie_ids = assign_movie_ids(movies)
+    hashes = [entry_signature(m) for m in movies]
+    manifest_path = os.path.join(index_path, BUILD_MANIFEST_FILE)
+    checkpoint = BuildCheckpoint(os.path.join(index_path, "build_checkpoint"))
+
+    # Previous build (only reusable if it was embedded with the same model)
+    manifest = {} if force_rebuild else load_build_manifest(manifest_path)
+    previous = manifest.get("entries", {}) if manifest.get("model") == embedding_model else {}
+    vectors = {}
+    if previous:
+        try:
+            vectors = NumpyVectorStore(index_path).get_vectors(movie_ids)
+        except (OSError, ValueError):
+            previous = {}
+
+    # Batches embedded by an interrupted build
+    resumed = {}
+    if force_rebuild:
+        checkpoint.clear()
+    else:
+        resumed, resumed_vectors = checkpoint.load()
+        if resumed:
+            previous = {**previous, **resumed}
+            vectors.update(resumed_vectors)
+            print(f"⏯️ Resuming: {len(resumed)} movies embedded by the interrupted build")
+
+    # Ids missing from the stored matrix are re-embedded
+    to_embed, to_update, stale = plan_delta(movie_ids, hashes, previous)
+    to_embed = sorted(set(to_embed) | {j for j, unique_id in enumerate(movie_ids) if unique_id not in vectors})
+    stats['skipped'] = len(movies) - len(to_embed)
+    stats['updated'] = len(set(to_update) - set(to_embed))
+    stats['deleted'] = len(stale)
+    print(f"\n🔄 {stats['skipped']} unchanged ({stats['updated']} with new metadata), "
+          f"{len(to_embed)} new/changed, {len(stale)} removed")
+
+    pipeline = make_embedding_pipeline(embedding_model, batch_size, concurrency)
+    for result in pipeline.run((j, movies[j]['description']) for j in to_embed):
+        batch = result['keys']
+        if result['error']:
+            # Never keep the stale vector of a changed description
+            for j in batch:
+                vectors.pop(movie_ids[j], None)
+        else:
+            for j, vector in zip(batch, result['vectors']):
+                vectors[movie_ids[j]] = vector
+            checkpoint.record([movie_ids[j] for j in batch], [hashes[j] for j in batch], result['vectors'])
+        record_batch(stats, result, len(to_embed))
+
+    stats['seconds'] = round(time.perf_counter() - started, 2)
+    stats['docs_per_second'] = round(stats['added'] / max(stats['seconds'], 1e-9), 1)
+    print(f"\n⏱️ Embedded {stats['added']} movies in {stats['seconds']}s ({stats['docs_per_second']} docs/s, "
+          f"{stats['requests']} requests, {stats['retries']} retries, {embedding_model})")
+
+    # Movies whose embedding failed are left out (and retried next run)
+    rows = [j for j in range(len(movies)) if movie_ids[j] in vectors]
+    if rows and (stats['added'] or stats['updated'] or stats['deleted'] or stats['errors'] or resumed):
+        manifest = NumpyVectorStore.write(
+            index_path,
+            [movie_ids[j] for j in rows],
+            [vectors[movie_ids[j]] for j in rows],
+            [movies[j]['description'] for j in rows],
+            [movie_metadata(movies[j]) for j in rows],
+            embedding_model
+        )
+        write_build_manifest(manifest_path, embedding_model, {movie_ids[j]: hashes[j] for j in rows})
+        checkpoint.clear()
+        print(f"\n💾 NumPy index written: {manifest['count']} vectors x {manifest['dim']} dims → {index_path}")
+    elif rows:
+        print(f"\n✅ NumPy index is up to date ({len(rows)} vectors)")
+
+    return stats
+
+def export_chroma_to_numpy(
+    collection: chromadb.Collection,
+    index_path: str,
+    embedding_model: str = EMBEDDING_MODEL,
+    page_size: int = SCAN_PAGE_SIZE
+) -> Dict:
+    """
+    Copy an existing Chroma collection into a NumPy index (no re-embedding)
+
+    Returns:
+        The written index manifest
+    """
+    ids, documents, metadatas, vectors = [], [], [], []
+    offset = 0
+
+    while True:
+        page = collection.get(
+            include=["embeddings", "documents", "metadatas"],
+            limit=page_size,
+            offset=offset
+        )
+        if not page['ids']:
+            break
+        ids.extend(page['ids'])
+        documents.extend(page['documents'])
+        metadatas.extend(page['metadatas'])
+        vectors.extend(page['embeddings'])
+        offset += len(page['ids'])
+
+    if not ids:
+        raise ValueError("Chroma collection is empty - nothing to export")
+
+    manifest = NumpyVectorStore.write(index_path, ids, vectors, documents, metadatas, embedding_model)
+    # Same ids and content hashes as the collection, so later builds stay incremental
+    entries = {unique_id: m['content_hash'] for unique_id, m in zip(ids, metadatas) if m and m.get('content_hash')}
+    write_build_manifest(os.path.join(index_path, BUILD_MANIFEST_FILE), embedding_model, entries)
+    return manifest
+
+def train_ivf_lists(index_path: str, nlist: Optional[int] = None) -> Dict:
+    """
+    Train k-means inverted lists for an existing NumPy index (IVF backend)
+
+    Returns:
+        The updated index manifest
+    """
+    print(f"\n🧭 Training IVF lists (k-means)...")
+    manifest = IVFVectorStore.build(index_path, nlist=nlist)
+    ivf = manifest['ivf']
+    print(f"✅ {ivf['nlist']} lists over {ivf['count']} vectors (largest list: {ivf['max_list_size']})")
+    return manifest
+
+def build_movie_lexical_index(db_folder: str, index_path: str) -> int:
+    """
+    Build the FTS5 (BM25) index used by hybrid search - local, no API calls
+
+    Returns:
+        Number of indexed movies
+    """
+    print(f"\n🔤 Building lexical (FTS5) index...")
+    # Same deduplicated entries (and ids) as the vector index, so hits fuse
+    movies, _ = dedupe_movies(extract_movies_from_databases(db_folder))
+    count = build_lexical_index(index_path, assign_movie_ids(movies), movies)
+    print(f"✅ {count} titles/descriptions indexed → {index_path}")
+    return count
+
 # === QUERY FUNCTIONS ===
 
 def query_movies(
-    collection: chromadb.Collection,
+    collection,
     query_text: str,
     n_results: int = 5,
-    where_filter: Optional[Dict] = None
+    where_filter: Optional[Dict] = None,
+    embedding_model: str = EMBEDDING_MODEL
 ) -> List[Dict]:
     """
     Query movies by semantic similarity
 
     Args:
-        collection: ChromaDB collection
-        query_text: Search query (will be embedded)
+        collection: ChromaDB collection or any VectorStore backend
+        query_text: Search query (embedded through the query embedding cache)
         n_results: Number of results to return
-        where_filter: Optional metadata filter (e.g., {"table": "netflix_titles"})
+        where_filter: Optional metadata filter (e.g., {"tables": {"$contains": "netflix_titles"}})
+        embedding_model: Model the index was built with
 
     Returns:
         List of dicts with: id, title, description, database, table, distance
     """
+    store = collection if isinstance(collection, VectorStore) else ChromaVectorStore(lambda: collection)
+
     try:
-        # Query collection
-        results = collection.query(
-            query_texts=[query_text],
-            n_results=n_results,
-            where=where_filter
+        query_embedding = query_embedding_cache.embed_one(
+            query_text, embedding_model, get_embedding_function(embedding_model)
         )
 
+        hits = store.search([query_embedding], n_results=n_results, where=where_filter)[0]
+
         # Format results
         formatted_results = []
 
-        for i in range(len(results['ids'][0])):
+        for hit in hits:
             formatted_results.append({
-                "id": results['ids'][0][i],
-                "title": results['metadatas'][0][i]['title'],
-                "description": results['documents'][0][i],
-                "database": results['metadatas'][0][i]['database'],
-                "table": results['metadatas'][0][i]['table'],
-                "distance": results['distances'][0][i] if 'distances' in results else None
+                "id": hit["id"],
+                "title": hit["metadata"]['title'],
+                "description": hit["document"],
+                "database": hit["metadata"]['database'],
+                "table": hit["metadata"]['table'],
+                "distance": hit["distance"]
             })
 
         return formatted_results
@@ -307,7 +886,7 @@ def get_movie_by_id(collection: chromadb.Collection, movie_id: str) -> Optional[
 
     Args:
         collection: ChromaDB collection
-        movie_id: Unique movie ID (e.g., "net0042")
+        movie_id: Unique movie ID (e.g., "net_s42")
 
     Returns:
         Dict with movie info or None if not found
@@ -336,7 +915,15 @@ def build_movie_embeddings(
     db_folder: str,
     chroma_path: str,
     force_rebuild: bool = False,
-    batch_size: int = 100
+    batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    backend: str = "chroma",
+    numpy_path: Optional[str] = None,
+    from_chroma: bool = False,
+    nlist: Optional[int] = None,
+    ivf_only: bool = False,
+    lexical_path: Optional[str] = None,
+    embedding_model: str = EMBEDDING_MODEL,
+    concurrency: int = EMBEDDING_CONCURRENCY
 ) -> Dict:
     """
     Complete workflow: Extract movies from SQL databases and embed them
@@ -344,8 +931,21 @@ def build_movie_embeddings(
     Args:
         db_folder: Path to folder with SQLite databases
         chroma_path: Path to ChromaDB storage
-        force_rebuild: If True, rebuild all embeddings
-        batch_size: Batch size for embedding
+        force_rebuild: If True, re-embed everything (default: only new or
+            changed descriptions, see the build manifest)
+        batch_size: Maximum number of descriptions per embedding request
+            (batches are cut by token count, EMBEDDING_BATCH_TOKENS)
+        backend: "chroma" (ChromaDB collection), "numpy" (memory-mapped index)
+            or "ivf" (NumPy index + k-means inverted lists)
+        numpy_path: Output folder of the NumPy index
+        from_chroma: With backend="numpy"/"ivf", copy vectors from the
+            existing Chroma collection instead of calling the embedding API
+        nlist: Number of IVF lists (default 4 * sqrt(n))
+        ivf_only: With backend="ivf", only retrain the lists of the
+            existing NumPy index
+        lexical_path: If set, also (re)build the FTS5 index for hybrid search
+        embedding_model: OpenAI model name or "hashing-<dim>" (local, no API)
+        concurrency: Embedding requests in flight (within EMBEDDING_RPM / EMBEDDING_TPM)
 
     Returns:
         Dict with stats
@@ -354,24 +954,56 @@ def build_movie_embeddings(
     print("🎬 MOVIE EMBEDDING BUILDER")
     print("=" * 60)
 
+    if lexical_path:
+        build_movie_lexical_index(db_folder, lexical_path)
+
+    if backend == "ivf" and ivf_only:
+        manifest = train_ivf_lists(numpy_path, nlist)
+        return {"total": manifest['count'], "added": 0, "skipped": manifest['count'], "errors": 0}
+
+    if backend in ("numpy", "ivf") and from_chroma:
+        print(f"\n📤 Exporting ChromaDB collection to NumPy index...")
+        collection = get_or_create_collection(chroma_path, embedding_model=embedding_model)
+        manifest = export_chroma_to_numpy(collection, numpy_path, embedding_model)
+        print(f"✅ {manifest['count']} vectors x {manifest['dim']} dims → {numpy_path}")
+        if backend == "ivf":
+            train_ivf_lists(numpy_path, nlist)
+        return {"total": manifest['count'], "added": manifest['count'], "skipped": 0, "errors": 0}
+
     # Step 1: Extract movies
     print("\n📥 Step 1: Extracting movies from databases...")
-    movies = extract_movies_from_databases(db_folder)
-
-    # Step 2: Get or create collection
-    print(f"\n🗄️ Step 2: Initializing ChromaDB...")
-    collection = get_or_create_collection(chroma_path)
-    print(f"✅ Collection: {collection.name}")
-    print(f"   Count: {collection.count()} embeddings")
-
-    # Step 3: Embed movies
-    print(f"\n🔮 Step 3: Creating embeddings...")
-    stats = embed_movies_if_not_exists(
-        collection=collection,
-        movies=movies,
-        batch_size=batch_size,
-        force_rebuild=force_rebuild
-    )
+    movies, dedup = dedupe_movies(extract_movies_from_databases(db_folder))
+    print(f"🧬 Deduplicated descriptions: {dedup['rows']} rows → {dedup['unique']} entries "
+          f"({dedup['duplicates']} duplicates, dedup ratio {dedup['dedup_ratio']:.1%})")
+
+    if backend in ("numpy", "ivf"):
+        print(f"\n🔮 Step 2: Creating embeddings for NumPy index...")
+        stats = build_numpy_index(
+            movies, numpy_path, embedding_model=embedding_model,
+            batch_size=batch_size, force_rebuild=force_rebuild, concurrency=concurrency
+        )
+        if backend == "ivf" and (stats['added'] or stats['deleted'] or not IVFVectorStore(numpy_path).trained):
+            train_ivf_lists(numpy_path, nlist)
+    else:
+        # Step 2: Get or create collection
+        print(f"\n🗄️ Step 2: Initializing ChromaDB...")
+        collection = get_or_create_collection(chroma_path, embedding_model=embedding_model, recreate=force_rebuild)
+        print(f"✅ Collection: {collection.name}")
+        print(f"   Count: {collection.count()} embeddings")
+
+        # Step 3: Embed movies
+        print(f"\n🔮 Step 3: Creating embeddings...")
+        stats = embed_movies_if_not_exists(
+            collection=collection,
+            movies=movies,
+            batch_size=batch_size,
+            force_rebuild=force_rebuild,
+            manifest_path=chroma_manifest_path(chroma_path, collection),
+            embedding_model=embedding_model,
+            concurrency=concurrency
+        )
+
+    stats['dedup'] = dedup
 
     print("\n" + "=" * 60)
     print("✅ EMBEDDING BUILD COMPLETE")
@@ -392,5 +1024,4 @@ if __name__ == "__main__":
         db_folder=DB_FOLDER,
         chroma_path=CHROMA_PATH,
         force_rebuild=False,
-        batch_size=100,
     )
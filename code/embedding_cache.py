@@ -0,0 +1,167 @@
+"""
+Two-tier cache for query embeddings
+Tier 1: in-memory LRU - Tier 2: SQLite file shared by all processes
+"""
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+from cache import LRUCache
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_PATH = str(PROJECT_ROOT / "data" / "cache" / "query_embeddings.db")
+
+EmbedFunction = Callable[[List[str]], Sequence[Sequence[float]]]
+
+
+def normalize_query(text: str) -> str:
+    """Cache key text: lowercased, trimmed, whitespace collapsed"""
+    return " ".join(text.lower().split())
+
+
+class QueryEmbeddingCache:
+    """
+    Cache of query embeddings keyed by (model name, normalized text)
+
+    Lookups go memory -> disk -> embedding API. Only the misses of a call
+    are sent to the API, in a single batched request, and the results are
+    written to both tiers. Vectors are stored on disk as float32 blobs.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_memory_entries: int = 4096):
+        self.path = path
+        self.memory = LRUCache(max_entries=max_memory_entries)
+
+        self._conn = None
+        self._lock = threading.Lock()
+
+        self.disk_hits = 0
+        self.api_calls = 0
+        self.api_texts = 0
+
+    def _disk(self) -> sqlite3.Connection:
+        """Open the disk tier on first use"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            # WAL lets several app processes read/write the cache concurrently
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS query_embeddings (
+                    model TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (model, text)
+                ) WITHOUT ROWID
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _disk_get(self, model: str, texts: List[str]) -> dict:
+        placeholders = ", ".join("?" for _ in texts)
+        with self._lock:
+            rows = self._disk().execute(
+                f"SELECT text, vector FROM query_embeddings WHERE model = ? AND text IN ({placeholders})",
+                [model, *texts]
+            ).fetchall()
+        return {text: array("f", blob).tolist() for text, blob in rows}
+
+    def _disk_put(self, model: str, items: dict):
+        now = time.time()
+        with self._lock:
+            conn = self._disk()
+            conn.executemany(
+                "INSERT OR REPLACE INTO query_embeddings (model, text, vector, created_at) VALUES (?, ?, ?, ?)",
+                [(model, text, array("f", vector).tobytes(), now) for text, vector in items.items()]
+            )
+            conn.commit()
+
+    def embed(self, texts: List[str], model: str, embed_fn: EmbedFunction) -> List[List[float]]:
+        """
+        Embed query texts, using the cache whenever possible
+
+        Args:
+            texts: Query texts
+            model: Embedding model name (part of the cache key)
+            embed_fn: Called with the list of missing texts, returns their vectors
+
+        Returns:
+            One vector per input text, in order
+        """
+        keys = [normalize_query(t) for t in texts]
+        found = {}
+
+        # Tier 1: memory
+        for key in set(keys):
+            vector = self.memory.get((model, key))
+            if vector is not None:
+                found[key] = vector
+
+        # Tier 2: disk
+        missing = [k for k in dict.fromkeys(keys) if k not in found]
+        if missing:
+            try:
+                from_disk = self._disk_get(model, missing)
+            except sqlite3.Error:
+                from_disk = {}
+            self.disk_hits += len(from_disk)
+            for key, vector in from_disk.items():
+                self.memory.put((model, key), vector)
+            found.update(from_disk)
+
+        # Network: one batched call for everything still missing
+        missing = [k for k in missing if k not in found]
+        if missing:
+            vectors = [list(map(float, v)) for v in embed_fn(missing)]
+            self.api_calls += 1
+            self.api_texts += len(missing)
+
+            fresh = dict(zip(missing, vectors))
+            for key, vector in fresh.items():
+                self.memory.put((model, key), vector)
+            try:
+                self._disk_put(model, fresh)
+            except sqlite3.Error:
+                pass  # disk tier is best effort
+            found.update(fresh)
+
+        return [found[k] for k in keys]
+
+    def embed_one(self, text: str, model: str, embed_fn: EmbedFunction) -> List[float]:
+        return self.embed([text], model, embed_fn)[0]
+
+    def disk_entries(self) -> Optional[int]:
+        try:
+            with self._lock:
+                return self._disk().execute("SELECT COUNT(*) FROM query_embeddings").fetchone()[0]
+        except sqlite3.Error:
+            return None
+
+    def stats(self) -> dict:
+        memory = self.memory.stats()
+        return {
+            "memory_entries": memory["entries"],
+            "memory_hits": memory["hits"],
+            "disk_entries": self.disk_entries(),
+            "disk_hits": self.disk_hits,
+            "api_calls": self.api_calls,
+            "api_texts": self.api_texts
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_query_embedding_cache(path: str = DEFAULT_CACHE_PATH) -> QueryEmbeddingCache:
+    """Process-wide cache instance for a given disk file"""
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = QueryEmbeddingCache(path)
+        return _caches[path]
@@ -0,0 +1,255 @@
+"""
+Embedding ingestion pipeline - index builds at the provider's rate limits
+- Token-count-based batches (not a fixed number of descriptions)
+- Bounded number of concurrent embedding requests
+- Token bucket for requests/min and tokens/min
+- Retries with exponential backoff on transient errors
+- Resumable checkpoint of completed batches
+"""
+import glob
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import numpy as np
+
+# Defaults sized for OpenAI embeddings (tier 1: 3,000 RPM / 1,000,000 TPM,
+# at most 2,048 inputs and 300k tokens per request)
+DEFAULT_MAX_BATCH_TOKENS = 20_000
+DEFAULT_MAX_BATCH_SIZE = 512
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RPM = 3_000
+DEFAULT_TPM = 1_000_000
+DEFAULT_MAX_RETRIES = 5
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    """
+    Tokens of a text for the OpenAI embedding models (cl100k_base)
+
+    Falls back to ~4 characters per token when tiktoken or its encoding
+    file is not available (offline builds).
+    """
+    global _encoding
+    if _encoding is None:
+        with _encoding_lock:
+            if _encoding is None:
+                try:
+                    import tiktoken
+                    _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception:
+                    _encoding = False
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+def token_batches(
+    items: Iterable[Tuple[str, str]],
+    max_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+    max_size: int = DEFAULT_MAX_BATCH_SIZE
+) -> Iterator[Tuple[List[str], List[str], int]]:
+    """
+    Group (key, text) pairs into batches of at most max_tokens / max_size
+
+    Short descriptions give large batches, long ones small batches, so each
+    request carries about the same amount of work. Streams: items are read
+    lazily and each batch is yielded as soon as it is full.
+
+    Yields:
+        (keys, texts, token count)
+    """
+    keys, texts, tokens = [], [], 0
+    for key, text in items:
+        n = count_tokens(text)
+        if texts and (tokens + n > max_tokens or len(texts) >= max_size):
+            yield keys, texts, tokens
+            keys, texts, tokens = [], [], 0
+        keys.append(key)
+        texts.append(text)
+        tokens += n
+    if texts:
+        yield keys, texts, tokens
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at `per_minute` / 60 per second
+
+    acquire(n) blocks until n units are available. Requests larger than the
+    capacity are let through once the bucket is full (never deadlocks).
+    """
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._available = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, n: float = 1):
+        n = min(n, self.capacity)
+        while True:
+            with self._lock:
+                self._refill()
+                if self._available >= n:
+                    self._available -= n
+                    return
+                wait_seconds = (n - self._available) / self.rate
+            time.sleep(min(wait_seconds, 1.0))
+
+
+class RateLimiter:
+    """Requests/min + tokens/min limits (None = unlimited)"""
+
+    def __init__(self, rpm: Optional[float] = DEFAULT_RPM, tpm: Optional[float] = DEFAULT_TPM):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+    def acquire(self, tokens: int):
+        if self.requests:
+            self.requests.acquire(1)
+        if self.tokens:
+            self.tokens.acquire(tokens)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits, timeouts, connection and server errors are worth retrying"""
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    name = type(error).__name__
+    return any(word in name for word in ("RateLimit", "Timeout", "Connection", "InternalServer"))
+
+
+class BuildCheckpoint:
+    """
+    Completed batches of an interrupted build, one .npz file per batch
+
+    Each file holds ids, content hashes and (optionally) vectors, written
+    atomically; a rerun loads them and only embeds what is missing. The
+    folder is removed once the build is complete.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def load(self) -> Tuple[Dict[str, str], Dict[str, np.ndarray]]:
+        """({id: content hash}, {id: vector}) of the completed batches"""
+        entries, vectors = {}, {}
+        for file in sorted(glob.glob(os.path.join(self.path, "batch_*.npz"))):
+            try:
+                with np.load(file) as data:
+                    ids = [str(i) for i in data["ids"]]
+                    entries.update(zip(ids, (str(h) for h in data["hashes"])))
+                    if "vectors" in data:
+                        vectors.update(zip(ids, data["vectors"]))
+            except (OSError, ValueError, KeyError):
+                continue
+        self._counter = len(glob.glob(os.path.join(self.path, "batch_*.npz")))
+        return entries, vectors
+
+    def record(self, ids: List[str], hashes: List[str], vectors=None):
+        with self._lock:
+            os.makedirs(self.path, exist_ok=True)
+            name = os.path.join(self.path, f"batch_{self._counter:06d}")
+            self._counter += 1
+        arrays = {"ids": np.asarray(ids), "hashes": np.asarray(hashes)}
+        if vectors is not None:
+            arrays["vectors"] = np.asarray(vectors, dtype=np.float32)
+        with open(name + ".tmp", "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(name + ".tmp", name + ".npz")
+
+    def clear(self):
+        for file in glob.glob(os.path.join(self.path, "batch_*")):
+            os.remove(file)
+        if os.path.isdir(self.path) and not os.listdir(self.path):
+            os.rmdir(self.path)
+
+
+class EmbeddingPipeline:
+    """
+    Embed a stream of (key, text) pairs with bounded concurrency
+
+    Batches are cut by token count, each request waits for the rate limiter,
+    at most `concurrency` requests are in flight (and at most twice that many
+    batches are buffered), and failed requests are retried with exponential
+    backoff + jitter. Results are yielded in completion order, in the
+    calling thread, so the caller can write them (Chroma, checkpoint)
+    without locking.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], List],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        rpm: Optional[float] = DEFAULT_RPM,
+        tpm: Optional[float] = DEFAULT_TPM,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 30.0
+    ):
+        self.embed = embed
+        self.concurrency = max(1, concurrency)
+        self.limiter = RateLimiter(rpm, tpm)
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+
+    def _embed_batch(self, texts: List[str], tokens: int) -> Tuple[List, int]:
+        """Returns (vectors, retries used); raises after the last attempt"""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire(tokens)
+            try:
+                return self.embed(texts), attempt
+            except Exception as e:
+                if attempt == self.max_retries or not is_retryable(e):
+                    raise
+                delay = min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+
+    def run(self, items: Iterable[Tuple[str, str]]) -> Iterator[Dict]:
+        """
+        Yields one dict per batch: keys, vectors (None on failure), tokens,
+        retries, error
+        """
+        batches = token_batches(items, self.max_batch_tokens, self.max_batch_size)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="embed") as pool:
+            pending = {}
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < 2 * self.concurrency:
+                    batch = next(batches, None)
+                    if batch is None:
+                        exhausted = True
+                        break
+                    keys, texts, tokens = batch
+                    pending[pool.submit(self._embed_batch, texts, tokens)] = (keys, tokens)
+                if not pending:
+                    return
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    keys, tokens = pending.pop(future)
+                    try:
+                        vectors, retries = future.result()
+                        yield {"keys": keys, "vectors": vectors, "tokens": tokens, "retries": retries, "error": None}
+                    except Exception as e:
+                        yield {"keys": keys, "vectors": None, "tokens": tokens, "retries": None, "error": str(e)}
@@ -0,0 +1,132 @@
+"""
+Embedding providers - one interface for the index build and query embedding
+- OpenAI models (default): "text-embedding-3-small", ...
+- Local deterministic hashing embedder: "hashing-<dim>" (no API, no network)
+"""
+import os
+import re
+import threading
+import zlib
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from chromadb import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils import embedding_functions
+from chromadb.utils.embedding_functions import register_embedding_function
+
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+HASHING_PREFIX = "hashing"
+DEFAULT_HASHING_DIM = 512
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@register_embedding_function
+class HashingEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Local, deterministic text embedder (signed feature hashing)
+
+    Features are words, word bigrams and character trigrams of each word.
+    Each feature is hashed (crc32) to one of `dim` buckets with a +/- sign,
+    counts are log-scaled and the vector is L2-normalized. No vocabulary
+    or training, so the same text always gives the same vector on every
+    host; quality is lexical-level, not semantic, but good enough to build
+    and benchmark the whole pipeline offline.
+    """
+
+    # Local: no provider rate limits to respect (see embedding_pipeline)
+    rate_limited = False
+
+    def __init__(self, dim: int = DEFAULT_HASHING_DIM):
+        self.dim = int(dim)
+        self.model_name = f"{HASHING_PREFIX}-{self.dim}"
+
+    def _features(self, text: str) -> List[str]:
+        words = _WORD_RE.findall(text.lower())
+        features = list(words)
+        features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+        return features
+
+    def embed_text(self, text: str) -> np.ndarray:
+        hashes = np.fromiter(
+            (zlib.crc32(f.encode("utf-8")) for f in self._features(text)),
+            dtype=np.uint64
+        )
+        vector = np.zeros(self.dim, dtype=np.float32)
+        if len(hashes):
+            buckets = (hashes % self.dim).astype(np.int64)
+            signs = np.where(hashes & 0x80000000, -1.0, 1.0)
+            vector = np.bincount(buckets, weights=signs, minlength=self.dim).astype(np.float32)
+            vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return [self.embed_text(text) for text in input]
+
+    @staticmethod
+    def name() -> str:
+        return "movie_hashing"
+
+    def get_config(self) -> Dict:
+        return {"dim": self.dim}
+
+    @staticmethod
+    def build_from_config(config: Dict) -> "HashingEmbeddingFunction":
+        return HashingEmbeddingFunction(config.get("dim", DEFAULT_HASHING_DIM))
+
+
+def _hashing_provider(model: str, api_key: Optional[str]) -> EmbeddingFunction:
+    """ "hashing" or "hashing-<dim>" """
+    _, _, dim = model.partition("-")
+    return HashingEmbeddingFunction(int(dim) if dim else DEFAULT_HASHING_DIM)
+
+
+def _openai_provider(model: str, api_key: Optional[str]) -> EmbeddingFunction:
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError(
+            f"OPENAI_API_KEY not found in environment (needed for embedding model '{model}'; "
+            f"use '{HASHING_PREFIX}-{DEFAULT_HASHING_DIM}' for the local embedder)"
+        )
+    return embedding_functions.OpenAIEmbeddingFunction(api_key=api_key, model_name=model)
+
+
+# Model-name prefix -> factory(model, api_key); anything else is an OpenAI model
+_providers: Dict[str, Callable[[str, Optional[str]], EmbeddingFunction]] = {
+    HASHING_PREFIX: _hashing_provider,
+}
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def register_embedding_provider(prefix: str, factory: Callable[[str, Optional[str]], EmbeddingFunction]):
+    """Route model names "<prefix>" / "<prefix>-..." to factory(model, api_key)"""
+    _providers[prefix] = factory
+
+
+def get_embedding_function(model: str = DEFAULT_EMBEDDING_MODEL, api_key: Optional[str] = None) -> EmbeddingFunction:
+    """
+    Shared Chroma-compatible embedding function for a model name
+
+    Created on first use, so nothing here needs an API key at import time.
+    """
+    with _instances_lock:
+        if model not in _instances:
+            factory = _providers.get(model.split("-", 1)[0], _openai_provider)
+            _instances[model] = factory(model, api_key)
+        return _instances[model]
+
+
+def collection_name_for(base_name: str, model: str) -> str:
+    """
+    Chroma collection of a model: base name for the default model, suffixed otherwise
+
+    A collection keeps the embedding function (and dimension) it was created
+    with, so every model gets its own collection.
+    """
+    if model == DEFAULT_EMBEDDING_MODEL:
+        return base_name
+    return f"{base_name}_{re.sub(r'[^A-Za-z0-9_-]', '_', model)}"
@@ -0,0 +1,212 @@
+"""
+Lexical (BM25) index over titles and descriptions - SQLite FTS5
+Complements vector search for exact keywords: character names, places, titles
+"""
+import os
+import re
+import sqlite3
+from typing import Dict, List, Optional
+from vector_store import legacy_table_filter
+
+FTS_TABLE = "movies_fts"
+
+# Column weights for bm25(): a title match counts more than a description match
+TITLE_WEIGHT = 5.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Very common words are dropped from OR-queries (they match nearly every row)
+_STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is", "it",
+    "of", "on", "or", "that", "the", "this", "to", "with", "movie", "movies", "film",
+    "films", "show", "shows", "about", "like", "where", "who", "what", "which"
+}
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Filterable metadata fields -> UNINDEXED columns (same names as the vector index)
+_SCALAR_COLUMNS = {
+    "table": "table_name", "database": "database_name", "release_year": "release_year",
+    "type": "type", "rating": "rating", "duration_minutes": "duration_minutes", "seasons": "seasons"
+}
+# List fields are stored as "|value|value|" so $contains is a LIKE on "|value|"
+_LIST_COLUMNS = {"genres": "genres", "countries": "countries", "tables": "tables"}
+
+_SQL_OPERATORS = {"$eq": "=", "$ne": "!=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+
+
+def build_lexical_index(path: str, ids: List[str], movies: List[Dict]) -> int:
+    """
+    Write the FTS5 index (same ids as the vector index) to `path`
+
+    The database is built under a temporary name and renamed into place,
+    so readers never see a half-built index.
+
+    Titles of the other source rows of a deduplicated entry ("sources")
+    are indexed in other_titles, weighted like the title.
+
+    Args:
+        path: SQLite file of the index
+        ids: Vector index ids, one per movie
+        movies: Movie dicts (database, table, title, description, filters, optional sources)
+
+    Returns:
+        Number of indexed rows
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+
+    conn = sqlite3.connect(tmp)
+    try:
+        metadata_columns = ["id"] + list(_SCALAR_COLUMNS.values()) + list(_LIST_COLUMNS.values())
+        conn.execute(f"""
+            CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+                title, description, other_titles,
+                {", ".join(f"{col} UNINDEXED" for col in metadata_columns)},
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            )
+        """)
+
+        def row(id_, movie):
+            sources = movie.get('sources') or [{"title": movie['title'], "table": movie['table']}]
+            filters = {**movie.get('filters', {}), "tables": list(dict.fromkeys(s['table'] for s in sources))}
+            values = {"id": id_, "table_name": movie['table'], "database_name": movie['database']}
+            for field, col in _SCALAR_COLUMNS.items():
+                values.setdefault(col, filters.get(field))
+            for field, col in _LIST_COLUMNS.items():
+                values[col] = "|" + "|".join(filters[field]) + "|" if filters.get(field) else None
+            other_titles = " | ".join(dict.fromkeys(s['title'] for s in sources if s['title'] != movie['title']))
+            return [movie['title'], movie['description'], other_titles] + [values[col] for col in metadata_columns]
+
+        conn.executemany(
+            f"INSERT INTO {FTS_TABLE} (title, description, other_titles, {', '.join(metadata_columns)}) "
+            f"VALUES ({', '.join('?' for _ in range(len(metadata_columns) + 3))})",
+            [row(id_, m) for id_, m in zip(ids, movies)]
+        )
+        # Merge FTS segments once: smaller index, faster queries
+        conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    os.replace(tmp, path)
+    return len(ids)
+
+
+def to_match_query(text: str) -> Optional[str]:
+    """
+    Free text -> FTS5 MATCH expression
+
+    Every remaining word is quoted (so user text can never be FTS syntax)
+    and OR-ed; BM25 ranks rows matching more and rarer words first.
+    """
+    tokens = [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1 and t not in _STOP_WORDS]
+    if not tokens:
+        return None
+    return " OR ".join(f'"{t}"' for t in dict.fromkeys(tokens))
+
+
+def where_to_sql(where: Dict) -> tuple:
+    """
+    Chroma-style filter (see vector_store.LoadedIndex.mask) -> SQL condition + params
+
+    Raises:
+        ValueError: unknown field or operator
+    """
+    clauses, params = [], []
+    for key, value in where.items():
+        if key in ("$and", "$or"):
+            parts = [where_to_sql(clause) for clause in value]
+            joiner = " AND " if key == "$and" else " OR "
+            clauses.append("(" + joiner.join(sql for sql, _ in parts) + ")")
+            for _, part_params in parts:
+                params.extend(part_params)
+            continue
+
+        condition = value if isinstance(value, dict) else {"$eq": value}
+        for op, operand in condition.items():
+            if key in _LIST_COLUMNS and op == "$contains":
+                clauses.append(f"{_LIST_COLUMNS[key]} LIKE ? ESCAPE '\\'")
+                escaped = str(operand).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                params.append(f"%|{escaped}|%")
+            elif key in _SCALAR_COLUMNS and op in _SQL_OPERATORS:
+                clauses.append(f"{_SCALAR_COLUMNS[key]} {_SQL_OPERATORS[op]} ?")
+                params.append(operand)
+            elif key in _SCALAR_COLUMNS and op in ("$in", "$nin"):
+                placeholders = ", ".join("?" for _ in operand) or "NULL"
+                clauses.append(f"{_SCALAR_COLUMNS[key]} {'IN' if op == '$in' else 'NOT IN'} ({placeholders})")
+                params.extend(operand)
+            else:
+                raise ValueError(f"Unsupported lexical filter: {key} {op}")
+
+    return " AND ".join(clauses) or "1", params
+
+
+class LexicalIndex:
+    """
+    Read side of the FTS5 index
+
+    Connections come from a read-only SQLiteConnectionPool (one per worker
+    thread, reopened automatically when the index file is rebuilt).
+    Hits use the VectorStore format; distance is None and "bm25" holds the
+    relevance (higher is better). Table filters on an index built before
+    the "tables" column existed fall back to its single table column.
+    """
+
+    def __init__(self, path: str, pool):
+        """
+        Args:
+            path: SQLite file written by build_lexical_index
+            pool: tools.sql_pool.SQLiteConnectionPool to read it with
+        """
+        self.path = path
+        self.pool = pool
+        self._has_tables = None   # (file version, index has the "tables" column)
+
+    def available(self) -> bool:
+        return os.path.exists(self.path)
+
+    def _has_tables_column(self, conn) -> bool:
+        """True if the index has the "tables" column (rechecked when the file changes)"""
+        stat = os.stat(self.path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        checked = self._has_tables
+        if checked is None or checked[0] != version:
+            columns = {row[1] for row in conn.execute(f"PRAGMA table_info({FTS_TABLE})")}
+            checked = (version, "tables" in columns)
+            self._has_tables = checked
+        return checked[1]
+
+    def search(self, query: str, n_results: int = 5, where: Optional[Dict] = None) -> List[Dict]:
+        match = to_match_query(query)
+        if match is None:
+            return []
+
+        sql = (
+            f"SELECT id, title, description, database_name, table_name, "
+            f"-bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}, {TITLE_WEIGHT}) AS score "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH ?"
+        )
+        params = [match]
+        conn = self.pool.connection(self.path)
+        if where:
+            if not self._has_tables_column(conn):
+                where = legacy_table_filter(where)
+            condition, condition_params = where_to_sql(where)
+            sql += f" AND {condition}"
+            params.extend(condition_params)
+        sql += " ORDER BY score DESC LIMIT ?"
+        params.append(n_results)
+
+        rows = conn.execute(sql, params).fetchall()
+        return [
+            {
+                "id": id_,
+                "document": description,
+                "metadata": {"title": title, "database": database, "table": table},
+                "distance": None,
+                "bm25": round(score, 4)
+            }
+            for id_, title, description, database, table, score in rows
+        ]
@@ -1,25 +1,18 @@
 """
 Evaluator node - assess result sufficiency and decide to continue or replan
 """
+from typing import Optional
 from core.state import AgentState
 from core.models import EvaluatorDecision
 from prompts.evaluator_prompts import build_evaluator_prompt
 from config import llm
 
 
-def evaluator_node(state: AgentState) -> dict:
-    """
-    Assess if tool results are sufficient to answer the question
-
-    Returns decision to continue (synthesize) or replan (loop back)
-    """
-    question = state.get("original_question", "")
-    plan = state.get("execution_plan", {})
-    tool_results = state.get("tool_results", {})
+def _forced_decision(state: AgentState) -> Optional[dict]:
+    """Force synthesis if max iterations reached (safety)"""
     iteration = state.get("iteration_count", 0)
     max_iterations = state.get("max_iterations", 2)
 
-    # Force synthesis if max iterations reached (safety)
     if iteration >= max_iterations:
         return {
             "evaluator_decision": "continue",
@@ -27,31 +20,72 @@ def evaluator_node(state: AgentState) -> dict:
             "replan_instructions": "",
             "evaluator_confidence": 0.5
         }
+    return None
+
 
-    # Build evaluation prompt
-    prompt = build_evaluator_prompt(
-        question=question,
-        execution_plan=plan,
-        tool_results=tool_results
+def _build_prompt(state: AgentState) -> str:
+    """Build evaluation prompt from the current state"""
+    return build_evaluator_prompt(
+        question=state.get("original_question", ""),
+        execution_plan=state.get("execution_plan", {}),
+        tool_results=state.get("tool_results", {})
     )
 
+
+def _decision_update(decision: EvaluatorDecision) -> dict:
+    """State update for an LLM decision"""
+    return {
+        "evaluator_decision": decision.decision,
+        "evaluator_reasoning": decision.reasoning,
+        "replan_instructions": decision.replan_instructions or "",
+        "evaluator_confidence": decision.confidence
+    }
+
+
+def _fallback_update(error: Exception) -> dict:
+    """Fallback: continue with what we have"""
+    return {
+        "evaluator_decision": "continue",
+        "evaluator_reasoning": f"Evaluation error: {str(error)}, proceeding with available data",
+        "replan_instructions": "",
+        "evaluator_confidence": 0.0
+    }
+
+
+def evaluator_node(state: AgentState) -> dict:
+    """
+    Assess if tool results are sufficient to answer the question
+
+    Returns decision to continue (synthesize) or replan (loop back)
+    """
+    forced = _forced_decision(state)
+    if forced:
+        return forced
+
+    prompt = _build_prompt(state)
+
     # Get structured decision from LLM
     structured_llm = llm.with_structured_output(EvaluatorDecision)
 
     try:
         decision = structured_llm.invoke(prompt)
+        return _decision_update(decision)
+    except Exception as e:
+        return _fallback_update(e)
 
-        return {
-            "evaluator_decision": decision.decision,
-            "evaluator_reasoning": decision.reasoning,
-            "replan_instructions": decision.replan_instructions or "",
-            "evaluator_confidence": decision.confidence
-        }
+
+async def evaluator_node_async(state: AgentState) -> dict:
+    """Async variant of evaluator_node, used by the async graph"""
+    forced = _forced_decision(state)
+    if forced:
+        return forced
+
+    prompt = _build_prompt(state)
+
+    structured_llm = llm.with_structured_output(EvaluatorDecision)
+
+    try:
+        decision = await structured_llm.ainvoke(prompt)
+        return _decision_update(decision)
     except Exception as e:
-        # Fallback: continue with what we have
-        return {
-            "evaluator_decision": "continue",
-            "evaluator_reasoning": f"Evaluation error: {str(e)}, proceeding with available data",
-            "replan_instructions": "",
-            "evaluator_confidence": 0.0
-        }
+        return _fallback_update(e)
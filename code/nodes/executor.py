@@ -2,12 +2,86 @@
 Executor node - parallel tool execution
 """
 import asyncio
+import time
+from typing import Awaitable, Callable, Optional
 from core.state import AgentState
-from core.models import ExecutionPlan
-from tools.sql_tool import execute_sql_async
-from tools.semantic_tool import execute_semantic_async
-from tools.omdb_tool import execute_omdb_async
+from core.models import ExecutionPlan, ToolResult
+from core.runtime import run_sync
+from tools.sql_tool import execute_sql_tasks_async
+from tools.semantic_tool import execute_semantic_queries_async
+from tools.omdb_tool import execute_omdb_tasks_async, omdb_tasks_from_results
 from tools.web_tool import execute_web_async
+from config import TOOL_DEADLINES, TOOL_HEDGE_AFTER, EXECUTOR_DEADLINE_SECONDS
+
+
+async def _hedged(call: Callable[[], Awaitable[ToolResult]], hedge_after: Optional[float]) -> ToolResult:
+    """
+    Run a tool call, racing a duplicate if the first one is slow
+
+    If the call has not finished after hedge_after seconds, an identical
+    call is started and the first successful result wins; the loser is
+    cancelled. hedge_after=None disables hedging.
+    """
+    if not hedge_after:
+        return await call()
+
+    tasks = [asyncio.ensure_future(call())]
+    try:
+        done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+        if not done:
+            tasks.append(asyncio.ensure_future(call()))
+
+        result = None
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if result.ok:
+                    return result
+        return result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _run_with_deadline(name: str, call: Callable[[], Awaitable[ToolResult]]) -> ToolResult:
+    """Run one tool under its own deadline (TOOL_DEADLINES), with optional hedging"""
+    deadline = TOOL_DEADLINES.get(name)
+    started = time.perf_counter()
+
+    try:
+        return await asyncio.wait_for(_hedged(call, TOOL_HEDGE_AFTER.get(name)), timeout=deadline)
+    except asyncio.TimeoutError:
+        return _timed_out(name, started, f"{name} timed out after {deadline:g}s")
+    except Exception as e:
+        return ToolResult(tool=name, error=str(e))
+
+
+async def _omdb_after_results(plan: ExecutionPlan, upstream: dict) -> ToolResult:
+    """
+    OMDb lookups for the planned titles + the titles SQL/semantic return in this pass
+
+    Waits for the upstream tools, so enrichment questions ("who directed
+    the top 5 thrillers") need no replan; the OMDb deadline starts once
+    the titles are known.
+    """
+    if upstream:
+        await asyncio.wait(upstream.values())
+    found = [task.result() for task in upstream.values() if not task.cancelled()]
+    omdb_tasks = list(plan.omdb_queries) + omdb_tasks_from_results(found)
+    if not omdb_tasks:
+        return ToolResult(tool="omdb", error="No titles to look up in SQL/semantic results")
+    return await _run_with_deadline("omdb", lambda: execute_omdb_tasks_async(omdb_tasks))
+
+
+def _timed_out(name: str, started: float, message: str) -> ToolResult:
+    return ToolResult(
+        tool=name,
+        error=message,
+        error_type="timeout",
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2)
+    )
 
 
 async def executor_node(state: AgentState) -> dict:
@@ -15,35 +89,46 @@ async def executor_node(state: AgentState) -> dict:
     Execute all planned tools in parallel
 
     No LLM call - pure orchestration
-    Returns results dict with error handling per tool
+    Every tool returns a ToolResult; it is stored in state as a plain dict
+    (tool, error, elapsed_ms, truncated, row_count, note, data; unset
+    fields are dropped to keep prompts short)
+
+    Each tool has its own deadline (TOOL_DEADLINES) and the whole node has
+    EXECUTOR_DEADLINE_SECONDS: when time runs out, finished results are
+    returned and the rest are reported with error_type "timeout". Work
+    already handed to a thread cannot be killed, but nobody waits for it
+    (SQL queries also stop themselves via their own time budget).
+
+    OMDb titles are looked up concurrently; with omdb_from_results the
+    lookups start as soon as SQL/semantic return their titles.
     """
     plan_dict = state.get("execution_plan", {})
     plan = ExecutionPlan(**plan_dict)
     catalog = state.get("db_catalog", {})
     previous_results = state.get("previous_results", {})
 
-    # Gather async tasks
-    tasks = []
-    tool_names = []
+    # Tool calls as factories, so hedging can start a duplicate
+    calls = {}
 
-    if plan.use_sql and plan.sql_query and plan.sql_database:
-        tasks.append(execute_sql_async(plan.sql_query, plan.sql_database, catalog))
-        tool_names.append("sql")
+    if plan.use_sql and plan.sql_queries:
+        # All SQL queries run concurrently, each with its own result/error
+        calls["sql"] = lambda: execute_sql_tasks_async(plan.sql_queries, catalog)
 
-    if plan.use_semantic and plan.semantic_query:
-        tasks.append(execute_semantic_async(plan.semantic_query, plan.semantic_n_results))
-        tool_names.append("semantic")
+    if plan.use_semantic and plan.semantic_queries:
+        # All phrasings share one embedding call; results are rank-fused
+        calls["semantic"] = lambda: execute_semantic_queries_async(plan.semantic_queries, plan.semantic_n_results)
 
-    if plan.use_omdb and plan.omdb_title:
-        tasks.append(execute_omdb_async(plan.omdb_title))
-        tool_names.append("omdb")
+    # Titles known up front are looked up concurrently with the other tools;
+    # with omdb_from_results the lookups wait for SQL/semantic (below)
+    enrich = plan.use_omdb and plan.omdb_from_results
+    if plan.use_omdb and plan.omdb_queries and not enrich:
+        calls["omdb"] = lambda: execute_omdb_tasks_async(plan.omdb_queries)
 
     if plan.use_web and plan.web_query:
-        tasks.append(execute_web_async(plan.web_query, plan.web_n_results))
-        tool_names.append("web")
+        calls["web"] = lambda: execute_web_async(plan.web_query, plan.web_n_results)
 
     # Execute in parallel
-    if not tasks:
+    if not calls and not enrich:
         # No tools selected
         return {
             "tool_results": {},
@@ -51,19 +136,27 @@ async def executor_node(state: AgentState) -> dict:
             "sources_used": []
         }
 
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    started = time.perf_counter()
+    tasks = {name: asyncio.ensure_future(_run_with_deadline(name, call)) for name, call in calls.items()}
+    if enrich:
+        upstream = {name: task for name, task in tasks.items() if name in ("sql", "semantic")}
+        tasks["omdb"] = asyncio.ensure_future(_omdb_after_results(plan, upstream))
+    await asyncio.wait(tasks.values(), timeout=EXECUTOR_DEADLINE_SECONDS)
 
-    # Build results dict
+    # Build results dict (partial if the executor deadline was hit)
     tool_results = {}
     sources = []
 
-    for name, result in zip(tool_names, results):
-        if isinstance(result, Exception):
-            tool_results[name] = {"error": str(result)}
+    for name, task in tasks.items():
+        if task.done():
+            result = task.result()
         else:
-            tool_results[name] = result
-            if not result.get("error"):
-                sources.append(name)
+            task.cancel()
+            result = _timed_out(name, started, f"{name} still running at executor deadline ({EXECUTOR_DEADLINE_SECONDS:g}s)")
+
+        tool_results[name] = result.model_dump(exclude_none=True)
+        if result.ok:
+            sources.append(name)
 
     # Merge with previous results (for loop context)
     all_results = {**previous_results, **tool_results}
@@ -79,7 +172,9 @@ def executor_node_sync(state: AgentState) -> dict:
     """
     Synchronous wrapper for executor_node
 
-    LangGraph requires synchronous functions by default,
-    so this wrapper runs the async executor_node using asyncio.run()
+    Used by the sync graph (app.invoke / app.stream). Runs executor_node on
+    the shared long-lived event loop instead of creating one per call, so it
+    also works when the caller already has a running loop.
+    The async graph uses executor_node directly.
     """
-    return asyncio.run(executor_node(state))
+    return run_sync(executor_node(state))
@@ -7,6 +7,39 @@ from prompts.planner_prompts import build_planner_prompt
 from config import llm
 
 
+def _build_prompt(state: AgentState) -> str:
+    """Build the planner prompt from the current state"""
+    iteration = state.get("iteration_count", 0)
+    history = state.get("messages", [])
+
+    return build_planner_prompt(
+        question=state.get("original_question", ""),
+        history=history[-5:] if history else [],
+        catalog=state.get("db_catalog", {}),
+        is_replanning=(iteration > 0),
+        previous_plans=state.get("previous_plans", []),
+        previous_results=state.get("previous_results", {}),
+        replan_instructions=state.get("replan_instructions", "")
+    )
+
+
+def _plan_update(state: AgentState, plan: ExecutionPlan) -> dict:
+    """State update for a new plan"""
+    return {
+        "execution_plan": plan.model_dump(),
+        "iteration_count": state.get("iteration_count", 0) + 1,
+        "previous_plans": state.get("previous_plans", []) + [plan.model_dump()]
+    }
+
+
+def _fallback_plan(state: AgentState, error: Exception) -> ExecutionPlan:
+    """Fallback: no tools selected"""
+    return ExecutionPlan(
+        reasoning=f"Planning error: {str(error)}",
+        resolved_query=state.get("original_question", "")
+    )
+
+
 def planner_node(state: AgentState) -> dict:
     """
     Analyze query and create execution plan
@@ -14,46 +47,26 @@ def planner_node(state: AgentState) -> dict:
     Uses LLM with structured output to decide which tools to use
     and prepare specific queries for each tool.
     """
-    question = state.get("original_question", "")
-    history = state.get("messages", [])
-    catalog = state.get("db_catalog", {})
-    iteration = state.get("iteration_count", 0)
-
-    # Context from previous iteration (if looping)
-    previous_plans = state.get("previous_plans", [])
-    previous_results = state.get("previous_results", {})
-    replan_instructions = state.get("replan_instructions", "")
-
-    # Build prompt
-    prompt = build_planner_prompt(
-        question=question,
-        history=history[-5:] if history else [],
-        catalog=catalog,
-        is_replanning=(iteration > 0),
-        previous_plans=previous_plans,
-        previous_results=previous_results,
-        replan_instructions=replan_instructions
-    )
+    prompt = _build_prompt(state)
 
     # Get structured output from LLM
     structured_llm = llm.with_structured_output(ExecutionPlan)
 
     try:
         plan = structured_llm.invoke(prompt)
+        return _plan_update(state, plan)
+    except Exception as e:
+        return _plan_update(state, _fallback_plan(state, e))
+
+
+async def planner_node_async(state: AgentState) -> dict:
+    """Async variant of planner_node, used by the async graph"""
+    prompt = _build_prompt(state)
 
-        return {
-            "execution_plan": plan.model_dump(),
-            "iteration_count": iteration + 1,
-            "previous_plans": previous_plans + [plan.model_dump()]
-        }
+    structured_llm = llm.with_structured_output(ExecutionPlan)
+
+    try:
+        plan = await structured_llm.ainvoke(prompt)
+        return _plan_update(state, plan)
     except Exception as e:
-        # Fallback: no tools selected
-        fallback_plan = ExecutionPlan(
-            reasoning=f"Planning error: {str(e)}",
-            resolved_query=question
-        )
-        return {
-            "execution_plan": fallback_plan.model_dump(),
-            "iteration_count": iteration + 1,
-            "previous_plans": previous_plans + [fallback_plan.model_dump()]
-        }
+        return _plan_update(state, _fallback_plan(state, e))
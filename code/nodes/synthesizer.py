@@ -7,6 +7,22 @@ from prompts.synthesizer_prompts import build_synthesizer_prompt
 from config import llm
 
 
+def _build_prompt(state: AgentState) -> str:
+    """Build synthesis prompt from all accumulated results"""
+    return build_synthesizer_prompt(
+        question=state.get("original_question", ""),
+        tool_results=state.get("previous_results", {}),
+        sources=state.get("sources_used", [])
+    )
+
+
+def _error_message(error: Exception) -> dict:
+    """Fallback answer when the LLM call fails"""
+    return {
+        "messages": [AIMessage(content=f"I apologize, but I encountered an error generating the response: {str(error)}")]
+    }
+
+
 def synthesizer_node(state: AgentState) -> dict:
     """Generate final answer from all tool results
 
@@ -19,16 +35,7 @@ def synthesizer_node(state: AgentState) -> dict:
     Returns:
         Dictionary with messages list containing the synthesized answer
     """
-    question = state.get("original_question", "")
-    all_results = state.get("previous_results", {})
-    sources = state.get("sources_used", [])
-
-    # Build synthesis prompt
-    prompt = build_synthesizer_prompt(
-        question=question,
-        tool_results=all_results,
-        sources=sources
-    )
+    prompt = _build_prompt(state)
 
     # Generate response
     try:
@@ -38,7 +45,18 @@ def synthesizer_node(state: AgentState) -> dict:
             "messages": [AIMessage(content=response.content)]
         }
     except Exception as e:
-        # Fallback
+        return _error_message(e)
+
+
+async def synthesizer_node_async(state: AgentState) -> dict:
+    """Async variant of synthesizer_node, used by the async graph"""
+    prompt = _build_prompt(state)
+
+    try:
+        response = await llm.ainvoke(prompt)
+
         return {
-            "messages": [AIMessage(content=f"I apologize, but I encountered an error generating the response: {str(e)}")]
+            "messages": [AIMessage(content=response.content)]
         }
+    except Exception as e:
+        return _error_message(e)
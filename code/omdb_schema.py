@@ -0,0 +1,49 @@
+"""
+Schema of the local OMDb metadata mirror (omdb_metadata table)
+
+Dependency-free (no config import), so the index builds can skip the
+table without needing API keys.
+"""
+
+MIRROR_TABLE = "omdb_metadata"
+
+# OMDb response field -> mirror column (text columns, stored as returned)
+TEXT_FIELDS = {
+    "imdbID": "imdb_id",
+    "Title": "omdb_title",
+    "Year": "omdb_year",
+    "Type": "type",
+    "Rated": "rated",
+    "Released": "released",
+    "Genre": "genre",
+    "Director": "director",
+    "Writer": "writer",
+    "Actors": "actors",
+    "Plot": "plot",
+    "Language": "language",
+    "Country": "country",
+    "Awards": "awards",
+    "Poster": "poster",
+}
+
+MIRROR_SCHEMA = f"""
+    CREATE TABLE IF NOT EXISTS {MIRROR_TABLE} (
+        title TEXT NOT NULL,
+        release_year INTEGER NOT NULL,
+        title_key TEXT NOT NULL,
+        status TEXT NOT NULL,
+        imdb_rating REAL,
+        imdb_votes INTEGER,
+        metascore INTEGER,
+        runtime_minutes INTEGER,
+        {", ".join(f"{column} TEXT" for column in TEXT_FIELDS.values())},
+        fetched_at TEXT NOT NULL,
+        PRIMARY KEY (title, release_year)
+    )
+"""
+
+MIRROR_INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS {MIRROR_TABLE}_title_key ON {MIRROR_TABLE} (title_key, release_year)",
+    f"CREATE INDEX IF NOT EXISTS {MIRROR_TABLE}_imdb_id ON {MIRROR_TABLE} (imdb_id)",
+    f"CREATE INDEX IF NOT EXISTS {MIRROR_TABLE}_rating ON {MIRROR_TABLE} (imdb_rating)",
+]
@@ -76,6 +76,9 @@ CONTINUE (sufficient data) if:
 REPLAN (insufficient data) if:
 - Missing critical information (e.g., need plot but only have titles)
 - Tools returned errors or empty results
+- A SQL result has error_type "too_expensive": ask for a cheaper, more selective query
+  (explicit join conditions, WHERE filters, LIMIT, one query per table instead of joins)
+- A tool has error_type "timeout" and the other results cannot answer the question
 - Different tools might provide better information
 - Question requires data we haven't fetched yet
 
@@ -42,20 +42,36 @@ MANDATORY TOOL SELECTION RULES (check in this order):
 1. OMDB API - Visual/Metadata Requests
    Triggers: poster, image, cover, artwork, cast, actors, director, awards, plot details, who directed, who acted, who starred
    Action: OMDB ONLY (unless combined with "top", "best", "highest rated")
-   Reason: These fields do not exist in SQL databases
+   Reason: These fields do not exist in the platform tables
+   Exception: if the catalog lists omdb.omdb_metadata (local OMDb mirror, attached to
+   the database), rankings and filters on IMDb rating/votes, metascore, runtime or
+   awards are SQL - JOIN it on title AND release_year (status = 'found'),
+   e.g. "highest rated thrillers on Netflix"
    IMPORTANT: If asking about a SPECIFIC movie's metadata → OMDB ONLY, no SQL needed
+   Several titles: one omdb_queries entry per title ({title, year} or {imdb_id}),
+   all looked up concurrently in one call
+   Titles not known yet ("the top 5 thrillers"): set omdb_from_results=true with
+   SQL or Semantic - the titles they return are looked up in the SAME pass (no replan)
 
 2. Semantic Search - Qualitative/Similarity Requests
    Triggers: mood, atmosphere, theme, ambiance, tone, like, similar, vibe, feeling, style, dark, intense, suspense, mystery, investigation, emotional, uplifting
-   Action: Semantic ONLY (unless combined with structured filters like year/rating)
+   Action: Semantic ONLY (year/type/genre/rating/country/duration go in its filters)
    Query: Convert concept to descriptive natural language phrase
+   Several phrasings: put 1-3 entries in semantic_queries (alternative phrasings,
+   or one per platform with table_filter) - they are searched together in one call
+   and merged, so prefer this over a replan with a new phrasing
+   Filters: each entry may carry "filters" applied INSIDE the semantic index:
+   year_min/year_max, types (e.g. ["Movie"]), ratings, genres and countries (any of,
+   use listed_in / country values from the catalog), duration_min/duration_max
+   (minutes), seasons_min/seasons_max. Semantic + filters replaces SQL + Semantic
+   when the structured part only narrows the candidates (year, type, genre, rating)
    Reason: Vector embeddings handle conceptual similarity SQL cannot
    IMPORTANT: If query is purely descriptive/qualitative → Semantic ONLY, no SQL needed
 
 3. SQL Database - Structured Queries
    Triggers: how many, count, filter by, genre, year, rating, type, top N, aggregation, highest rated, best, from [year]
    Action: MUST set use_sql=True
-   Special: For "how many" queries → query EACH database separately
+   Special: For "how many" queries → one entry in sql_queries per database/table
    Reason: Synthesizer will show detail per DB + aggregated total
 
 4. Web Search - Current Events Only
@@ -78,11 +94,12 @@ Single Tool Cases (NEVER add extra tools):
 - "Films like [movie]": Semantic only (similarity)
 - "How many genres": SQL only (all databases)
 - "Movies from 2020": SQL only (structured filter)
+- "Dark sci-fi from 2020": Semantic only (year range in semantic filters)
 
 Multi-Tool Cases (ONLY when both needed):
-- "Poster for top rated movie": SQL (find top rated) + OMDB (get poster)
-- "Dark sci-fi from 2020": SQL (year filter) + Semantic (dark atmosphere)
-- "Who directed the highest rated thriller?": SQL (find movie) + OMDB (get director)
+- "Poster for top rated movie": SQL (find top rated) + OMDB (get poster, omdb_from_results)
+- "Who directed the highest rated thriller?": SQL (find movie) + OMDB (get director, omdb_from_results)
+- "Who directed the top 5 thrillers?": SQL (LIMIT 5) + OMDB (omdb_from_results) - one pass
 
 ANTI-PATTERNS (What NOT to do):
 - DON'T use SQL for simple OMDB queries like "Who directed Inception?"
@@ -92,15 +109,15 @@ ANTI-PATTERNS (What NOT to do):
 SQL AGGREGATION RULES:
 
 For counting/aggregation queries:
-1. Identify ALL available databases from catalog
-2. Generate separate SQL query for EACH database
-3. Executor will run queries in parallel
+1. Identify ALL available databases and tables from catalog
+2. Put one {database, query} entry in sql_queries for EACH of them (same plan, no replanning)
+3. Executor will run all sql_queries in parallel and return one result per entry
 4. Synthesizer will aggregate results and show:
    - Detail per database: "DB1: 329, DB2: 514, DB3: 518"
    - Total: "Total: 518 unique genres across all databases"
 
 Example: "How many genres are in our databases?"
-→ Query each database separately for genre count
+→ One sql_queries entry per database/table for genre count, all in this single plan
 → Synthesizer combines: detail + total
 
 FEW-SHOT EXAMPLES:
@@ -109,14 +126,16 @@ Example 1: Poster Request (OMDB Only)
 Q: "Show me the poster for Ex Machina"
 Correct Plan:
   use_omdb: true
-  omdb_title: "Ex Machina"
+  omdb_queries:
+    - title: "Ex Machina"
   reasoning: "'poster' + specific movie → OMDB ONLY (no SQL needed)"
 
 Example 2: Director Query (OMDB Only)
 Q: "Who directed Inception?"
 Correct Plan:
   use_omdb: true
-  omdb_title: "Inception"
+  omdb_queries:
+    - title: "Inception"
   reasoning: "Specific movie metadata (director) → OMDB ONLY (no SQL needed)"
 WRONG Plan:
   use_sql: true + use_omdb: true
@@ -126,7 +145,9 @@ Example 3: Pure Qualitative Search (Semantic Only)
 Q: "Dark investigation movies with suspense"
 Correct Plan:
   use_semantic: true
-  semantic_query: "dark investigation thriller mystery suspense atmosphere tense"
+  semantic_queries:
+    - query: "dark investigation thriller mystery suspense atmosphere tense"
+    - query: "detective solving a murder case in a gloomy town"
   reasoning: "Pure mood/atmosphere query → Semantic ONLY (no SQL needed)"
 WRONG Plan:
   use_sql: true + use_semantic: true
@@ -136,33 +157,50 @@ Example 4: Semantic Similarity (Semantic Only)
 Q: "Movies like Blade Runner"
 Correct Plan:
   use_semantic: true
-  semantic_query: "dystopian cyberpunk noir future artificial intelligence replicants"
+  semantic_queries:
+    - query: "dystopian cyberpunk noir future artificial intelligence replicants"
   reasoning: "'like' keyword → semantic ONLY with descriptive query, NOT just title"
 
 Example 5: SQL Aggregation (SQL Only)
 Q: "How many genres are in our databases?"
 Correct Plan:
   use_sql: true
-  sql_query: "SELECT COUNT(DISTINCT genre) FROM [table]" (for EACH database)
+  sql_queries:
+    - database: "[database]", query: "SELECT COUNT(DISTINCT genre) FROM [table_1]"
+    - database: "[database]", query: "SELECT COUNT(DISTINCT genre) FROM [table_2]"
+    (one entry for EACH database/table)
   reasoning: "'how many' detected → SQL ONLY on all databases for aggregation"
 
 Example 6: Combination Query (SQL + OMDB)
 Q: "Poster for the highest rated thriller from 2020"
 Correct Plan:
   use_sql: true
-  sql_query: "SELECT title FROM movies WHERE genre='Thriller' AND year=2020 ORDER BY rating DESC LIMIT 1"
+  sql_queries:
+    - database: "[database]", query: "SELECT title FROM movies WHERE genre='Thriller' AND year=2020 ORDER BY rating DESC LIMIT 1"
   use_omdb: true
-  omdb_title: "<result>" # (title from SQL result)
+  omdb_from_results: true   # title comes from the SQL result, same pass
   reasoning: "SQL finds movie (structured filters), OMDB gets poster - BOTH needed"
 
-Example 7: Combination Query (SQL + Semantic)
+Example 6b: Several Known Titles (OMDB Only)
+Q: "Compare the cast of Dune (2021) and Blade Runner 2049"
+Correct Plan:
+  use_omdb: true
+  omdb_queries:
+    - title: "Dune", year: 2021
+    - title: "Blade Runner 2049"
+  reasoning: "Metadata of two specific movies → ONE OMDB call with both titles (not one per replan)"
+
+Example 7: Mood + Structured Filters (Semantic with filters)
 Q: "Dark sci-fi from 2015-2020"
 Correct Plan:
-  use_sql: true
-  sql_query: "SELECT * FROM movies WHERE year BETWEEN 2015 AND 2020"
   use_semantic: true
-  semantic_query: "dark science fiction dystopian atmosphere"
-  reasoning: "SQL filters by year, Semantic finds dark atmosphere - BOTH needed"
+  semantic_queries:
+    - query: "dark science fiction dystopian atmosphere"
+      filters: {year_min: 2015, year_max: 2020}
+  reasoning: "Mood → Semantic; year range is a filter applied inside the index - ONE tool"
+WRONG Plan:
+  use_sql: true + use_semantic: true
+  reasoning: "DON'T add SQL just to filter by year - semantic filters do it in one call"
 
 """
 
@@ -201,7 +239,8 @@ CRITICAL RULES:
 - Only combine tools when query has BOTH structured + qualitative elements
 - Semantic queries MUST be descriptive (not just keywords)
 - SQL queries MUST use exact table/column names from catalog above
-- OMDB titles should be exact movie names (not descriptions)
+- SQL database names MUST be exact database names from catalog above
+- OMDB titles should be exact movie names (not descriptions); add the year when known
 - DON'T add extra tools "just to be safe" - be precise and efficient
 - Resolve references from conversation history
 """
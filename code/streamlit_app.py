@@ -4,8 +4,9 @@ import time
 import os
 
 from utils import build_db_catalog
-from core.agent import app
-from config import OPENAI_API_KEY, DB_FOLDER_PATH, LANGFUSE_SECRET_KEY, LANGFUSE_PUBLIC_KEY, LANGFUSE_HOST
+from core.agent import async_app
+from core.runtime import iterate_sync
+from config import OPENAI_API_KEY, DB_FOLDER_PATH, SQL_ATTACHED_DATABASES, LANGFUSE_SECRET_KEY, LANGFUSE_PUBLIC_KEY, LANGFUSE_HOST
 
 # Set Langfuse environment variables explicitly
 os.environ["LANGFUSE_SECRET_KEY"] = LANGFUSE_SECRET_KEY
@@ -216,12 +217,13 @@ if "agent_messages" not in st.session_state:
 
 if "db_catalog" not in st.session_state:
     with st.spinner("⏳ Loading databases..."):
-        catalog = build_db_catalog(DB_FOLDER_PATH)
+        catalog = build_db_catalog(DB_FOLDER_PATH, SQL_ATTACHED_DATABASES)
         st.session_state.db_catalog = catalog
 
 if "thread_id" not in st.session_state:
     st.session_state.thread_id = "session_1"
 
+
 # =================================
 # Header
 # =================================
@@ -428,7 +430,8 @@ if prompt:
                   "callbacks": [langfuse_handler]}
 
         result = None
-        for step in app.stream(inputs, config=config, stream_mode="values"):
+        # Async graph on the shared event loop (one loop for all sessions)
+        for step in iterate_sync(async_app.astream(inputs, config=config, stream_mode="values")):
             result = step
             current = step.get("current_step", "")
 
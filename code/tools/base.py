@@ -0,0 +1,49 @@
+"""
+Shared helpers for tool execution
+"""
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable
+from core.models import ToolResult
+
+
+async def run_tool_in_thread(tool_name: str, func: Callable[..., ToolResult], *args, **kwargs) -> ToolResult:
+    """
+    Run a sync tool function in the thread pool and time it
+
+    Any exception is turned into a ToolResult error, so callers never
+    have to parse or catch anything.
+    """
+    started = time.perf_counter()
+    try:
+        result = await asyncio.to_thread(func, *args, **kwargs)
+    except Exception as e:
+        result = ToolResult(tool=tool_name, error=f"{tool_name} failed: {str(e)}")
+
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+async def run_tool_async(tool_name: str, func: Callable[..., Awaitable[ToolResult]], *args, **kwargs) -> ToolResult:
+    """
+    Await a native async tool function and time it
+
+    Same contract as run_tool_in_thread, for tools doing non-blocking I/O
+    on the event loop (no worker thread).
+    """
+    started = time.perf_counter()
+    try:
+        result = await func(*args, **kwargs)
+    except Exception as e:
+        result = ToolResult(tool=tool_name, error=f"{tool_name} failed: {str(e)}")
+
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def tool_result_to_json(result: ToolResult) -> str:
+    """String adapter for the LangChain @tool interface: data or {"error": ...}"""
+    if result.error:
+        return json.dumps({"error": result.error})
+    return json.dumps(result.data, indent=2, default=str)
@@ -0,0 +1,68 @@
+"""
+Shared async HTTP client - pooled keep-alive connections for outbound tool calls
+"""
+import asyncio
+import importlib.util
+import weakref
+import httpx
+from config import (
+    HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS, HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    HTTP_TIMEOUT_SECONDS, HTTP_CONNECT_TIMEOUT_SECONDS
+)
+
+# HTTP/2 needs the optional "h2" package (pip install "httpx[http2]");
+# without it the client speaks HTTP/1.1 over the same pooled connections
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+class AsyncHTTPPool:
+    """
+    One httpx.AsyncClient per event loop
+
+    Tools run on the process-wide loop of core.runtime, so in practice there
+    is a single client: TCP/TLS connections are kept alive and reused by
+    every later request to the same host, and many requests can be in
+    flight without tying up worker threads. A client belongs to the loop it
+    was created on, so callers on another loop (tests, asyncio.run) get
+    their own.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY_SECONDS,
+        timeout: float = HTTP_TIMEOUT_SECONDS,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT_SECONDS,
+        http2: bool = HTTP2_AVAILABLE
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.http2 = http2
+        self._clients = weakref.WeakKeyDictionary()   # loop -> client
+
+    def client(self) -> httpx.AsyncClient:
+        """Client of the running event loop, created on first use"""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(limits=self.limits, timeout=self.timeout, http2=self.http2)
+            self._clients[loop] = client
+        return client
+
+    async def aclose(self):
+        """Close the client of the running loop (its connections are dropped)"""
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def stats(self) -> dict:
+        return {"clients": len(self._clients), "http2": self.http2}
+
+
+# Process-wide pool shared by all HTTP tool calls
+http_pool = AsyncHTTPPool()
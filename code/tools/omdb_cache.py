@@ -0,0 +1,181 @@
+"""
+Persistent OMDb response cache - SQLite file shared by all processes
+Hits and "not found" misses are cached with separate TTLs
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+# OMDb errors that mean "no such title" (cached as misses); anything else
+# (invalid key, request limit, network) is never cached
+NOT_FOUND_ERRORS = ("movie not found", "series not found", "episode not found", "incorrect imdb id")
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]+", re.UNICODE)
+
+
+def normalize_title(title: str) -> str:
+    """Cache key title: lowercased, punctuation dropped, whitespace collapsed"""
+    return " ".join(_PUNCTUATION_RE.sub(" ", title.lower()).split())
+
+
+def is_not_found(response: Dict) -> bool:
+    """OMDb "Response": "False" meaning the title does not exist"""
+    error = str(response.get("Error", "")).lower()
+    return response.get("Response") == "False" and any(e in error for e in NOT_FOUND_ERRORS)
+
+
+class OMDBResponseCache:
+    """
+    Cache of OMDb JSON responses keyed by (normalized title, year, type, plot)
+    or (IMDb ID, plot)
+
+    Found titles are kept for hit_ttl_seconds, "not found" responses for
+    miss_ttl_seconds (a title may be added to OMDb later). The file is in
+    WAL mode so several app processes share it. Eviction is amortized:
+    expired rows are swept every evict_every writes, or as soon as the
+    row counter (counted once, then kept up to date) passes max_entries,
+    in which case the oldest responses are dropped down to 90% of it.
+    Every operation is best effort: a broken cache file only costs the
+    network call.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        hit_ttl_seconds: float = 30 * 24 * 3600,
+        miss_ttl_seconds: float = 24 * 3600,
+        max_entries: int = 50_000,
+        evict_every: int = 100
+    ):
+        self.path = path
+        self.hit_ttl_seconds = hit_ttl_seconds
+        self.miss_ttl_seconds = miss_ttl_seconds
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+
+        self._conn = None
+        self._lock = threading.Lock()
+        self._rows = None      # row count (upper bound: replaced keys count as new)
+        self._writes = 0
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(
+        title: Optional[str],
+        year: Optional[str] = None,
+        type_: Optional[str] = None,
+        plot: str = "full",
+        imdb_id: Optional[str] = None
+    ) -> str:
+        if imdb_id:
+            return f"imdb:{imdb_id.strip().lower()}|{plot}"
+        return "|".join([normalize_title(title), str(year or ""), (type_ or "").lower(), plot])
+
+    def _disk(self) -> sqlite3.Connection:
+        """Open the cache file on first use"""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS omdb_responses (
+                    key TEXT PRIMARY KEY,
+                    found INTEGER NOT NULL,
+                    response TEXT NOT NULL,
+                    fetched_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS omdb_responses_fetched ON omdb_responses (fetched_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS omdb_responses_expires ON omdb_responses (expires_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Cached OMDb response (found or not found), or None if absent/expired"""
+        try:
+            with self._lock:
+                row = self._disk().execute(
+                    "SELECT found, response FROM omdb_responses WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+        except sqlite3.Error:
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        if row[0]:
+            self.hits += 1
+        else:
+            self.negative_hits += 1
+        return json.loads(row[1])
+
+    def put(self, key: str, response: Dict):
+        """Store a found title or a "not found" response (other errors are ignored)"""
+        found = response.get("Response") != "False"
+        if not found and not is_not_found(response):
+            return
+
+        now = time.time()
+        ttl = self.hit_ttl_seconds if found else self.miss_ttl_seconds
+        try:
+            with self._lock:
+                conn = self._disk()
+                conn.execute(
+                    "INSERT OR REPLACE INTO omdb_responses (key, found, response, fetched_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, int(found), json.dumps(response), now, now + ttl)
+                )
+                if self._rows is None:
+                    self._rows = conn.execute("SELECT COUNT(*) FROM omdb_responses").fetchone()[0]
+                else:
+                    self._rows += 1
+                self._writes += 1
+                if self._writes % self.evict_every == 0 or self._rows > self.max_entries:
+                    self._evict(conn, now)
+                conn.commit()
+        except sqlite3.Error:
+            pass  # best effort
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Drop expired rows, then the oldest ones down to 90% of max_entries (resyncs the row counter)"""
+        deleted = conn.execute("DELETE FROM omdb_responses WHERE expires_at <= ?", (now,)).rowcount
+        rows = conn.execute("SELECT COUNT(*) FROM omdb_responses").fetchone()[0]
+        if rows > self.max_entries:
+            # Leave headroom so the next writes do not evict again right away
+            excess = rows - int(self.max_entries * 0.9)
+            deleted += conn.execute(
+                "DELETE FROM omdb_responses WHERE key IN "
+                "(SELECT key FROM omdb_responses ORDER BY fetched_at LIMIT ?)",
+                (excess,)
+            ).rowcount
+            rows -= excess
+        self._rows = rows
+        self.evictions += deleted
+
+    def entries(self) -> Optional[int]:
+        try:
+            with self._lock:
+                return self._disk().execute("SELECT COUNT(*) FROM omdb_responses").fetchone()[0]
+        except sqlite3.Error:
+            return None
+
+    def stats(self) -> dict:
+        return {
+            "entries": self.entries(),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
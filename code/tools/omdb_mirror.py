@@ -0,0 +1,142 @@
+"""
+Local OMDb metadata mirror - omdb_metadata table in its own SQLite file
+(config.OMDB_MIRROR_DB_PATH, outside the catalog databases folder)
+Filled by scripts/prefetch_omdb.py, read by the OMDB tool before any API call
+"""
+import re
+import sqlite3
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from omdb_schema import MIRROR_INDEXES, MIRROR_SCHEMA, MIRROR_TABLE, TEXT_FIELDS
+from tools.omdb_cache import normalize_title
+from tools.sql_pool import sql_pool, db_file_version
+
+
+def _number(value, cast=float):
+    """OMDb numbers are strings ("8.8", "2,345,678", "148 min", "N/A")"""
+    digits = re.sub(r"[^\d.]", "", str(value or "").split(" ")[0])
+    try:
+        return cast(digits) if digits else None
+    except ValueError:
+        return None
+
+
+def create_mirror_table(conn: sqlite3.Connection):
+    conn.execute(MIRROR_SCHEMA)
+    for statement in MIRROR_INDEXES:
+        conn.execute(statement)
+    conn.commit()
+
+
+def mirror_row(title: str, release_year: int, response: Optional[Dict]) -> Dict:
+    """
+    Mirror row for a catalog title - response is the OMDb JSON, or None
+    when OMDb does not know the title (stored as status "not_found")
+    """
+    row = {
+        "title": title,
+        "release_year": release_year,
+        "title_key": normalize_title(title),
+        "status": "found" if response else "not_found",
+        "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }
+    if response:
+        row.update({
+            column: (None if response.get(field) in (None, "N/A") else response[field])
+            for field, column in TEXT_FIELDS.items()
+        })
+        row["imdb_rating"] = _number(response.get("imdbRating"))
+        row["imdb_votes"] = _number(response.get("imdbVotes"), int)
+        row["metascore"] = _number(response.get("Metascore"), int)
+        row["runtime_minutes"] = _number(response.get("Runtime"), int)
+    return row
+
+
+def row_to_response(row: Dict) -> Dict:
+    """OMDb-shaped response rebuilt from a mirror row"""
+    response = {field: row[column] or "N/A" for field, column in TEXT_FIELDS.items()}
+    response["imdbRating"] = f"{row['imdb_rating']:.1f}" if row["imdb_rating"] is not None else "N/A"
+    response["imdbVotes"] = f"{row['imdb_votes']:,}" if row["imdb_votes"] is not None else "N/A"
+    response["Metascore"] = str(row["metascore"]) if row["metascore"] is not None else "N/A"
+    response["Runtime"] = f"{row['runtime_minutes']} min" if row["runtime_minutes"] is not None else "N/A"
+    response["Response"] = "True"
+    return response
+
+
+class OMDBMirror:
+    """
+    Read side of the omdb_metadata table
+
+    Lookups are single indexed reads on pooled read-only connections.
+    Only found titles are served; a title missing from the mirror (or a
+    missing mirror file) falls through to the OMDb response cache and
+    the API.
+    """
+
+    def __init__(self, db_path: str, table: str = MIRROR_TABLE):
+        self.db_path = db_path
+        self.table = table
+        self._available = None   # (db file version, table exists)
+
+        self.hits = 0
+        self.misses = 0
+
+    def available(self) -> bool:
+        """True if the database has the mirror table (rechecked when the file changes)"""
+        version = db_file_version(self.db_path)
+        if version is None:
+            return False
+        if self._available is None or self._available[0] != version:
+            try:
+                exists = sql_pool.connection(self.db_path).execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (self.table,)
+                ).fetchone() is not None
+            except sqlite3.Error:
+                exists = False
+            self._available = (version, exists)
+        return self._available[1]
+
+    def lookup(
+        self,
+        title: Optional[str],
+        year: Optional[str] = None,
+        type_: Optional[str] = None,
+        imdb_id: Optional[str] = None
+    ) -> Optional[Dict]:
+        """OMDb-shaped response for a title (year/type narrow it) or an IMDb ID, or None"""
+        if not self.available():
+            return None
+
+        if imdb_id:
+            where, params = "imdb_id = ?", [imdb_id.strip()]
+        else:
+            where, params = "title_key = ?", [normalize_title(title or "")]
+            year = _number(year, int)
+            if year:
+                # Catalog release year or OMDb's own year ("2010", "2016–2019")
+                where += " AND ? IN (release_year, CAST(substr(omdb_year, 1, 4) AS INTEGER))"
+                params.append(year)
+            if type_:
+                where += " AND type = ?"
+                params.append(type_.lower())
+
+        try:
+            conn = sql_pool.connection(self.db_path)
+            cursor = conn.execute(
+                f"SELECT * FROM {self.table} WHERE status = 'found' AND {where} "
+                f"ORDER BY imdb_votes DESC LIMIT 1",
+                params
+            )
+            values = cursor.fetchone()
+        except sqlite3.Error:
+            values = None
+
+        if values is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        row = dict(zip([c[0] for c in cursor.description], values))
+        return row_to_response(row)
+
+    def stats(self) -> dict:
+        return {"available": bool(self._available and self._available[1]), "hits": self.hits, "misses": self.misses}
@@ -1,60 +1,341 @@
 """
-OMDB API tool - async wrapper for movie metadata
+OMDB API tool - native async client for movie metadata
+Titles are first resolved against the catalog (see title_resolver); titles
+prefetched into the local mirror are read locally (see omdb_mirror), other
+responses are cached on disk (see omdb_cache); requests share the pooled
+async HTTP client (see http_pool)
 """
 import asyncio
-import json
+import time
+from typing import List, Optional, Tuple
 import requests
 from langchain_core.tools import tool
-from config import OMDB_API_KEY, OMDB_BASE_URL
+from config import (
+    OMDB_API_KEY, OMDB_BASE_URL, OMDB_CACHE_PATH, OMDB_CACHE_HIT_TTL_SECONDS,
+    OMDB_CACHE_MISS_TTL_SECONDS, OMDB_CACHE_MAX_ENTRIES, OMDB_CONCURRENCY, OMDB_MAX_TITLES,
+    OMDB_MIRROR_DB_PATH, DB_FOLDER_PATH, TITLE_RESOLUTION_MIN_SCORE
+)
+from core.models import OMDBTask, ToolResult
+from tools.base import run_tool_async, tool_result_to_json
+from tools.http_pool import http_pool
+from tools.omdb_cache import NOT_FOUND_ERRORS, OMDBResponseCache
+from tools.omdb_mirror import OMDBMirror
+from tools.title_resolver import TitleResolver
 
+omdb_cache = OMDBResponseCache(
+    OMDB_CACHE_PATH,
+    hit_ttl_seconds=OMDB_CACHE_HIT_TTL_SECONDS,
+    miss_ttl_seconds=OMDB_CACHE_MISS_TTL_SECONDS,
+    max_entries=OMDB_CACHE_MAX_ENTRIES
+)
+omdb_mirror = OMDBMirror(OMDB_MIRROR_DB_PATH)
+title_resolver = TitleResolver(DB_FOLDER_PATH, OMDB_MIRROR_DB_PATH, min_score=TITLE_RESOLUTION_MIN_SCORE)
 
-@tool
-def omdb_api(by: str = "title", t: str = None, plot: str = "full") -> str:
-    """Query OMDb API"""
+# Fields kept per title in multi-title results (keeps the prompts small)
+OMDB_SUMMARY_FIELDS = (
+    "Title", "Year", "Rated", "Runtime", "Genre", "Director", "Actors",
+    "Plot", "Awards", "Poster", "imdbRating", "imdbID", "Type"
+)
+
+
+def get_omdb_cache_stats() -> dict:
+    """Hit/miss counters of the OMDb response cache, the local mirror and title resolution"""
+    return {**omdb_cache.stats(), "mirror": omdb_mirror.stats(), "titles": title_resolver.stats()}
+
+
+def warmup() -> int:
+    """Build the title resolution index now instead of on the first lookup (returns its size)"""
+    return title_resolver.warmup()
+
+
+def _to_tool_result(result, cached: bool = False) -> ToolResult:
+    if isinstance(result, dict) and result.get("Response") == "False":
+        return ToolResult(tool="omdb", error=result.get("Error", "Movie not found"), cached=cached)
+    return ToolResult(tool="omdb", data=result, cached=cached)
+
+
+def _parse_response(response) -> dict:
+    """
+    OMDb JSON of a requests/httpx response
+
+    Quota and key errors come as HTTP 401 with a JSON body
+    ({"Response": "False", "Error": "Request limit reached!"}): that body
+    is returned so the error reads like OMDb's own, instead of the status
+    line (whose URL carries the API key).
+
+    Raises:
+        ValueError: error status without an OMDb JSON body, or invalid JSON
+    """
+    try:
+        result = response.json()
+    except ValueError:
+        result = None
+    if isinstance(result, dict) and (response.status_code < 400 or result.get("Error")):
+        return result
+    raise ValueError(f"HTTP {response.status_code}" if response.status_code >= 400 else "invalid JSON response")
+
+
+def _api_error(error: Exception) -> ToolResult:
+    """Network/HTTP failure, with the API key masked (transport errors quote the URL)"""
+    message = str(error)
+    if OMDB_API_KEY:
+        message = message.replace(OMDB_API_KEY, "***")
+    return ToolResult(tool="omdb", error=f"OMDB API failed: {message}")
+
+
+def _omdb_params(
+    title: Optional[str],
+    plot: str,
+    year: Optional[str],
+    type_: Optional[str],
+    imdb_id: Optional[str] = None
+) -> dict:
+    if imdb_id:
+        return {"apikey": OMDB_API_KEY, "plot": plot, "i": imdb_id}
+    params = {"apikey": OMDB_API_KEY, "plot": plot, "t": title}
+    if year:
+        params["y"] = year
+    if type_:
+        params["type"] = type_
+    return params
+
+
+def _check_lookup(
+    title: Optional[str],
+    plot: str,
+    year: Optional[str],
+    type_: Optional[str],
+    imdb_id: Optional[str] = None
+):
+    """(cache key, early ToolResult) - the result is set for invalid input, a mirror or cache hit"""
     if not OMDB_API_KEY:
-        return json.dumps({"error": "OMDB_API_KEY missing"})
+        return None, ToolResult(tool="omdb", error="OMDB_API_KEY missing")
+
+    if not title and not imdb_id:
+        return None, ToolResult(tool="omdb", error="Title required")
+
+    mirrored = omdb_mirror.lookup(title, year, type_, imdb_id)
+    if mirrored is not None:
+        return None, ToolResult(tool="omdb", data=mirrored, cached=True, note="omdb_metadata mirror")
+
+    key = omdb_cache.key(title, year, type_, plot, imdb_id)
+    cached = omdb_cache.get(key)
+    if cached is not None:
+        return key, _to_tool_result(cached, cached=True)
+    return key, None
+
 
-    params = {"apikey": OMDB_API_KEY, "plot": plot}
+def _store(key: str, result) -> ToolResult:
+    if isinstance(result, dict):
+        omdb_cache.put(key, result)
+    return _to_tool_result(result)
 
-    if by == "title" and t:
-        params["t"] = t
-    else:
-        return json.dumps({"error": "Title required"})
+
+def run_omdb_lookup(
+    title: str,
+    plot: str = "full",
+    year: Optional[str] = None,
+    type_: Optional[str] = None
+) -> ToolResult:
+    """
+    Query OMDb by title and return the parsed response (blocking, for the @tool adapter)
+
+    Args:
+        title: Movie/series title
+        plot: "short" or "full"
+        year: Optional release year (disambiguates remakes)
+        type_: Optional "movie", "series" or "episode"
+
+    Returns:
+        ToolResult with the OMDb JSON as data, or an error
+        (including OMDb's own "Movie not found!" responses).
+        cached=True when the answer came from the local mirror or the response cache
+    """
+    key, early = _check_lookup(title, plot, year, type_)
+    if early is not None:
+        return early
 
     try:
-        response = requests.get(OMDB_BASE_URL, params=params, timeout=10)
-        response.raise_for_status()
-        return response.text
+        response = requests.get(OMDB_BASE_URL, params=_omdb_params(title, plot, year, type_), timeout=10)
+        result = _parse_response(response)
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return _api_error(e)
+
+    return _store(key, result)
 
 
-async def execute_omdb_async(title: str) -> dict:
-    """Execute OMDB API call asynchronously"""
+async def run_omdb_lookup_async(
+    title: Optional[str],
+    plot: str = "full",
+    year: Optional[str] = None,
+    type_: Optional[str] = None,
+    imdb_id: Optional[str] = None
+) -> ToolResult:
+    """
+    Same as run_omdb_lookup, on the event loop (imdb_id, if set, replaces title/year)
+
+    Uses the shared pooled client: keep-alive connections to OMDb are
+    reused across lookups and no worker thread waits on the network.
+    The mirror and response cache reads/writes are blocking SQLite calls,
+    so they run in worker threads instead of on the shared loop.
+    """
+    key, early = await asyncio.to_thread(_check_lookup, title, plot, year, type_, imdb_id)
+    if early is not None:
+        return early
+
     try:
-        result_json = await asyncio.to_thread(
-            omdb_api.invoke,
-            {
-                "by": "title",
-                "t": title,
-                "plot": "full"
-            }
-        )
-
-        result = json.loads(result_json)
-
-        if isinstance(result, dict) and result.get("Response") == "False":
-            return {
-                "data": None,
-                "error": result.get("Error", "Movie not found")
-            }
-
-        return {
-            "data": result,
-            "error": None
-        }
+        response = await http_pool.client().get(OMDB_BASE_URL, params=_omdb_params(title, plot, year, type_, imdb_id))
+        result = _parse_response(response)
     except Exception as e:
-        return {
-            "data": None,
-            "error": f"OMDB API failed: {str(e)}"
-        }
+        return _api_error(e)
+
+    return await asyncio.to_thread(_store, key, result)
+
+
+def resolve_omdb_task(task: OMDBTask, fuzzy: bool = False) -> Tuple[OMDBTask, Optional[str]]:
+    """
+    Catalog spelling of a planned title (and IMDb ID when mirrored)
+
+    The year is never added: a task without one is sent without one (the
+    catalog row may be another work of that title), and the IMDb ID is
+    only taken when the task's year matches a mirrored catalog row.
+    Fixes casing, punctuation, accents and missing articles before the
+    call, so they do not come back as "Movie not found!" and cost a replan.
+    fuzzy=True also accepts a close catalog title (typos); it is only used
+    after OMDb did not know the title, since a close title is often
+    another work. Returns the task unchanged (and no note) when nothing
+    matches.
+    """
+    if task.imdb_id or not task.title:
+        return task, None
+    match = title_resolver.resolve(task.title, task.year, fuzzy=fuzzy)
+    if match is None:
+        return task, None
+
+    resolved = OMDBTask(title=match["title"], year=match["year"], imdb_id=match["imdb_id"])
+    if resolved == task:
+        return task, None
+    details = [str(v) for v in (resolved.year, resolved.imdb_id) if v]
+    if match["score"] < 1:
+        details.append(f"similarity {match['score']}")
+    return resolved, f"title '{task.title}' resolved to '{resolved.title}'" + (f" ({', '.join(details)})" if details else "")
+
+
+async def _lookup_task(task: OMDBTask, plot: str) -> ToolResult:
+    # Resolution reads SQLite (and builds the index on first use): off the loop
+    resolved, note = await asyncio.to_thread(resolve_omdb_task, task)
+    result = await run_tool_async(
+        "omdb", run_omdb_lookup_async, resolved.title, plot, resolved.year, None, resolved.imdb_id
+    )
+
+    if not result.ok and any(e in str(result.error).lower() for e in NOT_FOUND_ERRORS):
+        # Unknown to OMDb: retry once with the closest catalog title (typos)
+        close, close_note = await asyncio.to_thread(resolve_omdb_task, task, True)
+        if close != resolved:
+            retry = await run_tool_async(
+                "omdb", run_omdb_lookup_async, close.title, plot, close.year, None, close.imdb_id
+            )
+            if retry.ok:
+                result, note = retry, close_note
+
+    if note:
+        result.note = f"{result.note}; {note}" if result.note else note
+    return result
+
+
+def omdb_tasks_from_results(results: List[ToolResult], limit: int = OMDB_MAX_TITLES) -> List[OMDBTask]:
+    """
+    Titles (with release_year when present) found by SQL or semantic results
+
+    SQL data holds one entry per query with its rows; semantic data is a
+    list of hits. Duplicates are dropped and at most `limit` titles kept.
+    """
+    tasks, seen = [], set()
+
+    def add(row: dict):
+        title = row.get("title") if isinstance(row, dict) else None
+        if not title or len(tasks) >= limit:
+            return
+        year = row.get("release_year")
+        year = int(year) if str(year or "").isdigit() else None
+        if (title.lower(), year) not in seen:
+            seen.add((title.lower(), year))
+            tasks.append(OMDBTask(title=str(title), year=year))
+
+    for result in results:
+        if not result or not result.ok or not isinstance(result.data, list):
+            continue
+        for item in result.data:
+            if isinstance(item, dict) and isinstance(item.get("data"), list):
+                for row in item["data"]:
+                    add(row)
+            else:
+                add(item)
+    return tasks
+
+
+async def execute_omdb_tasks_async(
+    omdb_tasks: List[OMDBTask],
+    concurrency: int = OMDB_CONCURRENCY
+) -> ToolResult:
+    """
+    Look up several titles concurrently (at most `concurrency` requests in flight)
+
+    Titles are resolved against the catalog first (resolve_omdb_task, and
+    again fuzzily for titles OMDb does not know). A
+    single task returns the full OMDb response, as before. Several tasks
+    return one entry per task (title/year/imdb_id + its own data or error,
+    data cut to OMDB_SUMMARY_FIELDS, short plots); error is set only if
+    every lookup failed.
+    """
+    if len(omdb_tasks) == 1:
+        return await _lookup_task(omdb_tasks[0], "full")
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def lookup(task: OMDBTask) -> ToolResult:
+        async with semaphore:
+            return await _lookup_task(task, "short")
+
+    outcomes = await asyncio.gather(*[lookup(task) for task in omdb_tasks])
+
+    task_results = []
+    for task, outcome in zip(omdb_tasks, outcomes):
+        entry = task.model_dump(exclude_none=True)
+        if outcome.ok:
+            entry["data"] = {k: outcome.data[k] for k in OMDB_SUMMARY_FIELDS if k in outcome.data}
+        else:
+            entry["error"] = outcome.error
+        if outcome.cached:
+            entry["cached"] = True
+        if outcome.note:
+            entry["note"] = outcome.note
+        task_results.append(entry)
+
+    errors = [o.error for o in outcomes if o.error]
+
+    return ToolResult(
+        tool="omdb",
+        error="; ".join(errors) if errors and len(errors) == len(outcomes) else None,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        row_count=len(outcomes) - len(errors),
+        data=task_results
+    )
+
+
+@tool
+def omdb_api(by: str = "title", t: str = None, plot: str = "full", y: str = None, type: str = None) -> str:
+    """Query OMDb API"""
+    if by != "title":
+        return tool_result_to_json(ToolResult(tool="omdb", error="Title required"))
+
+    return tool_result_to_json(run_omdb_lookup(t, plot, y, type))
+
+
+async def execute_omdb_async(title: str, year: Optional[str] = None) -> ToolResult:
+    """Execute OMDB API call asynchronously (title resolved against the catalog first)"""
+    if not title:
+        return await run_tool_async("omdb", run_omdb_lookup_async, title, "full", year)
+    year = int(year) if str(year or "").isdigit() else None
+    return await _lookup_task(OMDBTask(title=title, year=year), "full")
@@ -1,20 +1,270 @@
 """
-Semantic search tool - async wrapper for vector search
+Semantic search tool - async wrapper for hybrid (vector + BM25) search
 """
-import asyncio
 import json
 import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 import chromadb
-from chromadb.utils import embedding_functions
 from langchain_core.tools import tool
-from config import OPENAI_API_KEY, CHROMA_PATH
+from config import (
+    OPENAI_API_KEY, CHROMA_PATH, CHROMA_COLLECTION_NAME, EMBEDDING_MODEL,
+    QUERY_EMBEDDING_CACHE_PATH, VECTOR_BACKEND, NUMPY_INDEX_PATH, IVF_NPROBE,
+    LEXICAL_INDEX_PATH, HYBRID_SEARCH
+)
+from core.models import SemanticFilters, SemanticTask, ToolResult
+from embedding_cache import get_query_embedding_cache
+from embedding_providers import collection_name_for, get_embedding_function
+from lexical_index import LexicalIndex
+from vector_store import open_vector_store, reciprocal_rank_fusion
+from tools.base import run_tool_in_thread, tool_result_to_json
+from tools.sql_pool import sql_pool
+
+
+class ChromaCollectionHandle:
+    """
+    Lazily opened, process-wide handle on the Chroma collection
+
+    The client, embedding function and collection are created once and
+    shared by every semantic query (thread-safe). If the collection on disk
+    changes (e.g. scripts/create_vector_db.py rebuilt it), the next call
+    reopens it.
+    """
+
+    def __init__(self, path: str, name: str, embedding_function):
+        self.path = path
+        self.name = name
+        self.embedding_function = embedding_function
+
+        self._lock = threading.Lock()
+        self._client = None
+        self._collection = None
+        self._version = None
+
+    def _disk_version(self) -> Optional[tuple]:
+        """mtime/size of Chroma's sqlite file - changes on every write"""
+        try:
+            stat = os.stat(os.path.join(self.path, "chroma.sqlite3"))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self) -> chromadb.Collection:
+        """Return the shared collection, (re)opening it if needed"""
+        version = self._disk_version()
+        collection = self._collection
+        if collection is not None and version == self._version:
+            return collection
+
+        with self._lock:
+            if self._collection is not None and self._disk_version() == self._version:
+                return self._collection
+
+            if self._client is not None:
+                # Drop Chroma's in-process system cache so the new files are read
+                self._client.clear_system_cache()
+
+            os.makedirs(self.path, exist_ok=True)
+            self._client = chromadb.PersistentClient(path=self.path)
+
+            self._collection = self._client.get_or_create_collection(
+                name=self.name,
+                embedding_function=self.embedding_function
+            )
+            self._version = self._disk_version()
+            return self._collection
+
+    def warmup(self) -> int:
+        """Open the collection and load its index now (returns document count)"""
+        return self.get().count()
+
+
+# Shared by all semantic searches in this process
+# (EMBEDDING_MODEL: OpenAI model or local "hashing-<dim>" embedder)
+embedding_function = get_embedding_function(EMBEDDING_MODEL, api_key=OPENAI_API_KEY)
+query_embedding_cache = get_query_embedding_cache(QUERY_EMBEDDING_CACHE_PATH)
+collection_handle = ChromaCollectionHandle(
+    CHROMA_PATH,
+    collection_name_for(CHROMA_COLLECTION_NAME, EMBEDDING_MODEL),
+    embedding_function
+)
+
+# Backend selected by VECTOR_BACKEND ("chroma", "numpy" or "ivf")
+vector_store = open_vector_store(
+    VECTOR_BACKEND,
+    get_collection=collection_handle.get,
+    numpy_path=NUMPY_INDEX_PATH,
+    nprobe=IVF_NPROBE
+)
+
+# BM25 leg of hybrid search (skipped if the FTS5 index was not built)
+lexical_index = LexicalIndex(LEXICAL_INDEX_PATH, sql_pool)
+_lexical_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="lexical")
+
+
+def embed_queries(texts: list) -> list:
+    """Query embeddings through the memory/disk cache (API only on misses)"""
+    return query_embedding_cache.embed(texts, EMBEDDING_MODEL, embedding_function)
+
+
+def warmup() -> int:
+    """Open the vector index now instead of on the first question (returns its size)"""
+    return vector_store.count()
+
+
+def _format_hit(hit: dict) -> dict:
+    metadata = hit["metadata"]
+    formatted = {
+        "id": hit["id"],
+        "title": metadata.get('title', 'Unknown'),
+        "description": hit["document"],
+        "database": metadata.get('database', 'unknown'),
+        "table": metadata.get('table', 'unknown'),
+        "similarity_score": 1 - hit["distance"] if hit["distance"] is not None else None
+    }
+    # One entry per description: list every row (platform) that carries it
+    if metadata.get('source_ids'):
+        formatted["sources"] = [
+            {"id": id_, "title": title, "table": table}
+            for id_, title, table in zip(metadata['source_ids'], metadata['source_titles'], metadata['source_tables'])
+        ]
+    return formatted
+
+
+def run_semantic_search(
+    query: str,
+    n_results: int = 5,
+    table_filter: str = None,
+    filters: Optional[dict] = None
+) -> ToolResult:
+    """
+    Execute semantic search and return Python objects
+
+    Args:
+        filters: Optional SemanticFilters fields (year range, types, ratings,
+            genres, countries, duration/seasons range), applied in the index
+
+    Returns:
+        ToolResult whose data is a list of: id, title, description,
+        database, table, similarity_score, matches, matched_by
+    """
+    task = SemanticTask(
+        query=query,
+        table_filter=table_filter,
+        filters=SemanticFilters(**filters) if filters else None
+    )
+    return run_semantic_queries([task], n_results)
+
+
+def _vector_search(tasks: List[SemanticTask], n_results: int) -> List[List[dict]]:
+    """One embedding call for all phrasings, one search call per distinct filter"""
+    embeddings = embed_queries([task.query for task in tasks])
+
+    groups = {}
+    for task, embedding in zip(tasks, embeddings):
+        where_filter = task.where()
+        key = json.dumps(where_filter, sort_keys=True)
+        groups.setdefault(key, (where_filter, []))[1].append(embedding)
+
+    ranked_lists = []
+    for where_filter, group in groups.values():
+        for hits in vector_store.search(group, n_results=n_results, where=where_filter):
+            ranked_lists.append([{**hit, "source": "vector"} for hit in hits])
+    return ranked_lists
+
+
+def _lexical_search(tasks: List[SemanticTask], n_results: int) -> Tuple[List[List[dict]], List[str]]:
+    """
+    BM25 hits per phrasing from the local FTS5 index (best effort)
+
+    A failing phrasing (e.g. an index built with an older schema) is
+    skipped on its own; its error is returned so the result can say that
+    hybrid search degraded.
+
+    Returns:
+        (ranked lists of the phrasings that worked, error messages)
+    """
+    ranked_lists, errors = [], []
+    for task in tasks:
+        try:
+            hits = lexical_index.search(task.query, n_results, task.where())
+        except (sqlite3.Error, ValueError) as e:
+            errors.append(str(e))
+            continue
+        ranked_lists.append([{**hit, "source": "lexical"} for hit in hits])
+    return ranked_lists, errors
+
+
+def run_semantic_queries(tasks: List[SemanticTask], n_results: int = 5) -> ToolResult:
+    """
+    Search one or several phrasings and merge the results
+
+    Vector leg: all phrasings are embedded in a single (cached) call and
+    queries sharing the same filters are searched in one batched call.
+    Table and metadata filters (SemanticTask.where) are applied inside
+    both indexes before ranking, so every hit already satisfies them.
+    Lexical leg: BM25 over titles/descriptions (FTS5), run concurrently in
+    a side thread while the embedding request is in flight, so it adds no
+    latency. Every ranked list is merged with reciprocal-rank fusion and
+    deduplicated; the best n_results are kept.
+
+    Returns:
+        ToolResult whose data is a list of: id, title, description,
+        database, table, similarity_score, matches, matched_by
+    """
+    try:
+        lexical_future = None
+        if HYBRID_SEARCH and lexical_index.available():
+            lexical_future = _lexical_executor.submit(_lexical_search, tasks, n_results)
+
+        notes = []
+        try:
+            ranked_lists = _vector_search(tasks, n_results)
+        except Exception as e:
+            if lexical_future is None:
+                raise
+            # Keyword hits are still worth returning if embeddings failed
+            vector_error = e
+            ranked_lists = []
+        else:
+            vector_error = None
+
+        lexical_lists, lexical_errors = lexical_future.result() if lexical_future else ([], [])
+        if vector_error is not None:
+            if not lexical_lists:
+                raise vector_error
+            notes.append(f"Vector search failed ({str(vector_error)}) - lexical results only")
+        if lexical_errors:
+            notes.append(
+                f"Lexical search failed for {len(lexical_errors)} of {len(tasks)} phrasing(s) "
+                f"({lexical_errors[0]}) - hybrid search degraded"
+            )
+        fused = reciprocal_rank_fusion(ranked_lists + lexical_lists)
+
+        formatted_results = [
+            {**_format_hit(hit), "matches": hit["matches"], "matched_by": hit["sources"]}
+            for hit in fused[:n_results]
+        ]
+
+        return ToolResult(
+            tool="semantic",
+            data=formatted_results,
+            row_count=len(formatted_results),
+            note="; ".join(notes) or None
+        )
+
+    except Exception as e:
+        return ToolResult(tool="semantic", error=f"Semantic search error: {str(e)}", data=[])
 
 
 @tool
-def semantic_search(query: str, n_results: int = 5, table_filter: str = None) -> str:
+def semantic_search(query: str, n_results: int = 5, table_filter: str = None, filters: Optional[dict] = None) -> str:
     """Execute semantic search on movie embeddings.
 
-      This tool searches movie descriptions using AI embeddings for semantic similarity.
+      This tool searches movie descriptions using AI embeddings for semantic similarity,
+      combined with keyword (BM25) matching on titles and descriptions.
       ALL MOVIE DESCRIPTIONS ARE IN ENGLISH - query must be in English!
 
       Two query strategies:
@@ -30,86 +280,21 @@ def semantic_search(query: str, n_results: int = 5, table_filter: str = None) ->
           query: English query - either keyword or descriptive sentence
           n_results: Number of similar movies to return (default 5, max 10)
           table_filter: Optional table name filter (e.g., "netflix_titles")
+          filters: Optional structured filters applied before ranking, e.g.
+              {"year_min": 2015, "year_max": 2020, "types": ["Movie"], "genres": ["Dramas"]}
+              (also: ratings, countries, duration_min/max in minutes, seasons_min/max)
 
       Returns:
-          JSON with similar movies: id, title, description, database, table, similarity_score"""
-    try:
-        # Get or create ChromaDB collection
-        os.makedirs(CHROMA_PATH, exist_ok=True)
-        client = chromadb.PersistentClient(path=CHROMA_PATH)
+          JSON with similar movies: id, title, description, database, table, similarity_score,
+          matches, matched_by"""
+    return tool_result_to_json(run_semantic_search(query, n_results, table_filter, filters))
 
-        openai_ef = embedding_functions.OpenAIEmbeddingFunction(
-            api_key=OPENAI_API_KEY,
-            model_name="text-embedding-3-small"
-        )
 
-        collection = client.get_or_create_collection(
-            name="movie_descriptions",
-            embedding_function=openai_ef
-        )
+async def execute_semantic_async(query: str, n_results: int = 5) -> ToolResult:
+    """Execute semantic search asynchronously (in thread pool)"""
+    return await run_tool_in_thread("semantic", run_semantic_search, query, n_results)
 
-        # Build filter if specified
-        where_filter = None
-        if table_filter:
-            where_filter = {"table": table_filter}
-
-        # Query collection
-        results = collection.query(
-              query_texts=[query],
-              n_results=n_results,
-              where=where_filter
-          )
-
-          # Format results
-        formatted_results = []
-        if results['ids'] and len(results['ids'][0]) > 0:
-            for i in range(len(results['ids'][0])):
-                formatted_results.append({
-                    "id": results['ids'][0][i],
-                    "title": results['metadatas'][0][i].get('title', 'Unknown'),
-                    "description": results['documents'][0][i],
-                    "database": results['metadatas'][0][i].get('database', 'unknown'),
-                    "table": results['metadatas'][0][i].get('table', 'unknown'),
-                    "similarity_score": 1 - results['distances'][0][i] if 'distances' in results else None
-                })
-
-        return json.dumps(formatted_results, indent=2, default=str)
 
-    except Exception as e:
-        return json.dumps({"error": f"Semantic search error: {str(e)}"})
-
-
-async def execute_semantic_async(query: str, n_results: int = 5) -> dict:
-    """
-    Execute semantic search asynchronously
-
-    Returns dict with results or error
-    """
-    try:
-        # Run sync tool in thread pool
-        result_json = await asyncio.to_thread(
-            semantic_search.invoke,
-            {
-                "query": query,
-                "n_results": n_results
-            }
-        )
-
-        # Parse JSON result
-        result = json.loads(result_json)
-
-        if isinstance(result, dict) and "error" in result:
-            return {
-                "results": [],
-                "error": result["error"]
-            }
-
-        return {
-            "results": result if isinstance(result, list) else [],
-            "error": None
-        }
-    except Exception as e:
-        return {
-            "results": [],
-            "error": f"Semantic search failed: {str(e)}"
-        }
+async def execute_semantic_queries_async(tasks: List[SemanticTask], n_results: int = 5) -> ToolResult:
+    """Execute several merged semantic queries asynchronously (in thread pool)"""
+    return await run_tool_in_thread("semantic", run_semantic_queries, tasks, n_results)
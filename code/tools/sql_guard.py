@@ -0,0 +1,136 @@
+"""
+SQL cost guard - time budget and query-plan check for planner-generated SQL
+"""
+import re
+import sqlite3
+import time
+from contextlib import contextmanager
+from typing import Optional
+from config import SQL_TIME_BUDGET_SECONDS, SQL_MAX_SCAN_ROWS, SQL_PROGRESS_INTERVAL
+
+
+class QueryTooExpensive(Exception):
+    """Raised when a query exceeds its time budget or estimated scan cost"""
+
+
+# "SCAN netflix_titles", "SCAN t USING COVERING INDEX i", older "SCAN TABLE x AS y"
+_SCAN_RE = re.compile(r'^SCAN (?:TABLE |SUBQUERY )?([^\s]+)(?: AS ([^\s]+))?', re.IGNORECASE)
+
+# FROM/JOIN/comma followed by a (schema-qualified) table name and an optional alias
+_TABLE_ALIAS_RE = re.compile(
+    r'(?:\bFROM|\bJOIN|,)\s+(?:\w+\.)?["`\[]?(\w+)["`\]]?(?:\s+(?:AS\s+)?(?!(?:WHERE|JOIN|ON|LEFT|RIGHT|INNER|OUTER|CROSS|NATURAL|GROUP|ORDER|LIMIT|UNION|EXCEPT|INTERSECT|HAVING|WINDOW|USING)\b)([A-Za-z_]\w*))?',
+    re.IGNORECASE
+)
+
+
+def _table_aliases(query: str, table_rows: dict) -> dict:
+    """Map aliases (and table names) found in the SQL to their row counts"""
+    rows_by_name = {name.lower(): rows for name, rows in table_rows.items()}
+    aliases = dict(rows_by_name)
+
+    for table, alias in _TABLE_ALIAS_RE.findall(query):
+        rows = rows_by_name.get(table.lower())
+        if rows is not None and alias:
+            aliases[alias.lower()] = rows
+
+    return aliases
+
+
+def estimate_scan_rows(conn: sqlite3.Connection, query: str, table_rows: dict) -> int:
+    """
+    Estimate rows visited by a query from its EXPLAIN QUERY PLAN
+
+    SQLite does not report row estimates, so each full SCAN is costed at the
+    table's row count (from the catalog) and index SEARCHes at 1 row.
+    Sibling loops of a join multiply, compound queries (UNION...) add up,
+    correlated subqueries run once per outer row. Scans of unknown names
+    (materialized subqueries) are costed at the largest table.
+    """
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {query}").fetchall()
+
+    aliases = _table_aliases(query, table_rows)
+    largest = max(table_rows.values(), default=0) or 1
+
+    children = {}
+    for node_id, parent, _, detail in plan:
+        children.setdefault(parent, []).append((node_id, detail))
+
+    def node_rows(detail: str) -> Optional[int]:
+        """Rows visited by one loop, or None if the node is not a loop"""
+        upper = detail.upper()
+        if upper.startswith("SCAN CONSTANT ROW"):
+            return 1
+        if upper.startswith("SCAN"):
+            match = _SCAN_RE.match(detail)
+            name = (match.group(2) or match.group(1)).strip('"`[]').lower() if match else ""
+            return aliases.get(name, largest)
+        if upper.startswith("SEARCH"):
+            return 1
+        return None
+
+    def group_cost(parent_id: int, parent_detail: str = "") -> int:
+        nodes = children.get(parent_id, [])
+
+        if parent_detail.upper().startswith("COMPOUND"):
+            return sum(group_cost(node_id, detail) for node_id, detail in nodes)
+
+        loops = [(node_id, detail, node_rows(detail)) for node_id, detail in nodes]
+        loops = [loop for loop in loops if loop[2] is not None]
+
+        # Nested-loop join: every loop runs once per row of the loops before it
+        loop_rows = 1
+        for _, _, rows in loops:
+            loop_rows *= rows
+
+        cost = loop_rows if loops else 0
+        for node_id, detail in nodes:
+            if detail.upper().startswith("CORRELATED"):
+                cost += group_cost(node_id, detail) * loop_rows
+            else:
+                cost += group_cost(node_id, detail)
+
+        return cost
+
+    return group_cost(0)
+
+
+def check_query_cost(conn: sqlite3.Connection, query: str, table_rows: dict, max_scan_rows: int = SQL_MAX_SCAN_ROWS):
+    """Raise QueryTooExpensive if the estimated scan cost is above max_scan_rows"""
+    estimated = estimate_scan_rows(conn, query, table_rows)
+    if estimated > max_scan_rows:
+        raise QueryTooExpensive(
+            f"Query too expensive: query plan would visit ~{estimated:,} rows "
+            f"(limit {max_scan_rows:,}). Add selective filters or join conditions."
+        )
+
+
+@contextmanager
+def time_budget(conn: sqlite3.Connection, seconds: float = SQL_TIME_BUDGET_SECONDS):
+    """
+    Interrupt any statement running on conn for longer than `seconds`
+
+    Uses SQLite's progress handler, which is called every
+    SQL_PROGRESS_INTERVAL VM instructions, so a runaway query stops within
+    milliseconds of its deadline and releases the worker thread.
+    """
+    deadline = time.monotonic() + seconds
+    state = {"expired": False}
+
+    def handler():
+        if time.monotonic() > deadline:
+            state["expired"] = True
+            return 1  # non-zero aborts the statement
+        return 0
+
+    conn.set_progress_handler(handler, SQL_PROGRESS_INTERVAL)
+    try:
+        yield
+    except sqlite3.OperationalError as e:
+        if state["expired"]:
+            raise QueryTooExpensive(
+                f"Query too expensive: exceeded the {seconds:g}s time budget and was interrupted. "
+                f"Use a more selective query."
+            ) from e
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
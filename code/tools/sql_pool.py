@@ -0,0 +1,159 @@
+"""
+SQLite connection pool - thread-affine, read-only connections for the SQL tool
+"""
+import os
+import threading
+import sqlite3
+import weakref
+from pathlib import Path
+from typing import Dict, Optional
+from config import SQLITE_CACHE_SIZE_KB, SQLITE_MMAP_SIZE, SQLITE_STATEMENT_CACHE
+
+
+def db_file_version(db_path: str) -> Optional[tuple]:
+    """(mtime_ns, size) of a database file - changes whenever it is rebuilt"""
+    try:
+        stat = os.stat(db_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def file_identity(path: str) -> Optional[tuple]:
+    """(device, inode) of a file - changes when it is replaced, not when rows are written"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_dev, stat.st_ino)
+
+
+class SQLiteConnectionPool:
+    """
+    Per-database pool of read-only SQLite connections
+
+    Each worker thread gets its own connection per database file, opened once
+    and reused for every later query from that thread. The asyncio.to_thread
+    workers used by execute_sql_async are long-lived, so in practice every
+    query after the first one skips connect, schema parsing and page-cache
+    warmup.
+
+    A connection can also get other database files ATTACHed read-only
+    (attach={schema: path}). They are reattached when one of them is
+    created or replaced; rows written into them are visible without a
+    reopen.
+    """
+
+    def __init__(
+        self,
+        cache_size_kb: int = SQLITE_CACHE_SIZE_KB,
+        mmap_size: int = SQLITE_MMAP_SIZE,
+        cached_statements: int = SQLITE_STATEMENT_CACHE
+    ):
+        self.cache_size_kb = cache_size_kb
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # (weakref to owning thread, db path) -> connection, kept so dead
+        # threads' connections can be closed and close_all() reaches everything.
+        # Thread objects (not idents, which the OS reuses) identify the owner
+        self._connections = {}
+        # Bumped by close_all(): thread-local connections of an older
+        # generation are stale and get reopened
+        self._generation = 0
+
+    def _open(self, db_path: str, attached: tuple = ()) -> sqlite3.Connection:
+        """Open a read-only connection tuned for analytical reads, plus its attached files"""
+        uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+
+        # Thread affinity is enforced by the pool itself, so the sqlite3 check
+        # is disabled only to allow close_all() from another thread
+        conn = sqlite3.connect(
+            uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        for schema, path, identity in attached:
+            if identity is not None:
+                conn.execute(f"ATTACH DATABASE ? AS {schema}", (Path(path).resolve().as_uri() + "?mode=ro",))
+        return conn
+
+    def connection(self, db_path: str, attach: Optional[Dict[str, str]] = None) -> sqlite3.Connection:
+        """Return the calling thread's connection to db_path (opened on first use)"""
+        connections = getattr(self._local, "connections", None)
+        if connections is None:
+            connections = self._local.connections = {}
+
+        version = db_file_version(db_path)
+        attached = tuple(sorted((schema, path, file_identity(path)) for schema, path in (attach or {}).items()))
+        for schema, _, _ in attached:
+            if not schema.isidentifier():
+                raise ValueError(f"Invalid schema name for ATTACH: {schema!r}")
+        conn, opened_version, generation, opened_attached = connections.get(db_path, (None, None, None, None))
+
+        # A rebuilt database file (new mtime/size) gets a fresh connection,
+        # otherwise we would keep reading the old, unlinked file; so does a
+        # new or replaced attached file; a connection from before
+        # close_all() is already closed
+        if conn is not None and (
+            opened_version != version or generation != self._generation or opened_attached != attached
+        ):
+            with self._lock:
+                self._connections.pop(self._key(db_path), None)
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            conn = None
+
+        if conn is None:
+            conn = self._open(db_path, attached)
+            with self._lock:
+                self._prune_dead_threads()
+                self._connections[self._key(db_path)] = conn
+                connections[db_path] = (conn, version, self._generation, attached)
+
+        return conn
+
+    @staticmethod
+    def _key(db_path: str) -> tuple:
+        return (weakref.ref(threading.current_thread()), db_path)
+
+    def _prune_dead_threads(self):
+        """Close connections owned by threads that no longer exist (lock held)"""
+        for key in [k for k in self._connections if k[0]() is None or not k[0]().is_alive()]:
+            try:
+                self._connections.pop(key).close()
+            except sqlite3.Error:
+                pass
+
+    def close_all(self):
+        """Close every pooled connection (e.g. after rebuilding a database)"""
+        with self._lock:
+            for conn in self._connections.values():
+                try:
+                    conn.close()
+                except sqlite3.Error:
+                    pass
+            self._connections.clear()
+            # Threads will lazily reopen on their next query
+            self._generation += 1
+
+    def stats(self) -> dict:
+        """Number of open connections per database"""
+        with self._lock:
+            per_db = {}
+            for _, db_path in self._connections:
+                per_db[db_path] = per_db.get(db_path, 0) + 1
+            return {"open_connections": len(self._connections), "per_database": per_db}
+
+
+# Process-wide pool shared by all SQL tool calls
+sql_pool = SQLiteConnectionPool()
@@ -2,70 +2,264 @@
 SQL tool - async wrapper for database queries
 """
 import asyncio
-import json
-import sqlite3
+import copy
+import itertools
+import time
+from typing import Optional
 from langchain_core.tools import tool
+from cache import LRUCache, estimate_size
+from core.models import ToolResult
+from tools.base import run_tool_in_thread, tool_result_to_json
+from tools.sql_pool import sql_pool, db_file_version
+from tools.sql_guard import QueryTooExpensive, check_query_cost, time_budget
+from config import (
+    SQL_MAX_ROWS, SQL_FETCH_BATCH, SQL_COUNT_CAP,
+    SQL_CACHE_MAX_ENTRIES, SQL_CACHE_MAX_BYTES, SQL_CACHE_TTL_SECONDS
+)
 
+# Successful query results, keyed on (database, file version, normalized SQL, row cap,
+# versions of the attached files the query names). The file version is its
+# mtime/size, so rebuilding movie.db invalidates every entry, and a prefetch
+# writing the OMDb mirror only invalidates the queries that read it.
+# Entries are plain model_dump() snapshots: callers never share a cached object
+sql_result_cache = LRUCache(
+    max_entries=SQL_CACHE_MAX_ENTRIES,
+    max_bytes=SQL_CACHE_MAX_BYTES,
+    ttl_seconds=SQL_CACHE_TTL_SECONDS,
+    size_of=lambda snapshot: estimate_size(snapshot["data"])
+)
 
-@tool
-def execute_sql_query(query: str, db_name: str, state_catalog: dict) -> str:
-    """Execute SQL query"""
-    catalog = state_catalog
 
+def normalize_sql(query: str) -> str:
+    """
+    Normalize SQL text for cache keys
+
+    Collapses whitespace outside quoted literals/identifiers and drops
+    trailing semicolons. Quoted text is kept byte-for-byte.
+    """
+    out = []
+    quote = None
+    pending_space = False
+
+    for ch in query.strip().rstrip(";").strip():
+        if quote:
+            out.append(ch)
+            if ch == quote:
+                quote = None
+        elif ch.isspace():
+            pending_space = True
+        else:
+            if pending_space and out:
+                out.append(" ")
+            pending_space = False
+            out.append(ch)
+            if ch in ("'", '"', "`"):
+                quote = ch
+            elif ch == "[":
+                quote = "]"
+
+    return "".join(out)
+
+
+def _cache_key(query: str, db_name: str, catalog: dict, max_rows: int) -> Optional[tuple]:
+    """Cache key for a query, or None if the database cannot be resolved"""
+    db_info = catalog.get("databases", {}).get(db_name)
+    if not db_info or "error" in db_info:
+        return None
+
+    version = db_file_version(db_info["full_path"])
+    if version is None:
+        return None
+
+    normalized = normalize_sql(query)
+    lowered = normalized.lower()
+    attached_versions = tuple(
+        (schema, db_file_version(path))
+        for schema, path in sorted(db_info.get("attached", {}).items())
+        if f"{schema}." in lowered or any(
+            name.lower() in lowered for name, info in db_info.get("tables", {}).items() if info.get("schema") == schema
+        )
+    )
+    return (db_name, version, normalized, max_rows, attached_versions)
+
+
+def _cached_result(key: Optional[tuple]) -> Optional[ToolResult]:
+    """Fresh ToolResult rebuilt from a cached snapshot (flagged as cached), or None"""
+    if key is None:
+        return None
+
+    cached = sql_result_cache.get(key)
+    if cached is None:
+        return None
+
+    return ToolResult(**{**copy.deepcopy(cached), "cached": True, "elapsed_ms": 0.0})
+
+
+def get_sql_cache_stats() -> dict:
+    """Hit/miss/eviction counters and memory use of the SQL result cache"""
+    return sql_result_cache.stats()
+
+
+def _fetch_bounded(cursor, max_rows: int, count_cap: int = SQL_COUNT_CAP) -> tuple:
+    """
+    Fetch at most max_rows rows with fetchmany, then count the rest
+
+    Rows past the cap are only counted (never materialized), and counting
+    stops at count_cap * max_rows rows, so neither memory nor CPU grows
+    with the size of the result.
+
+    Returns (rows, total_rows, exact) - exact is False when counting
+    stopped early and total_rows is only a lower bound
+    """
+    rows = []
+    while len(rows) < max_rows:
+        batch = cursor.fetchmany(min(SQL_FETCH_BATCH, max_rows - len(rows)))
+        if not batch:
+            return rows, len(rows), True
+        rows.extend(batch)
+
+    limit = max(count_cap * max_rows - len(rows), 0)
+    counted = sum(1 for _ in itertools.islice(cursor, limit))
+    exact = counted < limit or cursor.fetchone() is None
+
+    return rows, len(rows) + counted, exact
+
+
+def run_sql_query(query: str, db_name: str, catalog: dict, max_rows: int = SQL_MAX_ROWS) -> ToolResult:
+    """
+    Execute SQL query (or serve it from the result cache)
+
+    Same arguments and return value as _execute_sql_query.
+    """
+    key = _cache_key(query, db_name, catalog, max_rows)
+
+    cached = _cached_result(key)
+    if cached is not None:
+        return cached
+
+    return _execute_and_cache(key, query, db_name, catalog, max_rows)
+
+
+def _execute_and_cache(key: Optional[tuple], query: str, db_name: str, catalog: dict, max_rows: int) -> ToolResult:
+    """Run the query and cache it if it succeeded"""
+    result = _execute_sql_query(query, db_name, catalog, max_rows)
+
+    if key is not None and result.ok:
+        sql_result_cache.put(key, copy.deepcopy(result.model_dump()))
+
+    return result
+
+
+def _execute_sql_query(query: str, db_name: str, catalog: dict, max_rows: int = SQL_MAX_ROWS) -> ToolResult:
+    """
+    Execute SQL query and return Python objects (no JSON round-trip)
+
+    Args:
+        query: SQL query
+        db_name: Database name from catalog
+        catalog: Database catalog
+        max_rows: Maximum number of rows materialized
+
+    Returns:
+        ToolResult with data (list of row dicts), row_count (true total, or
+        a lower bound past SQL_COUNT_CAP * max_rows), truncated flag and a
+        note when rows were cut
+    """
     if db_name not in catalog["databases"]:
-        return json.dumps({"error": f"Database '{db_name}' not found"})
+        return ToolResult(tool="sql", error=f"Database '{db_name}' not found", data=[], row_count=0)
 
     db_info = catalog["databases"][db_name]
 
     if "error" in db_info:
-        return json.dumps({"error": db_info["error"]})
+        return ToolResult(tool="sql", error=db_info["error"], data=[], row_count=0)
 
     db_path = db_info["full_path"]
+    table_rows = {name: info.get("row_count") or 0 for name, info in db_info.get("tables", {}).items()}
 
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(query)
-        rows = cursor.fetchall()
-        columns = [desc[0] for desc in cursor.description]
-        result = [dict(zip(columns, row)) for row in rows]
-        conn.close()
-        return json.dumps(result, indent=2, default=str)
+        # Pooled read-only connection, reused by this worker thread
+        conn = sql_pool.connection(db_path, attach=db_info.get("attached"))
+
+        # Reject pathological plans up front, interrupt anything that still runs too long
+        check_query_cost(conn, query, table_rows)
+        with time_budget(conn):
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+                columns = [desc[0] for desc in cursor.description or []]
+                rows, total_rows, exact = _fetch_bounded(cursor, max_rows)
+            finally:
+                cursor.close()
+    except QueryTooExpensive as e:
+        return ToolResult(tool="sql", error=str(e), error_type="too_expensive", data=[], row_count=0)
     except Exception as e:
-        return json.dumps({"error": f"SQL Error: {str(e)}"})
+        return ToolResult(tool="sql", error=f"SQL Error: {str(e)}", data=[], row_count=0)
+
+    truncated = total_rows > len(rows)
+    total = f"{total_rows}" if exact else f"at least {total_rows}"
 
+    return ToolResult(
+        tool="sql",
+        data=[dict(zip(columns, row)) for row in rows],
+        row_count=total_rows,
+        truncated=truncated,
+        note=f"TRUNCATED: showing first {len(rows)} of {total} rows" if truncated else None
+    )
 
-async def execute_sql_async(query: str, db_name: str, catalog: dict) -> dict:
+
+@tool
+def execute_sql_query(query: str, db_name: str, state_catalog: dict) -> str:
+    """Execute SQL query"""
+    return tool_result_to_json(run_sql_query(query, db_name, state_catalog))
+
+
+async def execute_sql_async(query: str, db_name: str, catalog: dict) -> ToolResult:
     """
     Execute SQL query asynchronously
 
-    Uses asyncio.to_thread() to run sync tool in thread pool
-    (True async with aiopg/asyncpg can be future optimization)
+    Cache hits are answered directly on the event loop. Misses use
+    asyncio.to_thread() to run the query in thread pool; worker threads keep
+    their pooled SQLite connections between calls, and rows come back as
+    Python objects (capped at SQL_MAX_ROWS).
+    """
+    key = _cache_key(query, db_name, catalog, SQL_MAX_ROWS)
+
+    cached = _cached_result(key)
+    if cached is not None:
+        return cached
+
+    return await run_tool_in_thread("sql", _execute_and_cache, key, query, db_name, catalog, SQL_MAX_ROWS)
+
 
-    Returns dict with results or error
+async def execute_sql_tasks_async(sql_tasks: list, catalog: dict) -> ToolResult:
     """
-    try:
-        # Run sync tool in thread pool
-        result_json = await asyncio.to_thread(
-            execute_sql_query.invoke,
-            {
-                "query": query,
-                "db_name": db_name,
-                "state_catalog": catalog
-            }
-        )
+    Execute several SQL queries concurrently (fan-out across databases)
 
-        # Parse JSON result
-        result = json.loads(result_json)
+    Args:
+        sql_tasks: List of SQLTask (database + query)
+        catalog: Database catalog from state
 
-        return {
-            "results": result if not isinstance(result, dict) or "error" not in result else [],
-            "error": result.get("error") if isinstance(result, dict) else None,
-            "row_count": len(result) if isinstance(result, list) else 0
-        }
-    except Exception as e:
-        return {
-            "results": [],
-            "error": f"SQL execution failed: {str(e)}",
-            "row_count": 0
-        }
+    Returns ToolResult whose data holds one entry per task (its own
+    results/error) and the summed row_count. error is set only if
+    every task failed.
+    """
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *[execute_sql_async(task.query, task.database, catalog) for task in sql_tasks]
+    )
+
+    task_results = [
+        {"database": task.database, "query": task.query, **outcome.model_dump(exclude={"tool"}, exclude_none=True)}
+        for task, outcome in zip(sql_tasks, outcomes)
+    ]
+
+    errors = [o.error for o in outcomes if o.error]
+
+    return ToolResult(
+        tool="sql",
+        error="; ".join(errors) if errors and len(errors) == len(outcomes) else None,
+        elapsed_ms=round((time.perf_counter() - started) * 1000, 2),
+        truncated=any(o.truncated for o in outcomes),
+        row_count=sum(o.row_count or 0 for o in outcomes),
+        data=task_results
+    )
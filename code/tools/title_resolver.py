@@ -0,0 +1,224 @@
+"""
+Title resolution index - maps a planner-supplied title to a catalog title
+(casing, punctuation, accents, leading articles; typos once OMDb says the
+title does not exist)
+"""
+import os
+import sqlite3
+import threading
+import unicodedata
+from difflib import SequenceMatcher
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
+from tools.omdb_cache import normalize_title
+from tools.omdb_mirror import MIRROR_TABLE
+from tools.sql_pool import sql_pool, db_file_version
+
+LEADING_ARTICLES = {"the", "a", "an", "le", "la", "les", "l", "el", "los", "las", "der", "die", "das"}
+
+# Sequel numerals ("ii" .. "xx"; a lone "i" is usually the pronoun)
+ROMAN_NUMERALS = {
+    roman: value for value, roman in enumerate(
+        ["ii", "iii", "iv", "v", "vi", "vii", "viii", "ix", "x", "xi", "xii", "xiii", "xiv",
+         "xv", "xvi", "xvii", "xviii", "xix", "xx"], start=2
+    )
+}
+
+
+def title_key(title: str) -> str:
+    """Resolution key: accents, punctuation, "&" and a leading article dropped"""
+    text = unicodedata.normalize("NFKD", str(title))
+    text = "".join(c for c in text if not unicodedata.combining(c)).replace("&", " and ")
+    words = normalize_title(text).split()
+    if len(words) > 1 and words[0] in LEADING_ARTICLES:
+        words = words[1:]
+    return " ".join(words)
+
+
+def sequel_numbers(key: str) -> set:
+    """Numbers of a title key: digits and roman numerals ("rocky ii" -> {2})"""
+    return {int(w) if w.isdigit() else ROMAN_NUMERALS[w] for w in key.split() if w.isdigit() or w in ROMAN_NUMERALS}
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TitleResolver:
+    """
+    In-memory index of every `title` column of the SQL databases
+
+    Keys are title_key() of the catalog titles, plus the OMDb titles of the
+    omdb_metadata mirror file (often the original or English title of a
+    translated one), which also gives IMDb IDs. resolve() only accepts an
+    exact key match unless fuzzy=True; callers use fuzzy matching once OMDb
+    has answered "not found", since a close catalog title is often another
+    work ("Alien" vs "Alien TV"). Fuzzy candidates come from shared
+    trigrams, are scored by edit similarity (difflib ratio, robust to
+    transposed letters) and kept above min_score; a candidate whose
+    numbers differ from the query's ("Spider-Man 2" vs "Spider-Man") is
+    never taken. Among the rows of the matched key the caller's year
+    decides (same or adjacent release year); without one, only the
+    catalog spelling of the title is returned. The index is built on first use and
+    rebuilt when a database or the mirror file changes.
+    """
+
+    def __init__(self, db_folder: str, mirror_path: Optional[str] = None, min_score: float = 0.85):
+        self.db_folder = db_folder
+        self.mirror_path = mirror_path
+        self.min_score = min_score
+
+        self._lock = threading.Lock()
+        self._version = None
+        self._keys: List[str] = []
+        self._entries: Dict[str, List[Dict]] = {}     # key -> catalog rows
+        self._postings: Dict[str, List[int]] = {}     # trigram -> key indexes
+
+        self.exact = 0
+        self.fuzzy = 0
+        self.unresolved = 0
+
+    def _db_paths(self) -> List[str]:
+        try:
+            files = sorted(os.listdir(self.db_folder))
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.db_folder, f) for f in files if f.endswith((".db", ".sqlite", ".sqlite3"))]
+
+    def _read_rows(self, db_path: str) -> List[Dict]:
+        """Catalog rows (title, year, type) of one database"""
+        conn = sql_pool.connection(db_path)
+        rows = []
+        for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+            if table == MIRROR_TABLE:
+                continue  # mirror left in an older movie.db
+            columns = {c[1] for c in conn.execute(f"PRAGMA table_info({table})")}
+            if "title" in columns:
+                year = "release_year" if "release_year" in columns else "NULL"
+                type_ = "type" if "type" in columns else "NULL"
+                for title, release_year, kind in conn.execute(
+                    f"SELECT title, {year}, {type_} FROM {table} WHERE title IS NOT NULL"
+                ):
+                    rows.append({"title": title, "year": release_year, "type": kind})
+        return rows
+
+    def _read_mirror(self) -> Dict[tuple, Dict]:
+        """{(title, release_year): {imdb_id, omdb_title}} of the found mirror rows"""
+        if not self.mirror_path or db_file_version(self.mirror_path) is None:
+            return {}
+        try:
+            return {
+                (title, year): {"imdb_id": imdb_id, "omdb_title": omdb_title}
+                for title, year, imdb_id, omdb_title in sql_pool.connection(self.mirror_path).execute(
+                    f"SELECT title, release_year, imdb_id, omdb_title FROM {MIRROR_TABLE} WHERE status = 'found'"
+                )
+            }
+        except sqlite3.Error:
+            return {}
+
+    def _build(self):
+        entries = defaultdict(dict)   # key -> {(title, year): entry}
+        mirror = self._read_mirror()
+        for db_path in self._db_paths():
+            try:
+                rows = self._read_rows(db_path)
+            except sqlite3.Error:
+                continue
+            for row in rows:
+                row["imdb_id"] = mirror.get((row["title"], row["year"]), {}).get("imdb_id")
+                entries[title_key(row["title"])].setdefault((row["title"], row["year"]), row)
+        for (title, year), found in mirror.items():
+            # OMDb's title as an alias of the catalog row
+            if found["omdb_title"] and (title, year) in entries.get(title_key(title), {}):
+                entry = {"title": title, "year": year, "type": None, "imdb_id": found["imdb_id"]}
+                entries[title_key(found["omdb_title"])].setdefault((title, year), entry)
+
+        keys = [key for key in entries if key]
+        postings = defaultdict(list)
+        for i, key in enumerate(keys):
+            for gram in trigrams(key):
+                postings[gram].append(i)
+
+        self._keys = keys
+        self._entries = {key: list(entries[key].values()) for key in keys}
+        self._postings = dict(postings)
+
+    def _ensure(self):
+        paths = self._db_paths() + ([self.mirror_path] if self.mirror_path else [])
+        version = tuple(db_file_version(p) for p in paths)
+        if version != self._version:
+            with self._lock:
+                if version != self._version:
+                    self._build()
+                    self._version = version
+
+    def warmup(self) -> int:
+        """Build the index now instead of on the first lookup (returns its size)"""
+        self._ensure()
+        return len(self._keys)
+
+    def candidates(self, key: str, limit: int = 5) -> List[Tuple[float, str]]:
+        """(edit similarity, key) of the closest catalog keys with the same numbers, best first"""
+        shared = Counter()
+        for gram in trigrams(key):
+            shared.update(self._postings.get(gram, ()))
+        numbers = sequel_numbers(key)
+        scored = [
+            (SequenceMatcher(None, key, self._keys[i]).ratio(), self._keys[i])
+            for i, _ in shared.most_common(limit * 20)
+            if sequel_numbers(self._keys[i]) == numbers
+        ]
+        return sorted(scored, reverse=True)[:limit]
+
+    @staticmethod
+    def _pick(entries: List[Dict], year: int) -> Optional[Dict]:
+        """Row of the requested year (same or adjacent release year)"""
+        close = sorted((abs((e["year"] or 0) - year), i) for i, e in enumerate(entries))
+        return entries[close[0][1]] if close and close[0][0] <= 1 else None
+
+    def resolve(self, title: str, year: Optional[int] = None, fuzzy: bool = False) -> Optional[Dict]:
+        """
+        {title, year, imdb_id, score} of the catalog title, or None if there
+        is no exact key match (fuzzy=False) or nothing close enough
+
+        year is the caller's (None stays None); imdb_id is only set when
+        that year identifies one catalog row.
+        """
+        key = title_key(title or "")
+        if not key:
+            return None
+        self._ensure()
+
+        if key in self._entries:
+            score, matched = 1.0, key
+        elif not fuzzy:
+            self.unresolved += 1
+            return None
+        else:
+            found = [(s, k) for s, k in self.candidates(key) if s >= self.min_score]
+            if year:
+                # Prefer a close key that also has the requested year
+                found.sort(key=lambda c: (c[0] + (0.05 if self._pick(self._entries[c[1]], year) else 0)), reverse=True)
+            if not found:
+                self.unresolved += 1
+                return None
+            score, matched = found[0]
+
+        if score == 1.0:
+            self.exact += 1
+        else:
+            self.fuzzy += 1
+
+        entries = self._entries[matched]
+        # Without a year the catalog row may be another work of that title
+        # ("Dune" 1984 when 2021 was meant): only the title is taken
+        entry = self._pick(entries, year) if year else None
+        if entry is None:
+            # No year, or year outside the catalog: keep the caller's year
+            return {"title": entries[0]["title"], "year": year, "imdb_id": None, "score": round(score, 3)}
+
+        return {"title": entry["title"], "year": year, "imdb_id": entry["imdb_id"], "score": round(score, 3)}
+
+    def stats(self) -> dict:
+        return {"keys": len(self._keys), "exact": self.exact, "fuzzy": self.fuzzy, "unresolved": self.unresolved}
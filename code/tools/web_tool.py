@@ -1,45 +1,33 @@
 """
 Web search tool - async wrapper for DuckDuckGo
 """
-import asyncio
-import json
 from langchain_core.tools import tool
 from langchain_community.tools import DuckDuckGoSearchResults
+from core.models import ToolResult
+from tools.base import run_tool_in_thread, tool_result_to_json
 
 
-@tool
-def web_search(query: str, num_results: int = 5) -> str:
-    """Web search via DuckDuckGo"""
+def run_web_search(query: str, num_results: int = 5) -> ToolResult:
+    """
+    Web search via DuckDuckGo, returned as a list of results
+
+    Returns:
+        ToolResult whose data is a list of dicts (snippet, title, link)
+    """
     try:
-        search = DuckDuckGoSearchResults(num_results=num_results)
-        return search.run(query)
+        search = DuckDuckGoSearchResults(max_results=num_results, output_format="list")
+        results = search.invoke(query)
+        return ToolResult(tool="web", data=results, row_count=len(results))
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return ToolResult(tool="web", error=f"Web search failed: {str(e)}", data=[])
 
 
-async def execute_web_async(query: str, n_results: int = 5) -> dict:
-    """Execute web search asynchronously"""
-    try:
-        result_json = await asyncio.to_thread(
-            web_search.invoke,
-            {
-                "query": query,
-                "num_results": n_results
-            }
-        )
+@tool
+def web_search(query: str, num_results: int = 5) -> str:
+    """Web search via DuckDuckGo"""
+    return tool_result_to_json(run_web_search(query, num_results))
 
-        # web_search returns string, might be JSON or plain text
-        try:
-            result = json.loads(result_json)
-        except:
-            result = result_json  # Keep as string
 
-        return {
-            "results": result,
-            "error": None
-        }
-    except Exception as e:
-        return {
-            "results": [],
-            "error": f"Web search failed: {str(e)}"
-        }
+async def execute_web_async(query: str, n_results: int = 5) -> ToolResult:
+    """Execute web search asynchronously"""
+    return await run_tool_in_thread("web", run_web_search, query, n_results)
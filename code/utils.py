@@ -3,7 +3,10 @@
 # =================================
 import os
 import sqlite3
+from pathlib import Path
+from typing import Dict, Optional
 from core.state import AgentState
+from omdb_schema import MIRROR_TABLE
 
 
 # =================================
@@ -21,8 +24,14 @@ def clean_json(text: str) -> str:
         text = text[:-3]
     return text.strip()
 
-def build_db_catalog(folder_path: str) -> dict:
-    """Build database catalog with unique values for all columns"""
+def build_db_catalog(folder_path: str, attach: Optional[Dict[str, str]] = None) -> dict:
+    """
+    Build database catalog with unique values for all columns
+
+    attach: {schema: path} of extra files the SQL tool ATTACHes to every
+    database (see config.SQL_ATTACHED_DATABASES); their tables are listed
+    with "schema" set, and skipped while the file does not exist
+    """
     catalog = {
         "folder_path": folder_path,
         "databases": {},
@@ -54,11 +63,22 @@ def build_db_catalog(folder_path: str) -> dict:
                 "tables": {}
             }
 
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-            tables = cursor.fetchall()
-
-            for (table_name,) in tables:
-                cursor.execute(f"PRAGMA table_info({table_name})")
+            attached = {schema: path for schema, path in (attach or {}).items() if os.path.exists(path)}
+            for schema, path in attached.items():
+                cursor.execute(f"ATTACH DATABASE ? AS {schema}", (Path(path).resolve().as_uri() + "?mode=ro",))
+            if attached:
+                db_info["attached"] = attached
+
+            tables = []
+            for schema in ["main"] + list(attached):
+                cursor.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type='table';")
+                tables.extend((schema, name) for (name,) in cursor.fetchall())
+
+            for schema, table_name in tables:
+                if schema == "main" and table_name == MIRROR_TABLE:
+                    continue  # OMDb mirror left in an older movie.db: not catalog data
+                source = f"{schema}.{table_name}"
+                cursor.execute(f"PRAGMA {schema}.table_info({table_name})")
                 columns = cursor.fetchall()
 
                 table_info = {
@@ -69,10 +89,12 @@ def build_db_catalog(folder_path: str) -> dict:
                     "column_names": [col[1] for col in columns],
                     "unique_values": {}
                 }
+                if schema != "main":
+                    table_info["schema"] = schema
 
                 # Get row count
                 try:
-                    cursor.execute(f"SELECT COUNT(*) FROM {table_name}")
+                    cursor.execute(f"SELECT COUNT(*) FROM {source}")
                     table_info["row_count"] = cursor.fetchone()[0]
                 except:
                     table_info["row_count"] = None
@@ -83,12 +105,12 @@ def build_db_catalog(folder_path: str) -> dict:
 
                     try:
                         # Get distinct count first
-                        cursor.execute(f"SELECT COUNT(DISTINCT {col_name}) FROM {table_name} WHERE {col_name} IS NOT NULL")
+                        cursor.execute(f"SELECT COUNT(DISTINCT {col_name}) FROM {source} WHERE {col_name} IS NOT NULL")
                         distinct_count = cursor.fetchone()[0]
 
                         # If reasonable number of unique values, get them
                         if distinct_count <= 50:
-                            cursor.execute(f"SELECT DISTINCT {col_name} FROM {table_name} WHERE {col_name} IS NOT NULL ORDER BY {col_name} LIMIT 50")
+                            cursor.execute(f"SELECT DISTINCT {col_name} FROM {source} WHERE {col_name} IS NOT NULL ORDER BY {col_name} LIMIT 50")
                             unique_vals = [row[0] for row in cursor.fetchall()]
                             table_info["unique_values"][col_name] = {
                                 "count": distinct_count,
@@ -96,7 +118,7 @@ def build_db_catalog(folder_path: str) -> dict:
                             }
                         else:
                             # For columns with many values, get sample + range
-                            cursor.execute(f"SELECT DISTINCT {col_name} FROM {table_name} WHERE {col_name} IS NOT NULL ORDER BY {col_name} LIMIT 20")
+                            cursor.execute(f"SELECT DISTINCT {col_name} FROM {source} WHERE {col_name} IS NOT NULL ORDER BY {col_name} LIMIT 20")
                             sample_vals = [row[0] for row in cursor.fetchall()]
                             table_info["unique_values"][col_name] = {
                                 "count": distinct_count,
@@ -108,7 +130,7 @@ def build_db_catalog(folder_path: str) -> dict:
                 # Special handling for genre columns (comma-separated)
                 if "listed_in" in table_info["column_names"]:
                     try:
-                        cursor.execute(f"SELECT DISTINCT listed_in FROM {table_name} WHERE listed_in IS NOT NULL")
+                        cursor.execute(f"SELECT DISTINCT listed_in FROM {source} WHERE listed_in IS NOT NULL")
                         all_genres = set()
                         for (genre_string,) in cursor.fetchall():
                             if genre_string:
@@ -143,7 +165,11 @@ def format_catalog_for_llm(catalog: dict) -> str:
         output += f"═══ Database: {db_name} ═══\n\n"
 
         for table_name, table_info in db_info["tables"].items():
-            output += f"TABLE: {table_name}\n"
+            if table_info.get("schema"):
+                # Attached file: always reference it with its schema prefix
+                output += f"TABLE: {table_info['schema']}.{table_name} (attached to this database)\n"
+            else:
+                output += f"TABLE: {table_name}\n"
             output += f"Total rows: {table_info.get('row_count', 'unknown')}\n\n"
 
             output += "COLUMNS:\n"
@@ -0,0 +1,698 @@
+"""
+Vector store backends for semantic search
+- ChromaVectorStore: wraps a ChromaDB collection
+- NumpyVectorStore: normalized float32 matrix in a memory-mapped .npy file
+- IVFVectorStore: same matrix + k-means inverted lists (approximate, nprobe)
+"""
+import json
+import os
+import shutil
+import threading
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+# Files of a NumPy index folder
+EMBEDDINGS_FILE = "embeddings.npy"
+METADATA_FILE = "metadata.json"
+MANIFEST_FILE = "manifest.json"
+BUILDS_DIR = "builds"
+KEEP_BUILDS = 2   # current build + the previous one (readers may still be opening it)
+
+# IVF files (optional, written by IVFVectorStore.build)
+IVF_CENTROIDS_FILE = "ivf_centroids.npy"   # float32 (nlist, dim), normalized
+IVF_LISTS_FILE = "ivf_lists.npy"           # int32 row ids grouped by list
+IVF_OFFSETS_FILE = "ivf_offsets.npy"       # list i = lists[offsets[i]:offsets[i + 1]]
+
+
+def build_folder(path: str, manifest: Dict) -> str:
+    """Folder holding the files of the build a manifest points to (the index folder itself for flat legacy indexes)"""
+    return os.path.join(path, manifest["build"]) if manifest.get("build") else path
+
+
+def _new_build(path: str) -> tuple:
+    """Create an empty build folder; returns (manifest "build" value, folder path)"""
+    name = f"{BUILDS_DIR}/{datetime.now().strftime('%Y%m%dT%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+    folder = os.path.join(path, name)
+    os.makedirs(folder)
+    return name, folder
+
+
+def _publish(path: str, manifest: Dict):
+    """Switch readers to the build in `manifest` (one atomic rename), then drop old builds"""
+    tmp = os.path.join(path, MANIFEST_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(path, MANIFEST_FILE))
+
+    # Build names sort by creation time
+    builds_root = os.path.join(path, BUILDS_DIR)
+    current = os.path.basename(manifest["build"])
+    old = sorted(name for name in os.listdir(builds_root) if name != current)
+    for name in old[:max(0, len(old) - (KEEP_BUILDS - 1))]:
+        shutil.rmtree(os.path.join(builds_root, name), ignore_errors=True)
+
+
+def legacy_table_filter(where: Optional[Dict]) -> Optional[Dict]:
+    """
+    Same filter for an index built before entries had a "tables" list
+
+    Those indexes hold one platform per entry in "table", so a
+    {"tables": {"$contains": t}} clause becomes {"table": t}.
+    """
+    if not where:
+        return where
+    rewritten = {}
+    for key, value in where.items():
+        if key in ("$and", "$or"):
+            rewritten[key] = [legacy_table_filter(clause) for clause in value]
+        elif key == "tables" and isinstance(value, dict) and set(value) == {"$contains"}:
+            rewritten["table"] = value["$contains"]
+        else:
+            rewritten[key] = value
+    return rewritten
+
+
+class VectorStore:
+    """
+    Interface shared by all vector index backends
+
+    search() takes already-embedded queries (see embedding_cache) and
+    returns, for each query, a ranked list of hits:
+        {"id", "document", "metadata", "distance"}
+    where distance is a cosine distance (lower is closer).
+    """
+
+    backend = "base"
+
+    def count(self) -> int:
+        raise NotImplementedError
+
+    def search(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        where: Optional[Dict] = None
+    ) -> List[List[Dict]]:
+        raise NotImplementedError
+
+
+class ChromaVectorStore(VectorStore):
+    """
+    VectorStore over a ChromaDB collection
+
+    A collection built before entries had a "tables" list gets its table
+    filters rewritten (legacy_table_filter) instead of matching nothing.
+    """
+
+    backend = "chroma"
+
+    def __init__(self, get_collection: Callable):
+        """
+        Args:
+            get_collection: Callable returning the collection (e.g. a shared
+                handle's get), so reloads are picked up transparently
+        """
+        self._get_collection = get_collection
+        self._has_tables = None   # (collection, entries have "tables")
+
+    def count(self) -> int:
+        return self._get_collection().count()
+
+    def _has_tables_field(self, collection) -> bool:
+        """True if the collection's entries carry "tables" (checked once per collection)"""
+        checked = self._has_tables
+        if checked is None or checked[0] is not collection:
+            sample = collection.get(limit=1, include=["metadatas"])["metadatas"]
+            checked = (collection, not sample or "tables" in (sample[0] or {}))
+            self._has_tables = checked
+        return checked[1]
+
+    def search(self, query_embeddings, n_results=5, where=None):
+        collection = self._get_collection()
+        if where and not self._has_tables_field(collection):
+            where = legacy_table_filter(where)
+        results = collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            where=where
+        )
+
+        all_hits = []
+        for q in range(len(results["ids"])):
+            hits = []
+            for i in range(len(results["ids"][q])):
+                hits.append({
+                    "id": results["ids"][q][i],
+                    "document": results["documents"][q][i],
+                    "metadata": results["metadatas"][q][i] or {},
+                    "distance": results["distances"][q][i] if results.get("distances") else None
+                })
+            all_hits.append(hits)
+        return all_hits
+
+
+class LoadedIndex:
+    """
+    One loaded build of a NumPy index folder
+
+    Readers take a single reference to it, so a search never mixes the
+    matrix of one build with the ids/metadata of another. It is never
+    modified after loading, except for the derived column caches used by
+    filters, which belong to this build only.
+    """
+
+    __slots__ = ("version", "manifest", "matrix", "ids", "documents", "metadatas", "extras", "_columns")
+
+    def __init__(self, version, manifest: Dict, matrix, ids: List[str], documents: List[str], metadatas: List[Dict], extras: Optional[Dict] = None):
+        self.version = version
+        self.manifest = manifest
+        self.matrix = matrix
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self.extras = extras or {}
+        self._columns = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def column(self, key: str) -> np.ndarray:
+        """Metadata field as an array, built once per index version (for filters)"""
+        column = self._columns.get(key)
+        if column is None:
+            column = np.empty(len(self.metadatas), dtype=object)
+            column[:] = [m.get(key) for m in self.metadatas]
+            self._columns[key] = column
+        return column
+
+    def numeric_column(self, key: str) -> np.ndarray:
+        """Numeric metadata field as float64 (NaN where missing, so comparisons are False)"""
+        column = self._columns.get(("numeric", key))
+        if column is None:
+            column = np.array([
+                v if isinstance(v, (int, float)) and not isinstance(v, bool) else np.nan
+                for v in self.column(key)
+            ], dtype=np.float64)
+            self._columns[("numeric", key)] = column
+        return column
+
+    def postings(self, key: str) -> Dict:
+        """List-valued metadata field (genres, countries) as value -> row ids"""
+        postings = self._columns.get(("postings", key))
+        if postings is None:
+            rows = {}
+            for i, values in enumerate(self.column(key)):
+                if isinstance(values, list):
+                    for value in values:
+                        rows.setdefault(value, []).append(i)
+            postings = {value: np.array(ids, dtype=np.int64) for value, ids in rows.items()}
+            self._columns[("postings", key)] = postings
+        return postings
+
+    def has_field(self, key: str) -> bool:
+        """True if any entry's metadata has the field"""
+        cache_key = ("has", key)
+        if cache_key not in self._columns:
+            self._columns[cache_key] = any(key in m for m in self.metadatas)
+        return self._columns[cache_key]
+
+    def condition(self, key: str, condition) -> np.ndarray:
+        """Mask of one field condition: a value (equality) or {"$op": operand}"""
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+
+        mask = np.ones(len(self.ids), dtype=bool)
+        for op, operand in condition.items():
+            if op in ("$gt", "$gte", "$lt", "$lte"):
+                column = self.numeric_column(key)
+                with np.errstate(invalid="ignore"):
+                    mask &= {
+                        "$gt": np.greater, "$gte": np.greater_equal,
+                        "$lt": np.less, "$lte": np.less_equal
+                    }[op](column, operand)
+            elif op in ("$eq", "$ne"):
+                matches = self.column(key) == operand
+                mask &= matches if op == "$eq" else ~matches
+            elif op in ("$in", "$nin"):
+                allowed = set(operand)
+                matches = np.fromiter((v in allowed for v in self.column(key)), dtype=bool, count=len(self.ids))
+                mask &= matches if op == "$in" else ~matches
+            elif op == "$contains":
+                matches = np.zeros(len(self.ids), dtype=bool)
+                matches[self.postings(key).get(operand, np.empty(0, dtype=np.int64))] = True
+                mask &= matches
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        return mask
+
+    def mask(self, where: Optional[Dict]) -> Optional[np.ndarray]:
+        """
+        Boolean row mask for a Chroma-style filter
+
+        Supports {"field": value}, {"field": {"$eq" | "$ne" | "$gt" | "$gte" |
+        "$lt" | "$lte" | "$in" | "$nin" | "$contains": operand}} and
+        {"$and" | "$or": [filters]}. Masks are computed on cached column
+        arrays, so filtering costs well under the scoring pass. Table
+        filters of an index built without "tables" fall back to "table".
+        """
+        if not where:
+            return None
+        if not self.has_field("tables"):
+            where = legacy_table_filter(where)
+
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, value in where.items():
+            if key == "$and":
+                for clause in value:
+                    mask &= self.mask(clause)
+            elif key == "$or":
+                any_mask = np.zeros(len(self.ids), dtype=bool)
+                for clause in value:
+                    any_mask |= self.mask(clause)
+                mask &= any_mask
+            else:
+                mask &= self.condition(key, value)
+        return mask
+
+    def normalize_queries(self, query_embeddings) -> np.ndarray:
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        if queries.shape[1] != self.matrix.shape[1]:
+            raise ValueError(
+                f"Query embeddings have {queries.shape[1]} dims but the index was built with "
+                f"'{self.manifest.get('model')}' ({self.matrix.shape[1]} dims) - set EMBEDDING_MODEL to match"
+            )
+        return queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+    def top_hits(self, scores: np.ndarray, k: int, rows: Optional[np.ndarray] = None) -> List[Dict]:
+        """Best k of `scores` as hits; rows maps score positions to row ids (default: identity)"""
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        hits = []
+        for position in top:
+            i = int(rows[position]) if rows is not None else int(position)
+            hits.append({
+                "id": self.ids[i],
+                "document": self.documents[i],
+                "metadata": self.metadatas[i],
+                "distance": float(1.0 - scores[position])
+            })
+        return hits
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Brute-force index over a memory-mapped matrix of normalized embeddings
+
+    Layout of the index folder:
+        manifest.json   {"model", "dim", "count", "build"}
+        builds/<build>/
+            embeddings.npy  float32 (n, dim), rows L2-normalized
+            metadata.json   {"ids": [...], "documents": [...], "metadatas": [...]}
+
+    Every build goes to a new folder and manifest.json, replaced last in
+    one rename, says which one is current, so a reader never pairs the
+    matrix of one build with the metadata of another. Indexes written
+    before builds existed keep their files next to manifest.json.
+
+    The matrix is opened with mmap_mode="r", so several worker processes
+    share one copy through the OS page cache and startup does not read it.
+    Top-k is one matrix-vector product plus argpartition. The index is
+    reopened automatically when manifest.json changes (new build): the new
+    LoadedIndex replaces the old one in a single assignment, and searches
+    already running keep the one they started with.
+    """
+
+    backend = "numpy"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index: Optional[LoadedIndex] = None
+
+    # === LOADING ===
+
+    def _disk_version(self) -> Optional[tuple]:
+        try:
+            stat = os.stat(os.path.join(self.path, MANIFEST_FILE))
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _ensure_loaded(self) -> LoadedIndex:
+        """Current build of the index (loaded or reloaded if the manifest changed)"""
+        index = self._index
+        version = self._disk_version()
+        if index is not None and version is not None and version == index.version:
+            return index
+
+        with self._lock:
+            index = self._index
+            version = self._disk_version()
+            if version is None:
+                raise FileNotFoundError(f"No NumPy vector index in {self.path} (run scripts/create_vector_db.py --backend numpy)")
+            if index is not None and version == index.version:
+                return index
+
+            # The manifest is read once; every other file comes from the build it names
+            with open(os.path.join(self.path, MANIFEST_FILE), encoding="utf-8") as f:
+                stat = os.fstat(f.fileno())
+                version = (stat.st_mtime_ns, stat.st_size)
+                manifest = json.load(f)
+            folder = build_folder(self.path, manifest)
+            with open(os.path.join(folder, METADATA_FILE), encoding="utf-8") as f:
+                sidecar = json.load(f)
+            matrix = np.load(os.path.join(folder, EMBEDDINGS_FILE), mmap_mode="r")
+
+            if not manifest.get("count") == len(sidecar["ids"]) == matrix.shape[0]:
+                raise ValueError(
+                    f"Inconsistent NumPy index in {folder}: manifest count {manifest.get('count')}, "
+                    f"{len(sidecar['ids'])} ids, {matrix.shape[0]} vectors (rebuild it)"
+                )
+
+            index = LoadedIndex(
+                version=version,
+                manifest=manifest,
+                matrix=matrix,
+                ids=sidecar["ids"],
+                documents=sidecar["documents"],
+                metadatas=sidecar["metadatas"],
+                extras=self._load_extras(folder, manifest)
+            )
+            self._index = index
+            return index
+
+    def _load_extras(self, folder: str, manifest: Dict) -> Dict:
+        """Hook for subclasses: extra files of a freshly opened build (in `folder`)"""
+        return {}
+
+    @property
+    def manifest(self) -> Dict:
+        return self._ensure_loaded().manifest
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Memory-mapped (n, dim) matrix of the current build"""
+        return self._ensure_loaded().matrix
+
+    # === QUERY ===
+
+    def count(self) -> int:
+        return len(self._ensure_loaded())
+
+    def get_vectors(self, ids: List[str]) -> Dict[str, np.ndarray]:
+        """Stored (normalized) vectors of the ids present in the index - lets a rebuild reuse them"""
+        index = self._ensure_loaded()
+        row_of = {id_: row for row, id_ in enumerate(index.ids)}
+        found = [id_ for id_ in ids if id_ in row_of]
+        matrix = np.asarray(index.matrix[[row_of[id_] for id_ in found]], dtype=np.float32)
+        return dict(zip(found, matrix))
+
+    def search(self, query_embeddings, n_results=5, where=None):
+        index = self._ensure_loaded()
+        return self._exact_search(index, query_embeddings, n_results, where)
+
+    @staticmethod
+    def _exact_search(index: LoadedIndex, query_embeddings, n_results: int, where: Optional[Dict]):
+        queries = index.normalize_queries(query_embeddings)
+
+        mask = index.mask(where)
+        if mask is not None:
+            # Filter first: only the matching rows are read and scored
+            rows = np.flatnonzero(mask)
+            scores = np.asarray(index.matrix[rows] @ queries.T)
+            return [index.top_hits(scores[:, q], n_results, rows=rows) for q in range(scores.shape[1])]
+
+        # (n, dim) @ (dim, q) -> cosine similarity of every row to every query
+        scores = np.asarray(index.matrix @ queries.T)
+        return [index.top_hits(scores[:, q], n_results) for q in range(scores.shape[1])]
+
+    # === BUILD ===
+
+    @staticmethod
+    def write(
+        path: str,
+        ids: List[str],
+        embeddings,
+        documents: List[str],
+        metadatas: List[Dict],
+        model: str
+    ) -> Dict:
+        """
+        Write a complete index to `path`
+
+        The files go to a new build folder; replacing manifest.json then
+        switches readers to it in one step. Running readers keep their old
+        mmap until they see the new manifest.
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.ndim != 2 or len(matrix) != len(ids):
+            raise ValueError(f"Expected {len(ids)} embeddings, got array of shape {matrix.shape}")
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+        build, folder = _new_build(path)
+        np.save(os.path.join(folder, EMBEDDINGS_FILE), matrix)
+        with open(os.path.join(folder, METADATA_FILE), "w", encoding="utf-8") as f:
+            json.dump({"ids": list(ids), "documents": list(documents), "metadatas": list(metadatas)}, f, ensure_ascii=False)
+
+        manifest = {"model": model, "dim": int(matrix.shape[1]), "count": len(ids), "build": build}
+        _publish(path, manifest)
+        return manifest
+
+
+def train_kmeans(
+    matrix: np.ndarray,
+    nlist: int,
+    iterations: int = 20,
+    max_train_rows: int = 100_000,
+    seed: int = 0,
+    chunk_size: int = 8192
+) -> np.ndarray:
+    """
+    Spherical k-means (cosine) over L2-normalized rows
+
+    Trains on at most max_train_rows sampled rows, processed in chunks so
+    memory stays bounded. Empty clusters are re-seeded with the rows worst
+    served by their current centroid.
+
+    Returns:
+        float32 (nlist, dim) normalized centroids
+    """
+    rng = np.random.default_rng(seed)
+    n = len(matrix)
+    if not 0 < nlist <= n:
+        raise ValueError(f"nlist must be between 1 and the number of vectors ({n}), got {nlist}")
+
+    sample = np.sort(rng.choice(n, size=min(n, max_train_rows), replace=False))
+    train = np.asarray(matrix[sample], dtype=np.float32)
+    centroids = train[rng.choice(len(train), size=nlist, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels, best = assign_to_centroids(train, centroids, chunk_size)
+
+        # Sum rows per cluster: sort by label, then add contiguous runs
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=nlist)
+        starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        filled = counts > 0
+        sums = np.zeros_like(centroids)
+        sums[filled] = np.add.reduceat(train[order], starts[filled], axis=0)
+
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            worst = np.argsort(best)[:len(empty)]
+            sums[empty] = train[worst]
+
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+
+    return centroids.astype(np.float32)
+
+
+def assign_to_centroids(matrix: np.ndarray, centroids: np.ndarray, chunk_size: int = 8192):
+    """Nearest centroid of every row (by cosine) and its similarity, chunk by chunk"""
+    labels = np.empty(len(matrix), dtype=np.int32)
+    best = np.empty(len(matrix), dtype=np.float32)
+    for start in range(0, len(matrix), chunk_size):
+        scores = np.asarray(matrix[start:start + chunk_size], dtype=np.float32) @ centroids.T
+        labels[start:start + chunk_size] = scores.argmax(axis=1)
+        best[start:start + chunk_size] = scores.max(axis=1)
+    return labels, best
+
+
+class IVFVectorStore(NumpyVectorStore):
+    """
+    Inverted-file (IVF) approximate index on top of a NumPy index folder
+
+    Rows are partitioned by k-means into nlist lists. A query is compared
+    to the centroids first, then only the rows of its nprobe closest lists
+    are scored, so cost grows with n * nprobe / nlist instead of n.
+    nprobe can be set per store or per search() call; measure recall and
+    latency with scripts/test_semantic_search.py --benchmark.
+
+    Without trained lists (or after the flat index was rebuilt) searches
+    fall back to exact scoring.
+    """
+
+    backend = "ivf"
+
+    def __init__(self, path: str, nprobe: int = 8):
+        super().__init__(path)
+        self.nprobe = nprobe
+
+    def _load_extras(self, folder: str, manifest: Dict) -> Dict:
+        ivf = manifest.get("ivf")
+        # Lists trained for a different build of the matrix are ignored
+        if not ivf or ivf.get("count") != manifest.get("count"):
+            return {}
+        return {
+            "centroids": np.load(os.path.join(folder, IVF_CENTROIDS_FILE)),
+            "lists": np.load(os.path.join(folder, IVF_LISTS_FILE)),
+            "offsets": np.load(os.path.join(folder, IVF_OFFSETS_FILE)),
+        }
+
+    @property
+    def trained(self) -> bool:
+        return "centroids" in self._ensure_loaded().extras
+
+    def search(self, query_embeddings, n_results=5, where=None, nprobe: Optional[int] = None):
+        index = self._ensure_loaded()
+        if "centroids" not in index.extras:
+            return self._exact_search(index, query_embeddings, n_results, where)
+
+        centroids, inverted, offsets = index.extras["centroids"], index.extras["lists"], index.extras["offsets"]
+        queries = index.normalize_queries(query_embeddings)
+        nlist = len(centroids)
+        nprobe = max(1, min(nprobe or self.nprobe, nlist))
+
+        mask = index.mask(where)
+        available = int(mask.sum()) if mask is not None else len(index)
+        k = min(n_results, available)
+
+        list_order = np.argsort(-(queries @ centroids.T), axis=1)
+
+        all_hits = []
+        for q, query in enumerate(queries):
+            probed = 0
+            candidates = np.empty(0, dtype=inverted.dtype)
+            # Probe nprobe lists; widen if a filter left fewer than k candidates
+            while probed < nlist and (probed == 0 or len(candidates) < k):
+                lists = list_order[q, probed:probed + nprobe]
+                probed += len(lists)
+                found = [inverted[offsets[i]:offsets[i + 1]] for i in lists]
+                found = np.concatenate([candidates, *found])
+                candidates = found[mask[found]] if mask is not None else found
+
+            # Sorted row ids keep reads from the memory map sequential
+            candidates = np.sort(candidates)
+            scores = np.asarray(index.matrix[candidates] @ query)
+            all_hits.append(index.top_hits(scores, k, rows=candidates))
+        return all_hits
+
+    @staticmethod
+    def build(path: str, nlist: Optional[int] = None, iterations: int = 20, seed: int = 0) -> Dict:
+        """
+        Train inverted lists for the NumPy index in `path` (offline)
+
+        nlist defaults to 4 * sqrt(n). The lists go to a new build folder
+        that shares the current matrix and metadata (hard links, or copies
+        where links are not supported), and the manifest is replaced last,
+        so readers switch to the new lists atomically.
+
+        Returns:
+            The updated index manifest
+        """
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            manifest = json.load(f)
+        source = build_folder(path, manifest)
+        matrix = np.load(os.path.join(source, EMBEDDINGS_FILE), mmap_mode="r")
+
+        n = len(matrix)
+        nlist = min(n, nlist or max(1, int(4 * np.sqrt(n))))
+
+        centroids = train_kmeans(matrix, nlist, iterations=iterations, seed=seed)
+        labels, _ = assign_to_centroids(matrix, centroids)
+        lists = np.argsort(labels, kind="stable").astype(np.int32)
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=nlist)))).astype(np.int64)
+
+        build, folder = _new_build(path)
+        for name in (EMBEDDINGS_FILE, METADATA_FILE):
+            try:
+                os.link(os.path.join(source, name), os.path.join(folder, name))
+            except OSError:
+                shutil.copyfile(os.path.join(source, name), os.path.join(folder, name))
+        for name, array in (
+            (IVF_CENTROIDS_FILE, centroids),
+            (IVF_LISTS_FILE, lists),
+            (IVF_OFFSETS_FILE, offsets),
+        ):
+            np.save(os.path.join(folder, name), array)
+
+        sizes = np.diff(offsets)
+        manifest["build"] = build
+        manifest["ivf"] = {
+            "nlist": nlist,
+            "iterations": iterations,
+            "count": n,
+            "max_list_size": int(sizes.max())
+        }
+        _publish(path, manifest)
+        return manifest
+
+
+# Standard reciprocal-rank-fusion constant (dampens the weight of top ranks)
+RRF_K = 60
+
+
+def reciprocal_rank_fusion(ranked_lists: List[List[Dict]], k: int = RRF_K) -> List[Dict]:
+    """
+    Merge several ranked hit lists into one, deduplicated by id
+
+    Each hit scores sum(1 / (k + rank)) over the lists it appears in, so
+    items found by several queries rise above single-list top hits. The
+    closest distance seen for an id is kept.
+
+    Returns:
+        Hits sorted by fused score, each with "rrf_score", "matches"
+        (number of lists containing it) and "sources" (distinct "source"
+        tags of the hits, e.g. vector / lexical)
+    """
+    fused = {}
+    for hits in ranked_lists:
+        for rank, hit in enumerate(hits, start=1):
+            entry = fused.get(hit["id"])
+            if entry is None:
+                entry = fused[hit["id"]] = {**hit, "rrf_score": 0.0, "matches": 0, "sources": []}
+            elif hit.get("distance") is not None and (entry.get("distance") is None or hit["distance"] < entry["distance"]):
+                entry["distance"] = hit["distance"]
+            entry["rrf_score"] += 1.0 / (k + rank)
+            entry["matches"] += 1
+            if hit.get("source") and hit["source"] not in entry["sources"]:
+                entry["sources"].append(hit["source"])
+
+    return sorted(fused.values(), key=lambda hit: hit["rrf_score"], reverse=True)
+
+
+def open_vector_store(
+    backend: str,
+    get_collection: Callable = None,
+    numpy_path: str = None,
+    nprobe: int = 8
+) -> VectorStore:
+    """Create the configured backend ("chroma", "numpy" or "ivf")"""
+    numpy_path = numpy_path or str(Path(__file__).resolve().parent.parent / "data" / "vector_index")
+    if backend == "numpy":
+        return NumpyVectorStore(numpy_path)
+    if backend == "ivf":
+        return IVFVectorStore(numpy_path, nprobe=nprobe)
+    if backend == "chroma":
+        if get_collection is None:
+            raise ValueError("Chroma backend needs a collection getter")
+        return ChromaVectorStore(get_collection)
+    raise ValueError(f"Unknown vector backend: {backend}")
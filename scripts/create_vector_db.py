@@ -1,15 +1,37 @@
 """
-Build ChromaDB vector embeddings from SQL databases.
+Build vector embeddings from SQL databases.
 
 Usage:
-    python scripts/create_vector_db.py
+    python scripts/create_vector_db.py                          # ChromaDB collection (only new/changed descriptions)
+    python scripts/create_vector_db.py --force-rebuild          # re-embed everything
+    python scripts/create_vector_db.py --backend numpy          # NumPy memory-mapped index
+    python scripts/create_vector_db.py --backend numpy --from-chroma
+                                                                # copy vectors from ChromaDB (no API calls)
+    python scripts/create_vector_db.py --backend ivf [--nlist 512]
+                                                                # NumPy index + IVF (k-means) lists
+    python scripts/create_vector_db.py --backend ivf --ivf-only # retrain IVF lists of the existing NumPy index
+    python scripts/create_vector_db.py --lexical-only           # only the FTS5 index for hybrid search (no API calls)
+    python scripts/create_vector_db.py --backend numpy --embedding-model hashing-512
+                                                                # local deterministic embedder (no API calls)
 
 Run from the project root directory.
 Input:  data/databases/*.db
-Output: data/vector_database/
+Output: data/vector_database/ (chroma) or data/vector_index/ (numpy, ivf)
+        + data/lexical_index/movies_fts.db (FTS5 / BM25, unless --no-lexical)
 
-Requires OPENAI_API_KEY in .env
+Builds are incremental: ids come from each row's show_id, and a build manifest
+(id -> content hash) lets a rerun embed only new or changed descriptions and
+delete rows that disappeared. Descriptions are embedded in token-sized batches
+with --concurrency requests in flight, within the provider's limits
+(EMBEDDING_RPM / EMBEDDING_TPM env), with retries; an interrupted build
+resumes from its checkpoint on the next run.
+
+Requires OPENAI_API_KEY in .env (except with --embedding-model hashing-<dim>)
+Run the app with the same EMBEDDING_MODEL the index was built with.
+Set VECTOR_BACKEND=numpy (or ivf, with IVF_NPROBE) for the app to search the NumPy index.
+Measure recall/latency per nprobe with scripts/test_semantic_search.py --benchmark
 """
+import argparse
 import sys
 from pathlib import Path
 
@@ -19,17 +41,51 @@ sys.path.insert(0, str(PROJECT_ROOT / "code"))
 from dotenv import load_dotenv
 load_dotenv()
 
-from embedding import build_movie_embeddings
+from embedding import EMBEDDING_CONCURRENCY, EMBEDDING_MODEL, build_movie_embeddings, build_movie_lexical_index
 
 DB_FOLDER = str(PROJECT_ROOT / "data" / "databases")
 VECTOR_DB_FOLDER = str(PROJECT_ROOT / "data" / "vector_database")
+NUMPY_INDEX_FOLDER = str(PROJECT_ROOT / "data" / "vector_index")
+LEXICAL_INDEX_FILE = str(PROJECT_ROOT / "data" / "lexical_index" / "movies_fts.db")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build vector embeddings from SQL databases")
+    parser.add_argument("--backend", choices=["chroma", "numpy", "ivf"], default="chroma")
+    parser.add_argument("--from-chroma", action="store_true",
+                        help="numpy/ivf backend: export the existing ChromaDB vectors instead of re-embedding")
+    parser.add_argument("--nlist", type=int, default=None,
+                        help="ivf backend: number of k-means lists (default 4 * sqrt(n))")
+    parser.add_argument("--ivf-only", action="store_true",
+                        help="ivf backend: only retrain the lists of the existing NumPy index")
+    parser.add_argument("--embedding-model", default=EMBEDDING_MODEL,
+                        help="OpenAI embedding model, or hashing-<dim> for the local embedder "
+                             "(default: EMBEDDING_MODEL env or text-embedding-3-small)")
+    parser.add_argument("--force-rebuild", action="store_true",
+                        help="re-embed every description instead of only new/changed ones")
+    parser.add_argument("--concurrency", type=int, default=EMBEDDING_CONCURRENCY,
+                        help="embedding requests in flight (default: EMBEDDING_CONCURRENCY env or 4)")
+    parser.add_argument("--no-lexical", action="store_true",
+                        help="skip the FTS5 index used by hybrid (BM25 + vector) search")
+    parser.add_argument("--lexical-only", action="store_true",
+                        help="only build the FTS5 index")
+    args = parser.parse_args()
+
+    if args.lexical_only:
+        build_movie_lexical_index(DB_FOLDER, LEXICAL_INDEX_FILE)
+        sys.exit(0)
+
     print("Building vector embeddings...\n")
     stats = build_movie_embeddings(
         db_folder=DB_FOLDER,
         chroma_path=VECTOR_DB_FOLDER,
-        force_rebuild=True,
-        batch_size=100,
+        force_rebuild=args.force_rebuild,
+        backend=args.backend,
+        numpy_path=NUMPY_INDEX_FOLDER,
+        from_chroma=args.from_chroma,
+        nlist=args.nlist,
+        ivf_only=args.ivf_only,
+        lexical_path=None if args.no_lexical else LEXICAL_INDEX_FILE,
+        embedding_model=args.embedding_model,
+        concurrency=args.concurrency,
     )
     print(f"\nDone: {stats}")
@@ -0,0 +1,199 @@
+"""
+Prefetch OMDb metadata for every catalog title into a local mirror database.
+
+Usage:
+    python scripts/prefetch_omdb.py                          # every title not mirrored yet
+    python scripts/prefetch_omdb.py --limit 900              # stay within a daily API quota
+    python scripts/prefetch_omdb.py --rpm 300 --concurrency 8
+    python scripts/prefetch_omdb.py --retry-not-found        # ask again for titles OMDb did not know
+
+Run from the project root directory, after scripts/create_sql_db.py.
+Input:  data/databases/*.db, read-only (title, release_year, type of every table)
+Output: omdb_metadata table in data/omdb/omdb_metadata.db
+
+The mirror has its own file so that its commits never touch movie.db
+(whose version drives the SQL result cache and pooled connections), and
+the SQL catalog and index builds never see it.
+
+The job is resumable: titles already in omdb_metadata are skipped, rows are
+committed as they arrive, and failed requests (network, throttling) are
+left out so the next run retries them. It stops at OMDb's daily request
+limit. The OMDB tool and title resolution read the mirror before calling
+the API.
+
+Requires OMDB_API_KEY in .env
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "code"))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from config import DB_FOLDER_PATH, OMDB_MIRROR_DB_PATH
+from embedding_pipeline import RateLimiter
+from tools.omdb_cache import NOT_FOUND_ERRORS
+from tools.omdb_mirror import MIRROR_TABLE, create_mirror_table, mirror_row
+from tools.omdb_tool import run_omdb_lookup
+
+# OMDb errors after which every further request fails too
+FATAL_ERRORS = ("request limit reached", "invalid api key")
+COMMIT_EVERY = 50
+
+
+def catalog_titles(conn: sqlite3.Connection) -> list:
+    """Distinct (title, release_year, type) over every table with title + release_year"""
+    selects = []
+    for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall():
+        if name == MIRROR_TABLE:
+            continue
+        columns = {row[1] for row in conn.execute(f"PRAGMA table_info({name})")}
+        if {"title", "release_year"} <= columns:
+            type_column = "type" if "type" in columns else "NULL"
+            selects.append(f"SELECT title, release_year, {type_column} AS type FROM {name}")
+    if not selects:
+        return []
+    return conn.execute(
+        f"SELECT title, release_year, MIN(type) FROM ({' UNION ALL '.join(selects)}) "
+        "WHERE title IS NOT NULL AND release_year IS NOT NULL "
+        "GROUP BY title, release_year ORDER BY title, release_year"
+    ).fetchall()
+
+
+def all_catalog_titles(db_folder: str) -> list:
+    """catalog_titles() of every database in the folder, opened read-only"""
+    titles = {}
+    for name in sorted(os.listdir(db_folder)):
+        if not name.endswith((".db", ".sqlite", ".sqlite3")):
+            continue
+        conn = sqlite3.connect(Path(db_folder, name).resolve().as_uri() + "?mode=ro", uri=True)
+        try:
+            for title, release_year, type_ in catalog_titles(conn):
+                titles.setdefault((title, release_year), (title, release_year, type_))
+        finally:
+            conn.close()
+    return [titles[key] for key in sorted(titles)]
+
+
+def mirrored_titles(conn: sqlite3.Connection, retry_not_found: bool) -> set:
+    query = f"SELECT title, release_year FROM {MIRROR_TABLE}"
+    if retry_not_found:
+        query += " WHERE status = 'found'"
+    return set(conn.execute(query).fetchall())
+
+
+def fetch(title: str, release_year: int, type_: str) -> tuple:
+    """(OMDb response or None when OMDb does not know the title, error)"""
+    if type_ == "TV Show":
+        # The catalog year of a series is often its latest season: match on type only
+        result = run_omdb_lookup(title, "full", None, "series")
+    else:
+        result = run_omdb_lookup(title, "full", str(release_year), "movie" if type_ == "Movie" else None)
+
+    if result.ok:
+        return result.data, None
+    if any(e in result.error.lower() for e in NOT_FOUND_ERRORS):
+        return None, None
+    return None, result.error
+
+
+def write_row(conn: sqlite3.Connection, row: dict):
+    columns = ", ".join(row)
+    placeholders = ", ".join(f":{column}" for column in row)
+    conn.execute(f"INSERT OR REPLACE INTO {MIRROR_TABLE} ({columns}) VALUES ({placeholders})", row)
+
+
+def print_stats(conn: sqlite3.Connection):
+    found, not_found = conn.execute(
+        f"SELECT SUM(status = 'found'), SUM(status = 'not_found') FROM {MIRROR_TABLE}"
+    ).fetchone()
+    print(f"\nMirror: {found or 0:,} found, {not_found or 0:,} not found")
+
+
+def prefetch(conn: sqlite3.Connection, pending: list, rpm: float, concurrency: int) -> dict:
+    """
+    Fetch (title, release_year, type) tuples into the mirror, committing as they arrive
+
+    The first fatal error (quota, bad key) stops every worker before its
+    next request. Returns the found / not_found / errors counts.
+    """
+    limiter = RateLimiter(rpm=rpm, tpm=None)
+    stop = threading.Event()
+
+    def job(title, release_year, type_):
+        if stop.is_set():
+            return None, "stopped"
+        limiter.acquire(1)
+        response, error = fetch(title, release_year, type_)
+        if error and any(e in error.lower() for e in FATAL_ERRORS):
+            stop.set()
+        return response, error
+
+    counts = {"found": 0, "not_found": 0, "errors": 0}
+    started = time.perf_counter()
+    stopping_reported = False
+    pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    try:
+        futures = {pool.submit(job, *t): t for t in pending}
+        for i, future in enumerate(as_completed(futures), 1):
+            title, release_year, _ = futures[future]
+            response, error = future.result()
+
+            if error:
+                counts["errors"] += 1
+                if any(e in error.lower() for e in FATAL_ERRORS) and not stopping_reported:
+                    print(f"  Stopping: {error}")
+                    stopping_reported = True
+            else:
+                write_row(conn, mirror_row(title, release_year, response))
+                counts["found" if response else "not_found"] += 1
+
+            if i % COMMIT_EVERY == 0 or i == len(pending):
+                conn.commit()
+                rate = i / max(time.perf_counter() - started, 1e-9) * 60
+                print(f"  {i:,}/{len(pending):,} ({counts['found']:,} found, "
+                      f"{counts['not_found']:,} not found, {counts['errors']:,} errors, {rate:.0f}/min)")
+    except KeyboardInterrupt:
+        stop.set()
+        print("\nInterrupted - rerun to resume")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        conn.commit()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prefetch OMDb metadata into the omdb_metadata table")
+    parser.add_argument("--rpm", type=float, default=120,
+                        help="OMDb requests per minute (default 120)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="requests in flight (default 4)")
+    parser.add_argument("--limit", type=int, default=None,
+                        help="fetch at most this many titles in this run")
+    parser.add_argument("--retry-not-found", action="store_true",
+                        help="fetch again titles recorded as not found")
+    args = parser.parse_args()
+
+    titles = all_catalog_titles(DB_FOLDER_PATH)
+
+    os.makedirs(os.path.dirname(OMDB_MIRROR_DB_PATH), exist_ok=True)
+    with sqlite3.connect(OMDB_MIRROR_DB_PATH, timeout=30) as conn:
+        create_mirror_table(conn)
+
+        done = mirrored_titles(conn, args.retry_not_found)
+        pending = [t for t in titles if (t[0], t[1]) not in done][:args.limit]
+        print(f"Catalog: {len(titles):,} titles, {len(done):,} mirrored, fetching {len(pending):,}")
+
+        prefetch(conn, pending, args.rpm, args.concurrency)
+
+        print_stats(conn)
+
+    print(f"\nDone: {OMDB_MIRROR_DB_PATH} ({MIRROR_TABLE})")
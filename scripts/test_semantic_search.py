@@ -3,12 +3,22 @@ Diagnostic tool for the ChromaDB semantic search collection.
 
 Usage:
     python scripts/test_semantic_search.py
+    python scripts/test_semantic_search.py --benchmark [--k 10] [--nprobe 1,2,4,8,16,32]
 
 Run from the project root directory.
-Requires OPENAI_API_KEY in .env
+Requires OPENAI_API_KEY in .env (not needed for --benchmark or
+EMBEDDING_MODEL=hashing-<dim>, the local embedder)
+
+--benchmark compares the IVF index (data/vector_index/, built with
+create_vector_db.py --backend ivf) against exact search over the same
+vectors: recall@k and p50/p99 single-query latency for each nprobe.
+Queries are stored vectors perturbed with Gaussian noise, so no API calls
+are made and the query itself is not trivially its own nearest neighbour.
 """
+import argparse
 import os
 import sys
+import time
 from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -18,21 +28,21 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import chromadb
-from chromadb.utils import embedding_functions
+import numpy as np
+from embedding_providers import DEFAULT_EMBEDDING_MODEL, collection_name_for, get_embedding_function
+from vector_store import NumpyVectorStore, IVFVectorStore
 
 CHROMA_PATH = str(PROJECT_ROOT / "data" / "vector_database")
+NUMPY_INDEX_PATH = str(PROJECT_ROOT / "data" / "vector_index")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", DEFAULT_EMBEDDING_MODEL)
 
 
 def get_collection():
     client = chromadb.PersistentClient(path=CHROMA_PATH)
-    openai_ef = embedding_functions.OpenAIEmbeddingFunction(
-        api_key=OPENAI_API_KEY,
-        model_name="text-embedding-3-small",
-    )
     return client.get_or_create_collection(
-        name="movie_descriptions",
-        embedding_function=openai_ef,
+        name=collection_name_for("movie_descriptions", EMBEDDING_MODEL),
+        embedding_function=get_embedding_function(EMBEDDING_MODEL),
     )
 
 
@@ -77,12 +87,87 @@ def print_stats(collection):
         print(f"    Text:  {sample['documents'][0][:100]}...")
 
 
+def benchmark_queries(store: NumpyVectorStore, n_queries: int, noise: float, seed: int = 0) -> np.ndarray:
+    """Stored vectors + Gaussian noise (noise = noise norm relative to the unit vector)"""
+    rng = np.random.default_rng(seed)
+    matrix = store.matrix
+    rows = np.sort(rng.choice(len(matrix), size=min(n_queries, len(matrix)), replace=False))
+    queries = np.asarray(matrix[rows], dtype=np.float32)
+    queries += rng.normal(scale=noise / np.sqrt(queries.shape[1]), size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def timed_search(store, queries: np.ndarray, k: int, **kwargs):
+    """Run one query at a time (as the app does); returns (id lists, latencies in ms)"""
+    ids, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = store.search([query], n_results=k, **kwargs)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        ids.append([hit["id"] for hit in hits])
+    return ids, np.array(latencies)
+
+
+def run_benchmark(index_path: str, k: int, nprobes: list, n_queries: int, noise: float):
+    exact = NumpyVectorStore(index_path)
+    ivf = IVFVectorStore(index_path)
+
+    print(f"NumPy index: {index_path}")
+    print(f"  Vectors: {exact.count():,}")
+    if not ivf.trained:
+        print("\nNo IVF lists for this index. Run scripts/create_vector_db.py --backend ivf --ivf-only first.")
+        sys.exit(1)
+    print(f"  IVF lists: {ivf.manifest['ivf']['nlist']} (largest: {ivf.manifest['ivf']['max_list_size']})")
+
+    queries = benchmark_queries(exact, n_queries, noise)
+    print(f"  Queries: {len(queries)} (noise {noise}), k = {k}\n")
+
+    # Warm the page cache so the first rows measured are not disk reads
+    timed_search(exact, queries[:5], k)
+
+    truth, exact_ms = timed_search(exact, queries, k)
+
+    print(f"  {'method':<8} {'nprobe':>6} {f'recall@{k}':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    print(f"  {'exact':<8} {'-':>6} {1.0:>10.3f} {np.percentile(exact_ms, 50):>8.2f} {np.percentile(exact_ms, 99):>8.2f}")
+
+    for nprobe in nprobes:
+        found, ivf_ms = timed_search(ivf, queries, k, nprobe=nprobe)
+        recall = np.mean([
+            len(set(approx) & set(expected)) / max(len(expected), 1)
+            for approx, expected in zip(found, truth)
+        ])
+        print(f"  {'ivf':<8} {nprobe:>6} {recall:>10.3f} {np.percentile(ivf_ms, 50):>8.2f} {np.percentile(ivf_ms, 99):>8.2f}")
+
+    print("\nPick the smallest nprobe with acceptable recall and set IVF_NPROBE (with VECTOR_BACKEND=ivf).")
+
+
 if __name__ == "__main__":
-    if not OPENAI_API_KEY:
-        print("OPENAI_API_KEY not found. Check your .env file.")
+    parser = argparse.ArgumentParser(description="Semantic search diagnostics and ANN benchmark")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="measure IVF recall@k and latency against exact search (no API calls)")
+    parser.add_argument("--index", default=NUMPY_INDEX_PATH, help="NumPy/IVF index folder")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", default="1,2,4,8,16,32", help="comma-separated nprobe values")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--noise", type=float, default=0.5)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(
+            args.index,
+            k=args.k,
+            nprobes=[int(n) for n in args.nprobe.split(",")],
+            n_queries=args.queries,
+            noise=args.noise,
+        )
+        sys.exit(0)
+
+    if not OPENAI_API_KEY and not EMBEDDING_MODEL.startswith("hashing"):
+        print("OPENAI_API_KEY not found. Check your .env file (or set EMBEDDING_MODEL=hashing-512).")
         sys.exit(1)
 
     print(f"ChromaDB path: {CHROMA_PATH}")
+    print(f"Embedding model: {EMBEDDING_MODEL}")
 
     collection = get_collection()
     print_stats(collection)
@@ -9,7 +9,7 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'code'))
 
 from utils import build_db_catalog
-from config import DB_FOLDER_PATH
+from config import DB_FOLDER_PATH, SQL_ATTACHED_DATABASES
 
 # Test queries from design doc
 TEST_QUERIES = [
@@ -17,12 +17,12 @@ TEST_QUERIES = [
     {
         "query": "Show me the poster for Ex Machina",
         "expected_tools": {"omdb": True},
-        "expected_params": {"omdb_title": "Ex Machina"}
+        "expected_params": {"omdb_queries": [{"title": "Ex Machina"}]}
     },
     {
         "query": "Who directed Inception?",
         "expected_tools": {"omdb": True},
-        "expected_params": {"omdb_title": "Inception"}
+        "expected_params": {"omdb_queries": [{"title": "Inception"}]}
     },
     # Semantic Tests
     {
@@ -54,18 +54,27 @@ TEST_QUERIES = [
     },
     {
         "query": "Dark sci-fi from 2015-2020",
-        "expected_tools": {"sql": True, "semantic": True},
-        "expected_params": {}
+        "expected_tools": {"semantic": True},
+        "expected_params": {"semantic_query_filters": ["year_min", "year_max"]}
     },
 ]
 
+def missing_semantic_filters(plan: dict, fields: list) -> list:
+    """Fields of SemanticFilters that no semantic query of the plan sets"""
+    set_fields = set()
+    for task in plan.get("semantic_queries") or []:
+        filters = task.get("filters") or {}
+        set_fields.update(name for name, value in filters.items() if value not in (None, []))
+    return [field for field in fields if field not in set_fields]
+
+
 def run_test_suite():
     """Run all test queries and report results"""
     print("=" * 60)
     print("PLANNER CONSISTENCY TEST SUITE")
     print("=" * 60)
 
-    catalog = build_db_catalog(DB_FOLDER_PATH)
+    catalog = build_db_catalog(DB_FOLDER_PATH, SQL_ATTACHED_DATABASES)
     passed = 0
     failed = 0
 
@@ -100,12 +109,17 @@ def run_test_suite():
         # Filter to only selected tools
         tools_selected = {k: v for k, v in tools_selected.items() if v}
 
+        # Filters the semantic calls must carry (plan["semantic_queries"][i]["filters"])
+        missing = missing_semantic_filters(plan, test["expected_params"].get("semantic_query_filters", []))
+
         # Check if matches expected
-        if tools_selected == test["expected_tools"]:
+        if tools_selected == test["expected_tools"] and not missing:
             print(f"[PASS] Tools: {tools_selected}")
             passed += 1
         else:
             print(f"[FAIL] Got: {tools_selected}, Expected: {test['expected_tools']}")
+            if missing:
+                print(f"       Semantic filters not set: {missing}")
             print(f"       Reasoning: {plan.get('reasoning', 'N/A')}")
             failed += 1
 
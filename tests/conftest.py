@@ -0,0 +1,61 @@
+"""
+Shared test setup - code/ on sys.path (as the app and scripts do) and
+placeholder API keys so config.py imports; no test calls a real API
+"""
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "code"))
+
+for _key in ("OPENAI_API_KEY", "OMDB_API_KEY", "LANGFUSE_SECRET_KEY", "LANGFUSE_PUBLIC_KEY"):
+    os.environ.setdefault(_key, "test")
+
+
+@pytest.fixture
+def movie_db(tmp_path):
+    """Small catalog database laid out like data/databases/movie.db"""
+    folder = tmp_path / "databases"
+    folder.mkdir()
+    path = folder / "movie.db"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE netflix_titles (show_id TEXT, type TEXT, title TEXT, director TEXT, "
+        "release_year INTEGER, listed_in TEXT, description TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO netflix_titles VALUES (?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("s1", "Movie", "The Irishman", "Martin Scorsese", 2019, "Dramas", "A hitman looks back."),
+            ("s2", "Movie", "Spider-Man", "Sam Raimi", 2002, "Action", "A bitten student becomes a hero."),
+            ("s3", "TV Show", "Alien TV", None, 2021, "Kids' TV", "Three aliens film Earth."),
+            ("s4", "Movie", "Our Godfather", None, 2019, "Documentaries", "A mafia informant's story."),
+            ("s5", "Movie", "Dick Johnson Is Dead", "Kirsten Johnson", 2020, "Documentaries", "A daughter stages her father's death."),
+            ("s6", "Movie", "Inception", "Christopher Nolan", 2010, "Sci-Fi", "A thief steals secrets through dreams."),
+            ("s7", "Movie", "Rocky II", "Sylvester Stallone", 1979, "Dramas", "Rocky fights Apollo again."),
+        ]
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def mirror_db(tmp_path):
+    """OMDb mirror file laid out like data/omdb/omdb_metadata.db (Inception and The Irishman found)"""
+    from tools.omdb_mirror import MIRROR_TABLE, create_mirror_table, mirror_row
+
+    folder = tmp_path / "omdb"
+    folder.mkdir()
+    path = folder / "omdb_metadata.db"
+    conn = sqlite3.connect(path)
+    create_mirror_table(conn)
+    for title, year, rating, imdb_id in [("Inception", 2010, "8.8", "tt1375666"), ("The Irishman", 2019, "7.8", "tt1302006")]:
+        row = mirror_row(title, year, {"Response": "True", "Title": title, "imdbID": imdb_id, "imdbRating": rating})
+        conn.execute(f"INSERT INTO {MIRROR_TABLE} ({', '.join(row)}) VALUES ({', '.join(':' + c for c in row)})", row)
+    conn.commit()
+    conn.close()
+    return path
@@ -0,0 +1,32 @@
+import time
+
+from cache import LRUCache, estimate_size
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_budget():
+    cache = LRUCache(max_entries=100, max_bytes=estimate_size("x" * 100) * 2)
+    for key in "abc":
+        cache.put(key, "x" * 100)
+    assert len(cache) == 2 and cache.get("a") is None
+    # A single value bigger than the whole budget is never cached
+    cache.put("big", "x" * 10_000)
+    assert cache.get("big") is None
+
+
+def test_ttl_expiry():
+    cache = LRUCache(ttl_seconds=0.01)
+    cache.put("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a", "gone") == "gone"
+    assert cache.stats()["expirations"] == 1
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from embedding import dedupe_movies, description_key, entry_signature, plan_delta
+
+
+def _movie(title, table, description, genres, show_id):
+    return {"database": "movie", "table": table, "title": title, "description": description,
+            "show_id": show_id, "filters": {"genres": genres}}
+
+
+def test_description_key_ignores_case_and_punctuation():
+    assert description_key("A detective, in London!") == description_key("a  detective in london")
+    assert description_key("A detective") != description_key("A doctor")
+
+
+def test_dedupe_movies_merges_platforms():
+    movies = [
+        _movie("Sherlock", "netflix_titles", "A detective in London.", ["Mysteries"], "s1"),
+        _movie("Sherlock", "amazon_prime_titles", "A detective, in London", ["Drama"], "s1"),
+        _movie("Poirot", "netflix_titles", "A Belgian detective.", ["Mysteries"], "s2"),
+    ]
+    entries, stats = dedupe_movies(movies)
+
+    assert stats == {"rows": 3, "unique": 2, "duplicates": 1, "dedup_ratio": 0.3333}
+    sherlock = entries[0]
+    assert [s["table"] for s in sherlock["sources"]] == ["netflix_titles", "amazon_prime_titles"]
+    assert sherlock["filters"]["genres"] == ["Mysteries", "Drama"]
+    assert sherlock["id"] == sherlock["sources"][0]["id"]
+    assert dedupe_movies([]) == ([], {"rows": 0, "unique": 0, "duplicates": 0, "dedup_ratio": 0.0})
+
+
+def test_plan_delta():
+    movie = {"title": "A", "description": "x", "sources": [{"id": "a"}]}
+    moved = {**movie, "sources": [{"id": "a"}, {"id": "b"}]}
+    changed = {**movie, "description": "y"}
+    previous = {
+        "same": entry_signature(movie),
+        "moved": entry_signature(movie),
+        "changed": entry_signature(movie),
+        "legacy": entry_signature(movie).split(":")[0],   # bare content hash of an older manifest
+        "gone": entry_signature(movie),
+    }
+    ids = ["same", "moved", "changed", "legacy", "new"]
+    signatures = [entry_signature(m) for m in (movie, moved, changed, movie, movie)]
+
+    to_embed, to_update, stale = plan_delta(ids, signatures, previous)
+    assert [ids[i] for i in to_embed] == ["changed", "new"]
+    assert [ids[i] for i in to_update] == ["moved", "legacy"]
+    assert stale == ["gone"]
+
+
+def test_lexical_build_needs_no_api_keys(movie_db, tmp_path):
+    # The offline (hashing / lexical) build must not import config, which requires every key
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("OPENAI_API_KEY", "OMDB_API_KEY", "LANGFUSE_SECRET_KEY", "LANGFUSE_PUBLIC_KEY")}
+    script = (
+        "import sys, embedding; "
+        "print(embedding.build_movie_lexical_index(sys.argv[1], sys.argv[2])); "
+        "print('config' in sys.modules)"
+    )
+    done = subprocess.run(
+        [sys.executable, "-c", script, str(movie_db.parent), str(tmp_path / "fts.db")],
+        cwd=Path(__file__).resolve().parent.parent / "code", env=env, capture_output=True, text=True
+    )
+    assert done.returncode == 0, done.stderr
+    assert done.stdout.split()[-2:] == ["7", "False"]
@@ -0,0 +1,91 @@
+import sqlite3
+
+import pytest
+
+from lexical_index import LexicalIndex, build_lexical_index, to_match_query, where_to_sql
+from core.models import SemanticTask
+from tools import semantic_tool
+from tools.sql_pool import SQLiteConnectionPool
+
+MOVIES = [
+    {"database": "movie", "table": "netflix_titles", "title": "Sherlock Holmes", "description": "A detective in London.",
+     "filters": {"release_year": 2009, "type": "Movie", "genres": ["Mysteries"]}},
+    {"database": "movie", "table": "amazon_prime_titles", "title": "Space Race", "description": "Astronauts and a detective.",
+     "filters": {"release_year": 2019, "type": "TV Show", "genres": ["Docuseries"]},
+     "sources": [{"title": "Space Race", "table": "amazon_prime_titles"}, {"title": "Space Race", "table": "netflix_titles"}]},
+]
+
+
+def test_to_match_query_quotes_words():
+    assert to_match_query("The movie about a DETECTIVE's dog") == '"detective" OR "dog"'
+    assert to_match_query("the a of") is None
+
+
+def test_where_to_sql():
+    sql, params = where_to_sql({"$and": [
+        {"release_year": {"$gte": 2000}},
+        {"type": {"$in": ["Movie", "TV Show"]}},
+        {"genres": {"$contains": "100%_real"}},
+    ]})
+    assert sql == "(release_year >= ? AND type IN (?, ?) AND genres LIKE ? ESCAPE '\\')"
+    assert params == [2000, "Movie", "TV Show", "%|100\\%\\_real|%"]
+    with pytest.raises(ValueError):
+        where_to_sql({"director": "x"})
+
+
+def test_search_with_filters(tmp_path):
+    path = str(tmp_path / "fts.db")
+    assert build_lexical_index(path, ["n1", "a1"], MOVIES) == 2
+    index = LexicalIndex(path, SQLiteConnectionPool())
+
+    assert [h["id"] for h in index.search("detective", 5)] == ["n1", "a1"]
+    assert [h["id"] for h in index.search("detective", 5, {"type": "TV Show"})] == ["a1"]
+    # A deduplicated entry matches every table it came from
+    assert [h["id"] for h in index.search("detective", 5, {"tables": {"$contains": "netflix_titles"}})] == ["n1", "a1"]
+    assert index.search("detective", 5, {"tables": {"$contains": "hulu_titles"}}) == []
+    assert index.search("sherlock", 5)[0]["metadata"]["title"] == "Sherlock Holmes"
+
+
+def test_table_filter_on_index_without_tables_column(tmp_path):
+    path = str(tmp_path / "fts.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE VIRTUAL TABLE movies_fts USING fts5(title, description, id UNINDEXED, "
+                 "table_name UNINDEXED, database_name UNINDEXED)")
+    conn.executemany("INSERT INTO movies_fts VALUES (?, ?, ?, ?, 'movie')", [
+        ("Sherlock", "A detective.", "n1", "netflix_titles"),
+        ("Poirot", "A detective.", "h1", "hulu_titles"),
+    ])
+    conn.commit()
+    conn.close()
+
+    index = LexicalIndex(path, SQLiteConnectionPool())
+    assert [h["id"] for h in index.search("detective", 5, {"tables": {"$contains": "hulu_titles"}})] == ["h1"]
+
+
+class FlakyLexicalIndex:
+    """Lexical leg whose search fails for one phrasing"""
+
+    def available(self):
+        return True
+
+    def search(self, query, n_results, where=None):
+        if query == "broken":
+            raise sqlite3.OperationalError("no such column: tables")
+        return [{"id": "n1", "document": "A detective in London.", "distance": None,
+                 "metadata": {"title": "Sherlock Holmes", "database": "movie", "table": "netflix_titles"}}]
+
+
+def test_lexical_failure_is_per_phrasing_and_noted(monkeypatch):
+    def failing_vector_search(tasks, n_results):
+        raise RuntimeError("embeddings unavailable")
+
+    monkeypatch.setattr(semantic_tool, "HYBRID_SEARCH", True)
+    monkeypatch.setattr(semantic_tool, "lexical_index", FlakyLexicalIndex())
+    monkeypatch.setattr(semantic_tool, "_vector_search", failing_vector_search)
+
+    result = semantic_tool.run_semantic_queries([SemanticTask(query="detective"), SemanticTask(query="broken")])
+
+    assert result.ok
+    assert [hit["id"] for hit in result.data] == ["n1"]
+    assert "Lexical search failed for 1 of 2 phrasing(s) (no such column: tables)" in result.note
+    assert "lexical results only" in result.note
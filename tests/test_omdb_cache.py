@@ -0,0 +1,65 @@
+import time
+
+from tools.omdb_cache import OMDBResponseCache, is_not_found, normalize_title
+
+FOUND = {"Response": "True", "Title": "Inception", "Year": "2010"}
+NOT_FOUND = {"Response": "False", "Error": "Movie not found!"}
+
+
+def _cache(tmp_path, **kwargs):
+    return OMDBResponseCache(str(tmp_path / "cache" / "omdb.db"), **kwargs)
+
+
+def test_normalize_title_and_not_found():
+    assert normalize_title("  Spider-Man: Far  From Home ") == "spider man far from home"
+    assert is_not_found(NOT_FOUND)
+    assert not is_not_found({"Response": "False", "Error": "Request limit reached!"})
+    assert not is_not_found(FOUND)
+
+
+def test_keys():
+    assert OMDBResponseCache.key("The Matrix!", "1999", "Movie") == "the matrix|1999|movie|full"
+    assert OMDBResponseCache.key("ignored", imdb_id=" TT0133093 ", plot="short") == "imdb:tt0133093|short"
+
+
+def test_hits_misses_and_ttl(tmp_path):
+    cache = _cache(tmp_path, miss_ttl_seconds=0)
+    cache.put("found", FOUND)
+    cache.put("missing", NOT_FOUND)
+    cache.put("limit", {"Response": "False", "Error": "Request limit reached!"})
+
+    assert cache.get("found") == FOUND
+    assert cache.get("missing") is None   # expired right away (miss TTL 0)
+    assert cache.get("limit") is None     # transient errors are never cached
+    assert cache.stats()["entries"] == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_negative_hit(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("missing", NOT_FOUND)
+    assert cache.get("missing") == NOT_FOUND
+    assert cache.negative_hits == 1
+
+
+def test_eviction_is_amortized(tmp_path):
+    cache = _cache(tmp_path, max_entries=10, evict_every=1000)
+    for i in range(10):
+        cache.put(f"k{i}", FOUND)
+        time.sleep(0.001)
+    assert cache.evictions == 0
+
+    # Past max_entries the oldest rows go, down to 90% of it
+    cache.put("k10", FOUND)
+    assert cache.evictions == 2
+    assert cache.entries() == 9
+    assert cache.get("k0") is None and cache.get("k1") is None and cache.get("k10") == FOUND
+
+
+def test_periodic_sweep_drops_expired(tmp_path):
+    cache = _cache(tmp_path, miss_ttl_seconds=0, evict_every=3)
+    cache.put("a", NOT_FOUND)
+    cache.put("b", NOT_FOUND)
+    assert cache.entries() == 2
+    cache.put("c", FOUND)
+    assert cache.entries() == 1 and cache.evictions == 2
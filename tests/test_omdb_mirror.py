@@ -0,0 +1,65 @@
+import os
+import sqlite3
+
+import config
+from embedding import extract_movies_from_databases
+from tools.omdb_mirror import MIRROR_TABLE, OMDBMirror, create_mirror_table, mirror_row, row_to_response
+from utils import build_db_catalog
+
+INCEPTION = {
+    "Response": "True", "Title": "Inception", "Year": "2010", "imdbID": "tt1375666", "Type": "movie",
+    "imdbRating": "8.8", "imdbVotes": "2,345,678", "Metascore": "74", "Runtime": "148 min",
+    "Plot": "A thief who steals corporate secrets.", "Awards": "N/A",
+}
+
+
+def _write_mirror(path, rows):
+    conn = sqlite3.connect(path)
+    create_mirror_table(conn)
+    for row in rows:
+        conn.execute(
+            f"INSERT INTO {MIRROR_TABLE} ({', '.join(row)}) VALUES ({', '.join(':' + c for c in row)})", row
+        )
+    conn.commit()
+    conn.close()
+
+
+def test_mirror_lives_outside_the_catalog_folder():
+    mirror_dir = os.path.dirname(os.path.abspath(config.OMDB_MIRROR_DB_PATH))
+    catalog_dir = os.path.abspath(config.DB_FOLDER_PATH)
+    assert os.path.commonpath([mirror_dir, catalog_dir]) != catalog_dir
+
+
+def test_mirror_row_round_trip():
+    row = mirror_row("Inception", 2010, INCEPTION)
+    assert row["status"] == "found" and row["title_key"] == "inception"
+    assert (row["imdb_rating"], row["imdb_votes"], row["runtime_minutes"]) == (8.8, 2345678, 148)
+    assert row["awards"] is None
+
+    response = row_to_response({**{c: None for c in row}, **row})
+    assert response["imdbVotes"] == "2,345,678" and response["Runtime"] == "148 min"
+    assert response["Awards"] == "N/A" and response["Title"] == "Inception"
+    assert mirror_row("Nope", 2000, None)["status"] == "not_found"
+
+
+def test_lookup(tmp_path):
+    path = str(tmp_path / "omdb_metadata.db")
+    mirror = OMDBMirror(path)
+    assert mirror.lookup("Inception") is None   # no mirror file yet
+
+    _write_mirror(path, [mirror_row("Inception", 2010, INCEPTION), mirror_row("Nope", 2000, None)])
+    assert mirror.lookup("inception!", "2010", "movie")["imdbID"] == "tt1375666"
+    assert mirror.lookup(None, imdb_id="tt1375666")["Title"] == "Inception"
+    assert mirror.lookup("Inception", "1999") is None
+    assert mirror.lookup("Nope") is None
+    assert mirror.stats() == {"available": True, "hits": 2, "misses": 2}
+
+
+def test_mirror_table_in_a_catalog_database_is_ignored(movie_db):
+    # A movie.db from before the mirror had its own file
+    _write_mirror(movie_db, [mirror_row("Inception", 2010, INCEPTION)])
+
+    catalog = build_db_catalog(os.path.dirname(movie_db))
+    assert list(catalog["databases"]["movie"]["tables"]) == ["netflix_titles"]
+    movies = extract_movies_from_databases(os.path.dirname(movie_db))
+    assert {m["table"] for m in movies} == {"netflix_titles"}
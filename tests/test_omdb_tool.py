@@ -0,0 +1,163 @@
+import asyncio
+import importlib.util
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from core.models import OMDBTask, ToolResult
+from tools import omdb_tool
+from tools.title_resolver import TitleResolver
+
+
+def test_async_lookup_keeps_sqlite_off_the_loop(monkeypatch):
+    threads = {}
+
+    def check_lookup(title, plot, year, type_, imdb_id):
+        threads["check"] = threading.current_thread()
+        return "key", None
+
+    def store(key, result):
+        threads["store"] = threading.current_thread()
+        return ToolResult(tool="omdb", data=result)
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return {"Response": "True", "Title": "Inception"}
+
+    class Client:
+        async def get(self, url, params):
+            return Response()
+
+    monkeypatch.setattr(omdb_tool, "_check_lookup", check_lookup)
+    monkeypatch.setattr(omdb_tool, "_store", store)
+    monkeypatch.setattr(omdb_tool.http_pool, "client", lambda: Client())
+
+    async def lookup():
+        return threading.current_thread(), await omdb_tool.run_omdb_lookup_async("Inception")
+
+    loop_thread, result = asyncio.run(lookup())
+    assert result.data["Title"] == "Inception"
+    assert threads["check"] is not loop_thread and threads["store"] is not loop_thread
+
+
+@pytest.fixture
+def fake_omdb(movie_db, monkeypatch):
+    """OMDb that only knows Inception and The Godfather; records the titles asked"""
+    asked = []
+
+    async def lookup(title, plot="full", year=None, type_=None, imdb_id=None):
+        asked.append(title)
+        if title in ("Inception", "The Godfather"):
+            return ToolResult(tool="omdb", data={"Response": "True", "Title": title})
+        return ToolResult(tool="omdb", error="Movie not found!")
+
+    monkeypatch.setattr(omdb_tool, "title_resolver", TitleResolver(str(movie_db.parent)))
+    monkeypatch.setattr(omdb_tool, "run_omdb_lookup_async", lookup)
+    return asked
+
+
+def test_known_title_is_not_replaced_by_a_close_one(fake_omdb):
+    result = asyncio.run(omdb_tool.execute_omdb_async("The Godfather"))
+    assert result.data["Title"] == "The Godfather" and result.note is None
+    assert fake_omdb == ["The Godfather"]
+
+
+def test_fuzzy_match_only_after_not_found(fake_omdb):
+    result = asyncio.run(omdb_tool.execute_omdb_async("Inceptoin"))
+    assert result.ok and result.data["Title"] == "Inception"
+    assert result.note == "title 'Inceptoin' resolved to 'Inception' (similarity 0.889)"
+    assert fake_omdb == ["Inceptoin", "Inception"]
+
+
+def test_not_found_without_close_title_is_kept(fake_omdb):
+    result = asyncio.run(omdb_tool.execute_omdb_async("Spider-Man 2"))
+    assert result.error == "Movie not found!"
+    assert fake_omdb == ["Spider-Man 2"]
+
+
+def test_exact_key_is_resolved_up_front(fake_omdb):
+    resolved, note = omdb_tool.resolve_omdb_task(OMDBTask(title="inception!"))
+    assert resolved == OMDBTask(title="Inception")
+    assert note == "title 'inception!' resolved to 'Inception'"
+
+
+def test_catalog_year_is_not_forced_on_the_title(fake_omdb, movie_db):
+    # The catalog only has the 1984 Dune; the user may mean the 2021 film
+    conn = sqlite3.connect(movie_db)
+    conn.execute("INSERT INTO netflix_titles (show_id, type, title, release_year) VALUES ('s8', 'Movie', 'Dune', 1984)")
+    conn.commit()
+    conn.close()
+
+    assert omdb_tool.resolve_omdb_task(OMDBTask(title="dune")) == (OMDBTask(title="Dune"), "title 'dune' resolved to 'Dune'")
+    assert omdb_tool.resolve_omdb_task(OMDBTask(title="Dune", year=2021)) == (OMDBTask(title="Dune", year=2021), None)
+
+
+class FakeResponse:
+    def __init__(self, status_code, body):
+        self.status_code = status_code
+        self.body = body
+
+    def json(self):
+        if self.body is None:
+            raise ValueError("not JSON")
+        return self.body
+
+
+def _offline_lookup(monkeypatch, responses):
+    """Route run_omdb_lookup to canned responses (no mirror/cache); returns the request log"""
+    calls = []
+
+    def get(url, params, timeout):
+        calls.append(params["t"])
+        response = responses(params["t"])
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(omdb_tool, "_check_lookup", lambda *args: ("key", None))
+    monkeypatch.setattr(omdb_tool, "_store", lambda key, result: omdb_tool._to_tool_result(result))
+    monkeypatch.setattr(omdb_tool.requests, "get", get)
+    return calls
+
+
+def test_http_errors_keep_omdb_message_and_hide_the_key(monkeypatch):
+    monkeypatch.setattr(omdb_tool, "OMDB_API_KEY", "s3cret")
+    quota = {"Response": "False", "Error": "Request limit reached!"}
+    _offline_lookup(monkeypatch, lambda title: {
+        "quota": FakeResponse(401, quota),
+        "down": FakeResponse(503, None),
+        "network": ConnectionError("Max retries exceeded with url: /?apikey=s3cret&t=network"),
+    }[title])
+
+    assert omdb_tool.run_omdb_lookup("quota").error == "Request limit reached!"
+    assert omdb_tool.run_omdb_lookup("down").error == "OMDB API failed: HTTP 503"
+    network = omdb_tool.run_omdb_lookup("network").error
+    assert "s3cret" not in network and "apikey=***" in network
+
+
+def _load_prefetch_script():
+    path = Path(__file__).resolve().parent.parent / "scripts" / "prefetch_omdb.py"
+    spec = importlib.util.spec_from_file_location("prefetch_omdb", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_prefetch_stops_at_the_request_limit(monkeypatch, tmp_path):
+    prefetch_omdb = _load_prefetch_script()
+    calls = _offline_lookup(
+        monkeypatch, lambda title: FakeResponse(401, {"Response": "False", "Error": "Request limit reached!"})
+    )
+    conn = sqlite3.connect(tmp_path / "mirror.db")
+    prefetch_omdb.create_mirror_table(conn)
+
+    pending = [(f"Title {i}", 2000, "Movie") for i in range(20)]
+    counts = prefetch_omdb.prefetch(conn, pending, rpm=60_000, concurrency=1)
+
+    assert calls == ["Title 0"]
+    assert counts == {"found": 0, "not_found": 0, "errors": 20}
+    assert conn.execute("SELECT COUNT(*) FROM omdb_metadata").fetchone()[0] == 0
@@ -0,0 +1,49 @@
+import sqlite3
+
+import pytest
+
+from tools.sql_guard import QueryTooExpensive, check_query_cost, estimate_scan_rows, time_budget
+
+ROWS = {"netflix_titles": 8807, "amazon_prime_titles": 9668}
+
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    for table in ROWS:
+        conn.execute(f"CREATE TABLE {table} (show_id TEXT PRIMARY KEY, title TEXT, release_year INTEGER)")
+    return conn
+
+
+def test_single_scan_costs_table_rows(conn):
+    assert estimate_scan_rows(conn, "SELECT title FROM netflix_titles WHERE release_year = 2020", ROWS) == 8807
+
+
+def test_index_search_is_cheap(conn):
+    assert estimate_scan_rows(conn, "SELECT title FROM netflix_titles WHERE show_id = 's1'", ROWS) == 1
+
+
+def test_cross_join_multiplies(conn):
+    query = "SELECT * FROM netflix_titles n, amazon_prime_titles a WHERE n.title = a.title"
+    assert estimate_scan_rows(conn, query, ROWS) >= 8807
+
+
+def test_cartesian_product_rejected(conn):
+    query = "SELECT * FROM netflix_titles n CROSS JOIN amazon_prime_titles a CROSS JOIN netflix_titles b"
+    with pytest.raises(QueryTooExpensive):
+        check_query_cost(conn, query, ROWS, max_scan_rows=10_000_000)
+
+
+def test_union_adds_up(conn):
+    query = "SELECT title FROM netflix_titles UNION ALL SELECT title FROM amazon_prime_titles"
+    assert estimate_scan_rows(conn, query, ROWS) == 8807 + 9668
+
+
+def test_time_budget_interrupts_runaway_query():
+    conn = sqlite3.connect(":memory:")
+    runaway = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+    with pytest.raises(QueryTooExpensive):
+        with time_budget(conn, seconds=0.05):
+            conn.execute(runaway).fetchone()
+    # The handler is removed afterwards
+    assert conn.execute("SELECT 1").fetchone() == (1,)
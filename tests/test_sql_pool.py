@@ -0,0 +1,69 @@
+import sqlite3
+import threading
+
+from tools.sql_pool import SQLiteConnectionPool
+
+
+def _in_thread(func):
+    out = {}
+    thread = threading.Thread(target=lambda: out.setdefault("value", func()))
+    thread.start()
+    thread.join()
+    return out["value"]
+
+
+def test_connection_reused_per_thread(movie_db):
+    pool = SQLiteConnectionPool()
+    assert pool.connection(str(movie_db)) is pool.connection(str(movie_db))
+    other = _in_thread(lambda: pool.connection(str(movie_db)))
+    assert other is not pool.connection(str(movie_db))
+
+
+def test_dead_thread_connections_are_pruned(movie_db):
+    pool = SQLiteConnectionPool()
+    for _ in range(5):
+        _in_thread(lambda: pool.connection(str(movie_db)).execute("SELECT 1").fetchone())
+    pool.connection(str(movie_db))
+    # Only the calling thread's connection survives the prune
+    assert pool.stats()["open_connections"] == 1
+
+
+def test_close_all_reopens_lazily(movie_db):
+    pool = SQLiteConnectionPool()
+    first = pool.connection(str(movie_db))
+    pool.close_all()
+    assert pool.stats()["open_connections"] == 0
+    second = pool.connection(str(movie_db))
+    assert second is not first
+    assert second.execute("SELECT COUNT(*) FROM netflix_titles").fetchone()[0] == 7
+
+
+def test_rebuilt_file_gets_fresh_connection(movie_db):
+    pool = SQLiteConnectionPool()
+    first = pool.connection(str(movie_db))
+    with sqlite3.connect(movie_db) as conn:
+        conn.execute("INSERT INTO netflix_titles (show_id, title, release_year) VALUES ('s9', 'New', 2024)")
+    assert pool.connection(str(movie_db)) is not first
+
+
+def test_attached_file_created_later_is_attached(movie_db, tmp_path):
+    pool = SQLiteConnectionPool()
+    extra = tmp_path / "extra.db"
+    attach = {"extra": str(extra)}
+    conn = pool.connection(str(movie_db), attach=attach)
+    assert [row[1] for row in conn.execute("PRAGMA database_list")] == ["main"]
+
+    writer = sqlite3.connect(extra)
+    writer.execute("CREATE TABLE t (x INTEGER)")
+    writer.execute("INSERT INTO t VALUES (1)")
+    writer.commit()
+    conn = pool.connection(str(movie_db), attach=attach)
+    assert conn.execute("SELECT x FROM extra.t").fetchall() == [(1,)]
+
+    # Rows written in place are read through the same connection
+    writer.execute("INSERT INTO t VALUES (2)")
+    writer.commit()
+    writer.close()
+    assert pool.connection(str(movie_db), attach=attach) is conn
+    assert conn.execute("SELECT COUNT(*) FROM extra.t").fetchone() == (2,)
+    pool.close_all()
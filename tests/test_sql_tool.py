@@ -0,0 +1,101 @@
+import sqlite3
+
+from tools.sql_tool import _fetch_bounded, normalize_sql, run_sql_query
+from utils import build_db_catalog, format_catalog_for_llm
+
+
+def _numbers(n):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(i,) for i in range(n)])
+    return conn
+
+
+def test_fetch_bounded_small_result_is_exact():
+    rows, total, exact = _fetch_bounded(_numbers(30).execute("SELECT x FROM t"), max_rows=50)
+    assert (len(rows), total, exact) == (30, 30, True)
+
+
+def test_fetch_bounded_counts_past_the_cap():
+    rows, total, exact = _fetch_bounded(_numbers(120).execute("SELECT x FROM t"), max_rows=50, count_cap=10)
+    assert (len(rows), total, exact) == (50, 120, True)
+
+
+def test_fetch_bounded_stops_counting_at_hard_cap():
+    cursor = _numbers(5000).execute("SELECT x FROM t")
+    rows, total, exact = _fetch_bounded(cursor, max_rows=50, count_cap=10)
+    assert (len(rows), total, exact) == (50, 500, False)
+
+
+def test_fetch_bounded_exact_at_the_count_limit():
+    rows, total, exact = _fetch_bounded(_numbers(500).execute("SELECT x FROM t"), max_rows=50, count_cap=10)
+    assert (total, exact) == (500, True)
+
+
+def test_normalize_sql_keeps_literals():
+    assert normalize_sql("SELECT  *\n FROM t WHERE a = 'x  y' ;") == "SELECT * FROM t WHERE a = 'x  y'"
+
+
+def _catalog(db_path):
+    return {"databases": {"movie": {"full_path": str(db_path), "tables": {"netflix_titles": {"row_count": 7}}}}}
+
+
+def test_run_sql_query_truncation_note(movie_db):
+    result = run_sql_query("SELECT title FROM netflix_titles ORDER BY title", "movie", _catalog(movie_db), max_rows=3)
+    assert result.ok and result.truncated
+    assert len(result.data) == 3 and result.row_count == 7
+    assert result.note == "TRUNCATED: showing first 3 of 7 rows"
+
+
+def test_run_sql_query_unknown_database(movie_db):
+    result = run_sql_query("SELECT 1", "nope", _catalog(movie_db))
+    assert not result.ok and result.row_count == 0
+
+
+def test_cache_hits_do_not_share_state(movie_db):
+    query = "SELECT title FROM netflix_titles WHERE release_year = 2019 ORDER BY title"
+    first = run_sql_query(query, "movie", _catalog(movie_db))
+    first.data.append({"title": "corrupted"})
+    first.elapsed_ms = 123.0
+
+    second = run_sql_query(query, "movie", _catalog(movie_db))
+    third = run_sql_query(query, "movie", _catalog(movie_db))
+    assert second.cached and second.elapsed_ms == 0.0
+    assert [row["title"] for row in second.data] == ["Our Godfather", "The Irishman"]
+    second.data[0]["title"] = "changed"
+    assert third.data[0]["title"] == "Our Godfather"
+
+
+RATED = (
+    "SELECT n.title, m.imdb_rating FROM netflix_titles n "
+    "JOIN omdb.omdb_metadata m ON m.title = n.title AND m.release_year = n.release_year "
+    "WHERE m.status = 'found' ORDER BY m.imdb_rating DESC"
+)
+
+
+def test_join_against_attached_mirror(movie_db, mirror_db):
+    catalog = build_db_catalog(str(movie_db.parent), {"omdb": str(mirror_db)})
+    assert catalog["databases"]["movie"]["tables"]["omdb_metadata"]["schema"] == "omdb"
+    assert "TABLE: omdb.omdb_metadata (attached to this database)" in format_catalog_for_llm(catalog)
+
+    result = run_sql_query(RATED, "movie", catalog)
+    assert result.ok, result.error
+    assert result.data == [{"title": "Inception", "imdb_rating": 8.8}, {"title": "The Irishman", "imdb_rating": 7.8}]
+
+    # Rows prefetched later are visible; only queries reading the mirror miss the cache
+    plain = "SELECT COUNT(*) AS n FROM netflix_titles"
+    run_sql_query(plain, "movie", catalog)
+    conn = sqlite3.connect(mirror_db)
+    conn.execute("UPDATE omdb_metadata SET imdb_rating = 9.9 WHERE title = 'The Irishman'")
+    conn.commit()
+    conn.close()
+
+    rerun = run_sql_query(RATED, "movie", catalog)
+    assert not rerun.cached and rerun.data[0] == {"title": "The Irishman", "imdb_rating": 9.9}
+    assert run_sql_query(plain, "movie", catalog).cached
+
+
+def test_missing_mirror_is_not_attached(movie_db, tmp_path):
+    catalog = build_db_catalog(str(movie_db.parent), {"omdb": str(tmp_path / "missing.db")})
+    assert "attached" not in catalog["databases"]["movie"]
+    assert list(catalog["databases"]["movie"]["tables"]) == ["netflix_titles"]
@@ -0,0 +1,71 @@
+import sqlite3
+
+import pytest
+
+from tools.omdb_mirror import MIRROR_TABLE, create_mirror_table, mirror_row
+from tools.title_resolver import TitleResolver, sequel_numbers, title_key
+
+
+@pytest.fixture
+def resolver(movie_db):
+    return TitleResolver(str(movie_db.parent))
+
+
+def test_title_key_and_numbers():
+    assert title_key("The Señor & Me!") == "senor and me"
+    assert title_key("The") == "the"
+    assert sequel_numbers("rocky ii") == {2} and sequel_numbers("spider man 2") == {2}
+    assert sequel_numbers("i robot") == set()
+
+
+def test_exact_key_only_by_default(resolver):
+    assert resolver.resolve("the irishman")["title"] == "The Irishman"
+    assert resolver.resolve("Irishman", 2019) == {"title": "The Irishman", "year": 2019, "imdb_id": None, "score": 1.0}
+    # A close catalog title is another work: never substituted up front
+    assert resolver.resolve("The Godfather") is None
+    assert resolver.resolve("Alien") is None
+    assert resolver.resolve("Inceptoin") is None
+
+
+@pytest.mark.parametrize("title", ["The Godfather", "Alien", "Spider-Man 2", "Rocky", "Rocky III"])
+def test_fuzzy_rejects_other_works(resolver, title):
+    assert resolver.resolve(title, fuzzy=True) is None
+
+
+def test_fuzzy_fixes_typos(resolver):
+    match = resolver.resolve("Inceptoin", fuzzy=True)
+    assert match["title"] == "Inception" and match["year"] is None and 0.85 <= match["score"] < 1
+    assert resolver.resolve("Rocky 11", fuzzy=True) is None
+    assert resolver.resolve("Spiderman", fuzzy=True)["title"] == "Spider-Man"
+    assert resolver.stats()["fuzzy"] == 2
+
+
+def test_year_comes_from_the_caller_only(resolver, movie_db):
+    conn = sqlite3.connect(movie_db)
+    conn.execute("INSERT INTO netflix_titles (show_id, type, title, release_year) VALUES ('s8', 'Movie', 'Dune', 1984)")
+    conn.commit()
+    conn.close()
+
+    assert resolver.resolve("dune") == {"title": "Dune", "year": None, "imdb_id": None, "score": 1.0}
+    assert resolver.resolve("Dune", 2021)["year"] == 2021
+    assert resolver.resolve("Dune", 1984)["year"] == 1984
+
+
+def test_series_keep_no_year(resolver):
+    assert resolver.resolve("alien tv") == {"title": "Alien TV", "year": None, "imdb_id": None, "score": 1.0}
+
+
+def test_mirror_file_adds_aliases_and_imdb_ids(movie_db, tmp_path):
+    mirror_path = tmp_path / "omdb_metadata.db"
+    conn = sqlite3.connect(mirror_path)
+    create_mirror_table(conn)
+    row = mirror_row("Inception", 2010, {"Response": "True", "Title": "Origen", "imdbID": "tt1375666"})
+    conn.execute(f"INSERT INTO {MIRROR_TABLE} ({', '.join(row)}) VALUES ({', '.join(':' + c for c in row)})", row)
+    conn.commit()
+    conn.close()
+
+    resolver = TitleResolver(str(movie_db.parent), str(mirror_path))
+    assert resolver.resolve("Inception", 2010)["imdb_id"] == "tt1375666"
+    assert resolver.resolve("Origen", 2011)["imdb_id"] == "tt1375666"
+    # No year: the title only, the mirrored row may be another work
+    assert resolver.resolve("Origen") == {"title": "Inception", "year": None, "imdb_id": None, "score": 1.0}
@@ -0,0 +1,160 @@
+import json
+import shutil
+
+import numpy as np
+import pytest
+
+from vector_store import ChromaVectorStore, IVFVectorStore, NumpyVectorStore, legacy_table_filter, reciprocal_rank_fusion
+
+
+def _write(path, n=200, dim=16, seed=0, tag="a"):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    ids = [f"{tag}{i}" for i in range(n)]
+    metadatas = [
+        {"release_year": 1990 + i % 30, "type": "Movie" if i % 2 else "TV Show",
+         "genres": ["Dramas"] if i % 3 else ["Comedies", "Dramas"], "tables": ["netflix_titles"]}
+        for i in range(n)
+    ]
+    NumpyVectorStore.write(str(path), ids, vectors, [f"doc {i}" for i in ids], metadatas, model="test")
+    return vectors
+
+
+def test_exact_search_finds_itself(tmp_path):
+    vectors = _write(tmp_path)
+    store = NumpyVectorStore(str(tmp_path))
+    hits = store.search([vectors[7]], n_results=3)[0]
+    assert hits[0]["id"] == "a7" and hits[0]["distance"] == pytest.approx(0.0, abs=1e-5)
+    assert len(hits) == 3
+
+
+def test_filter_masks(tmp_path):
+    vectors = _write(tmp_path)
+    store = NumpyVectorStore(str(tmp_path))
+    where = {"$and": [
+        {"release_year": {"$gte": 2000}},
+        {"type": "Movie"},
+        {"genres": {"$contains": "Comedies"}},
+        {"tables": {"$contains": "netflix_titles"}},
+    ]}
+    hits = store.search([vectors[0]], n_results=50, where=where)[0]
+    assert hits
+    for hit in hits:
+        meta = hit["metadata"]
+        assert meta["release_year"] >= 2000 and meta["type"] == "Movie" and "Comedies" in meta["genres"]
+
+    assert store.search([vectors[0]], n_results=5, where={"type": {"$in": ["Nope"]}}) == [[]]
+    with pytest.raises(ValueError):
+        store.search([vectors[0]], where={"type": {"$regex": "x"}})
+
+
+def test_table_filter_on_index_without_tables(tmp_path):
+    # Indexes built before "tables" existed only have the entry's own table
+    vectors = np.eye(3, dtype=np.float32)
+    metadatas = [{"table": "netflix_titles"}, {"table": "hulu_titles"}, {"table": "netflix_titles"}]
+    NumpyVectorStore.write(str(tmp_path), ["n1", "h1", "n2"], vectors, ["a", "b", "c"], metadatas, model="test")
+    store = NumpyVectorStore(str(tmp_path))
+    hits = store.search([vectors[1]], n_results=3, where={"tables": {"$contains": "netflix_titles"}})[0]
+    assert sorted(h["id"] for h in hits) == ["n1", "n2"]
+
+
+def test_legacy_table_filter():
+    where = {"$and": [{"tables": {"$contains": "hulu_titles"}}, {"genres": {"$contains": "Dramas"}}]}
+    assert legacy_table_filter(where) == {"$and": [{"table": "hulu_titles"}, {"genres": {"$contains": "Dramas"}}]}
+    assert legacy_table_filter(None) is None
+
+
+class FakeCollection:
+    def __init__(self, metadata):
+        self.metadata = metadata
+        self.wheres = []
+
+    def get(self, limit, include):
+        return {"metadatas": [self.metadata]}
+
+    def query(self, query_embeddings, n_results, where):
+        self.wheres.append(where)
+        return {"ids": [[]], "documents": [[]], "metadatas": [[]], "distances": [[]]}
+
+
+def test_chroma_table_filter_follows_collection_schema():
+    where = {"tables": {"$contains": "hulu_titles"}}
+    old, new = FakeCollection({"table": "hulu_titles"}), FakeCollection({"tables": ["hulu_titles"]})
+    ChromaVectorStore(lambda: old).search([[1.0]], where=where)
+    ChromaVectorStore(lambda: new).search([[1.0]], where=where)
+    assert old.wheres == [{"table": "hulu_titles"}]
+    assert new.wheres == [where]
+
+
+def test_ivf_matches_exact_with_all_lists_probed(tmp_path):
+    vectors = _write(tmp_path)
+    IVFVectorStore.build(str(tmp_path), nlist=8)
+    ivf = IVFVectorStore(str(tmp_path), nprobe=8)
+    assert ivf.trained
+    exact = NumpyVectorStore(str(tmp_path)).search([vectors[3]], n_results=5)[0]
+    approx = ivf.search([vectors[3]], n_results=5)[0]
+    assert [h["id"] for h in approx] == [h["id"] for h in exact]
+    # A filter narrower than nprobe lists still returns k hits (probing widens)
+    filtered = ivf.search([vectors[3]], n_results=5, where={"release_year": 1995}, nprobe=1)[0]
+    assert len(filtered) == 5 and all(h["metadata"]["release_year"] == 1995 for h in filtered)
+
+
+def test_rebuild_swaps_whole_snapshot(tmp_path):
+    _write(tmp_path, n=50, tag="old")
+    store = NumpyVectorStore(str(tmp_path))
+    old = store._ensure_loaded()
+    vectors = _write(tmp_path, n=80, seed=1, tag="new")
+    new = store._ensure_loaded()
+    # A search holding the old snapshot keeps consistent old data
+    assert len(old.ids) == len(old.metadatas) == old.matrix.shape[0] == 50
+    assert new is not old and new.ids[0] == "new0" and new.matrix.shape[0] == 80
+    assert store.search([vectors[5]], n_results=1)[0][0]["id"] == "new5"
+
+
+def test_reader_ignores_unpublished_build(tmp_path):
+    _write(tmp_path, n=50, tag="old")
+    # A writer that stopped before replacing the manifest: new files, old pointer
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    _write(tmp_path / "staging", n=80, seed=1, tag="new")
+    shutil.copytree(tmp_path / "staging" / json.loads((tmp_path / "staging" / "manifest.json").read_text())["build"],
+                    tmp_path / "builds" / "99999999T999999999999-unpublished")
+    index = NumpyVectorStore(str(tmp_path))._ensure_loaded()
+    assert index.manifest["build"] == manifest["build"]
+    assert len(index.ids) == index.matrix.shape[0] == 50 and index.ids[0] == "old0"
+
+
+def test_old_builds_are_pruned(tmp_path):
+    for seed in range(4):
+        _write(tmp_path, n=20, seed=seed)
+    IVFVectorStore.build(str(tmp_path), nlist=4)
+    builds = sorted(p.name for p in (tmp_path / "builds").iterdir())
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    assert len(builds) == 2 and manifest["build"] == f"builds/{builds[-1]}"
+    assert IVFVectorStore(str(tmp_path)).trained
+
+
+def test_count_mismatch_is_rejected(tmp_path):
+    _write(tmp_path, n=20)
+    manifest = json.loads((tmp_path / "manifest.json").read_text())
+    sidecar_path = tmp_path / manifest["build"] / "metadata.json"
+    sidecar = json.loads(sidecar_path.read_text())
+    sidecar_path.write_text(json.dumps({key: values[:-1] for key, values in sidecar.items()}))
+    with pytest.raises(ValueError, match="Inconsistent"):
+        NumpyVectorStore(str(tmp_path)).count()
+
+
+def test_flat_legacy_index_still_loads(tmp_path):
+    vectors = np.eye(3, dtype=np.float32)
+    np.save(tmp_path / "embeddings.npy", vectors)
+    (tmp_path / "metadata.json").write_text(json.dumps({"ids": ["a", "b", "c"], "documents": ["", "", ""], "metadatas": [{}, {}, {}]}))
+    (tmp_path / "manifest.json").write_text(json.dumps({"model": "test", "dim": 3, "count": 3}))
+    assert NumpyVectorStore(str(tmp_path)).search([vectors[1]], n_results=1)[0][0]["id"] == "b"
+
+
+def test_reciprocal_rank_fusion():
+    vector = [{"id": "a", "distance": 0.2, "source": "vector"}, {"id": "b", "distance": 0.3, "source": "vector"}]
+    lexical = [{"id": "b", "distance": None, "source": "lexical"}, {"id": "c", "distance": None, "source": "lexical"}]
+    fused = reciprocal_rank_fusion([vector, lexical])
+    assert [h["id"] for h in fused] == ["b", "a", "c"]
+    assert fused[0]["matches"] == 2 and fused[0]["sources"] == ["vector", "lexical"]
+    assert fused[0]["distance"] == 0.3